@@ -0,0 +1,55 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Queries per second of building every query with a fresh BlazegraphQueryBuilder chain versus
+# BlazegraphQueryBuilder.batch, in process and across a process pool.
+#
+#   PYTHONPATH=. python benchmarks/bench_batch.py [queries] [workers]
+
+import os
+import sys
+import time
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.expression import *
+
+
+def template(qb, sample, formats):
+    return qb.axiom("f", "rdfs:label", var_f("fn")). \
+        bds_search("fn", sample, match_all_terms=True). \
+        axiom("f", "tcga:hasDataFormat", "df"). \
+        axiom(var_f("df"), "rdfs:label", "dfl"). \
+        filter(in_f(var_f("dfl"), formats)). \
+        filter_exists().axiom("f", "tcga:hasCase", "c").build(). \
+        select("f").limit(10). \
+        set_prefix("https://www.sbgenomics.com/ontologies/2014/11/tcga#", "tcga")
+
+
+def batch_template(qb):
+    return template(qb, param_f('sample'), param_f('formats'))
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    rows = [{'sample': 'C500.TCGA-ZF-%06d-10A' % i, 'formats': ['BAM', 'BAI']} for i in range(total)]
+
+    def chains():
+        for row in rows:
+            formats = [literal_f('"%s"' % name) for name in row['formats']]
+            yield template(BlazegraphQueryBuilder(), literal_f('"%s"' % row['sample']), formats[0]).build() \
+                .serialize('pretty')
+
+    runs = (('builder chain', chains),
+            ('batch', lambda: BlazegraphQueryBuilder.batch(rows, batch_template)),
+            ('batch x%d' % workers, lambda: BlazegraphQueryBuilder.batch(rows, batch_template, workers=workers)))
+    for name, run in runs:
+        start = time.perf_counter()
+        count = sum(1 for _ in run())
+        elapsed = time.perf_counter() - start
+        print('%-14s %7d queries %8.1f ms %10.0f q/s' % (name, count, elapsed * 1e3, count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Cost of building queries that are mostly thrown away. For filled in builders, the final build() alone:
+# time and memory blocks allocated per query (tracemalloc, queries and builders kept alive). Then the
+# whole pipeline: filling in and building the query, rendering only every tenth one.
+#
+#   PYTHONPATH=. python benchmarks/bench_build.py
+
+import time
+import tracemalloc
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.expression import *
+from sparqb.query_builder.query_builder import QueryBuilder
+
+COUNT = 20000
+ROUNDS = 7
+
+
+def typical(i):
+    qb = QueryBuilder()
+    qb.axiom('f', 'rdf:type', 'tcga:File'). \
+        axiom('f', 'tcga:hasCase', 'c'). \
+        union().axiom('c', 'tcga:hasDiseaseType', 'dt').build(). \
+        union().axiom('c', 'tcga:hasSample', 's').build(). \
+        optional().axiom('f', 'tcga:hasSize', 'size').build(). \
+        filter(var_f('size') > literal_f(i)). \
+        select('f', 'c').order_by('f').limit(100)
+    return qb
+
+
+def blazegraph(i):
+    qb = BlazegraphQueryBuilder()
+    qb.with_query('files').axiom('f', 'rdf:type', 'tcga:File').select('f').build()
+    qb.include('files')
+    qb.axiom('f', 'tcga:hasCase', 'c').optional().axiom('f', 'tcga:hasSize', 'size').build().select('f')
+    return qb
+
+
+def build_allocations(fill):
+    builders = [fill(i) for i in range(COUNT)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    queries = [builder.build() for builder in builders]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    # the list holding the queries is one block
+    return (sum(stat.count_diff for stat in stats) - 1) / COUNT, len(queries)
+
+
+def build_time(fill):
+    best = None
+    for _ in range(ROUNDS):
+        builders = [fill(i) for i in range(COUNT)]
+        start = time.perf_counter()
+        for builder in builders:
+            builder.build()
+        elapsed = (time.perf_counter() - start) / COUNT
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def pipeline_time(fill, render_every=10):
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for i in range(COUNT):
+            query = fill(i).build()
+            if i % render_every == 0:
+                query.serialize()
+        elapsed = (time.perf_counter() - start) / COUNT
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    for name, fill in (('typical', typical), ('blazegraph', blazegraph)):
+        blocks, _ = build_allocations(fill)
+        print('%-10s build() %5.1f blocks %6.2f us   fill, build, render 10%% %6.2f us'
+              % (name, blocks, build_time(fill) * 1e6, pipeline_time(fill) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
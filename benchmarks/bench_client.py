@@ -0,0 +1,84 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Wall time of fanning out one query per case against a local endpoint answering after a fixed delay:
+# a new connection per query, the pooled SparqlClient, and AsyncSparqlClient.execute_many.
+#
+#   PYTHONPATH=. python benchmarks/bench_client.py [queries] [delay_ms]
+
+import asyncio
+import http.server
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from sparqb.client import AsyncSparqlClient, SparqlClient
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+
+
+def serve(delay):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            time.sleep(delay)
+            payload = b'{"head": {"vars": []}, "results": {"bindings": []}}'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(http.server.ThreadingHTTPServer):
+        # the default backlog of 5 drops concurrent connects, which then wait for a SYN retransmit
+        request_queue_size = 128
+
+    server = Server(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def case_query(case):
+    return BlazegraphQueryBuilder().axiom('c', 'rdfs:label', '"%s"' % case).axiom('c', 'tcga:hasSample', 's'). \
+        select('s').build()
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 10) / 1000
+    server = serve(delay)
+    endpoint = 'http://127.0.0.1:%d/sparql' % server.server_port
+    queries = [case_query('TCGA-%04d' % i) for i in range(total)]
+
+    start = time.perf_counter()
+    for query in queries:
+        data = urllib.parse.urlencode({'query': query.serialize()}).encode()
+        urllib.request.urlopen(endpoint, data).read()
+    print('urlopen loop          %8.1f ms' % ((time.perf_counter() - start) * 1e3))
+
+    with SparqlClient(endpoint) as client:
+        start = time.perf_counter()
+        for query in queries:
+            client.execute(query)
+        print('SparqlClient loop     %8.1f ms' % ((time.perf_counter() - start) * 1e3))
+
+    async def fan_out():
+        async with AsyncSparqlClient(endpoint, pool_size=16) as client:
+            start = time.perf_counter()
+            await client.execute_many(queries, concurrency=16)
+            return time.perf_counter() - start
+
+    print('execute_many (16)     %8.1f ms' % (asyncio.run(fan_out()) * 1e3))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
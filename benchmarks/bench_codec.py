@@ -0,0 +1,68 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Size and encode/decode time of Query.to_bytes against pickle and against the rendered text, for a
+# typical query and for a large UNION block. Decoding the text means parsing it with parse_query.
+#
+#   PYTHONPATH=. python benchmarks/bench_codec.py
+
+import pickle
+import time
+
+from sparqb.query_builder.codec import decode, encode
+from sparqb.query_builder.expression import *
+from sparqb.query_builder.parser import parse_query
+from sparqb.query_builder.query_builder import QueryBuilder
+
+TCGA = 'https://www.sbgenomics.com/ontologies/2014/11/tcga#'
+
+
+def typical():
+    qb = QueryBuilder().set_prefix(TCGA, 'tcga')
+    qb.axiom('f', 'rdf:type', 'tcga:File'). \
+        axiom('f', 'tcga:hasCase', 'c'). \
+        axiom('c', 'tcga:hasDiseaseType', 'dt'). \
+        axiom('dt', 'rdfs:label', 'dtl'). \
+        axiom('f', 'tcga:hasDataFormat', 'df'). \
+        axiom('df', 'rdfs:label', 'dfl'). \
+        values(('dfl',), [('"BAM"',), ('"VCF"',)]). \
+        optional().axiom('f', 'tcga:hasSize', 'size').build(). \
+        filter((var_f('size') > literal_f(1000)) | ~bound_f('size')). \
+        select('f', 'dtl').distinct().order_by('f').limit(100)
+    return qb.build()
+
+
+def wide_union(branches):
+    qb = QueryBuilder().set_prefix(TCGA, 'tcga')
+    for i in range(branches):
+        qb.union().axiom('a', 'rdf:type', 'tcga:Type%d' % i).axiom('a', 'tcga:hasCase', 'c').build()
+    return qb.select('a', 'c').build()
+
+
+def timed(fn, argument, repeat):
+    # best of five rounds
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = fn(argument)
+        elapsed = (time.perf_counter() - start) / repeat
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    for name, query, repeat in (('typical', typical(), 500), ('union 20000', wide_union(20000), 1)):
+        print(name)
+        for codec, dump, load in (('to_bytes', encode, decode),
+                                  ('pickle', lambda q: pickle.dumps(q, pickle.HIGHEST_PROTOCOL), pickle.loads),
+                                  ('text', str, parse_query)):
+            data, dumped = timed(dump, query, repeat)
+            _, loaded = timed(load, data, repeat)
+            print('  %-9s %10d bytes  encode %9.1f us  decode %9.1f us'
+                  % (codec, len(data), dumped * 1e6, loaded * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Bytes allocated per expression/statement node, measured with tracemalloc.
+#
+#   PYTHONPATH=. python benchmarks/bench_memory.py
+
+import tracemalloc
+
+from sparqb.query_builder.statement import *
+
+COUNT = 20000
+
+
+def measure(factory):
+    names = ['n%d' % i for i in range(COUNT)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    nodes = [factory(name) for name in names]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    # the list holding the nodes is not part of the node cost
+    return (total - nodes.__sizeof__()) / COUNT
+
+
+def keyed(node):
+    node.key()
+    return node
+
+
+def main():
+    shared = VariableExpression('a')
+    cases = [
+        ('VariableExpression', lambda name: VariableExpression(name)),
+        ('LiteralExpression', lambda name: LiteralExpression(name)),
+        ('UriExpression', lambda name: UriExpression('tcga:Aliquot')),
+        ('BinaryOperatorExpression', lambda name: BinaryOperatorExpression('>', shared, shared)),
+        ('AxiomStatement', lambda name: AxiomStatement(shared, 'rdf:type', shared)),
+        ('FilterStatement', lambda name: FilterStatement(shared)),
+        ('AxiomStatement, keyed', lambda name: keyed(AxiomStatement(shared, name, shared))),
+        ('axiom with fresh terms', lambda name: AxiomStatement(VariableExpression(name), 'tcga:hasCase',
+                                                               UriExpression('tcga:Case'))),
+        ('axiom via var_f/uri_f', lambda name: AxiomStatement(var_f('a'), 'tcga:hasCase', uri_f('tcga:Case'))),
+    ]
+    for label, factory in cases:
+        print('%-26s %7.1f bytes/node' % (label, measure(factory)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Time to render a query with many UNION branches sequentially and with render_parallel on 1, 2, 4, ...
+# workers up to the number of cores: by default, which renders on a kept thread pool on free-threaded builds
+# and sequentially otherwise, and on a process pool started before timing and reused across calls.
+#
+#   PYTHONPATH=. python benchmarks/bench_parallel_render.py [branches]
+
+import os
+import sys
+import time
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.expression import *
+from sparqb.query_builder.parallel import free_threaded, render_parallel
+from sparqb.query_builder.util import process_pool
+
+
+def build(branches):
+    qb = BlazegraphQueryBuilder()
+    for i in range(branches):
+        qb.union().axiom('f', 'tcga:hasCase', 'c'). \
+            axiom('c', 'tcga:hasCaseId', literal_f('"TCGA-%06d"' % i)). \
+            filter(var_f('c') > literal_f(i)).build()
+    return qb.select('f').build()
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    branches = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    query = build(branches)
+    expected = query.serialize()
+    print('%d branches, %.1f MB, %s' % (branches, len(expected) / 1e6,
+                                        'free-threaded' if free_threaded() else 'GIL enabled'))
+
+    sequential = best_of(query.serialize)
+    print('sequential  %8.1f ms' % (sequential * 1e3))
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        assert render_parallel(query, workers=workers) == expected
+        elapsed = best_of(lambda: render_parallel(query, workers=workers))
+        print('%2d workers  %8.1f ms  %5.2fx  default' % (workers, elapsed * 1e3, sequential / elapsed))
+        with process_pool(workers) as pool:
+            assert render_parallel(query, executor=pool) == expected
+            elapsed = best_of(lambda: render_parallel(query, executor=pool))
+        print('%2d workers  %8.1f ms  %5.2fx  process pool' % (workers, elapsed * 1e3, sequential / elapsed))
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Parsing throughput of the Blazegraph SPARQL parser, in queries per second for a typical query and in MB/s for
+# a query with many UNION branches and VALUES rows.
+#
+#   PYTHONPATH=. python benchmarks/bench_parser.py [branches]
+
+import sys
+import time
+import timeit
+
+from sparqb.query_builder.blazegraph.blazegraph_parser import parse_blazegraph_query
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.expression import *
+
+
+def typical():
+    qb = BlazegraphQueryBuilder()
+    qb.axiom("f", "rdfs:label", var_f("fn")). \
+        bds_search("fn", 'C500.TCGA-ZF-AA53-10A-01D-A394-08.2', match_all_terms=True). \
+        query_id('de8a969a-08ca-4d46-96ee-1e2cfbd93fce'). \
+        axiom("f", "tcga:hasDataFormat", "df"). \
+        axiom(var_f("df"), "rdfs:label", "dfl"). \
+        values(("dfl",), [('"BAM"',), ('"BAI"',)]). \
+        filter((var_f("am") > literal_f(5)) & (var_f("am") < literal_f(5.8))). \
+        filter_exists().axiom("f", "tcga:hasCase", "c").build(). \
+        select("f").limit(10). \
+        set_prefix("https://www.sbgenomics.com/ontologies/2014/11/tcga#", "tcga")
+    return str(qb.build())
+
+
+def large(branches):
+    qb = BlazegraphQueryBuilder()
+    for i in range(branches):
+        qb.union().axiom('f', 'tcga:hasCase', 'c'). \
+            axiom('c', 'tcga:hasCaseId', literal_f('"TCGA-%06d"' % i)). \
+            filter(var_f('n') > literal_f(i)).build()
+    qb.values(('f',), [('"TCGA-%06d.bam"' % i,) for i in range(branches)])
+    return str(qb.select('f').build())
+
+
+def main():
+    branches = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    text = typical()
+    number = 2000
+    elapsed = min(timeit.repeat(lambda: parse_blazegraph_query(text), number=number, repeat=5)) / number
+    print('typical query  %6d chars %8.1f us %10.0f queries/s' % (len(text), elapsed * 1e6, 1 / elapsed))
+
+    text = large(branches)
+    start = time.perf_counter()
+    parse_blazegraph_query(text)
+    elapsed = time.perf_counter() - start
+    print('%d branches %6.1f MB %8.1f ms %10.1f MB/s' % (branches, len(text) / 1e6, elapsed * 1e3,
+                                                      len(text) / 1e6 / elapsed))
+
+
+if __name__ == '__main__':
+    main()
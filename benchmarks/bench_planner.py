@@ -0,0 +1,59 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Estimated cost of the written order of triple patterns versus the order chosen by the statistics planner,
+# and the time it takes to plan. Statistics come from a JSON snapshot when one is given.
+#
+#   PYTHONPATH=. python benchmarks/bench_planner.py [statistics.json]
+
+import sys
+import timeit
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.blazegraph.planner import Planner, Statistics
+
+TCGA = 'https://www.sbgenomics.com/ontologies/2014/11/tcga#'
+
+STATISTICS = Statistics({'tcga:hasCase': {'triples': 2000000, 'subjects': 2000000, 'objects': 11000},
+                         'tcga:hasSample': {'triples': 2000000, 'subjects': 2000000, 'objects': 60000},
+                         'tcga:hasDiseaseType': {'triples': 11000, 'subjects': 11000, 'objects': 33},
+                         'tcga:hasDataFormat': {'triples': 2000000, 'subjects': 2000000, 'objects': 12},
+                         'tcga:hasSampleType': {'triples': 60000, 'subjects': 60000, 'objects': 19},
+                         'rdfs:label': {'triples': 2100000, 'subjects': 2100000, 'objects': 2050000}},
+                        {'tcga:File': 2000000, 'tcga:Case': 11000, 'tcga:Sample': 60000}, 12000000)
+
+
+def queries():
+    def builder():
+        return BlazegraphQueryBuilder().set_prefix(TCGA, 'tcga')
+
+    yield 'files by disease', builder() \
+        .axiom('f', 'a', 'tcga:File').axiom('f', 'tcga:hasCase', 'c') \
+        .axiom('c', 'tcga:hasDiseaseType', 'tcga:LUAD').select('f').build()
+    yield 'files by format and sample type', builder() \
+        .axiom('f', 'a', 'tcga:File').axiom('f', 'tcga:hasDataFormat', 'df') \
+        .axiom('df', 'rdfs:label', 'dfl').axiom('f', 'tcga:hasSample', 's') \
+        .axiom('s', 'tcga:hasSampleType', 'tcga:PrimaryTumor').axiom('s', 'a', 'tcga:Sample') \
+        .select('f', 'dfl').build()
+    yield 'cases with samples', builder() \
+        .axiom('s', 'tcga:hasSampleType', 'st').axiom('c', 'a', 'tcga:Case').axiom('s', 'a', 'tcga:Sample') \
+        .axiom('f', 'tcga:hasSample', 's').axiom('f', 'tcga:hasCase', 'c') \
+        .axiom('c', 'tcga:hasDiseaseType', 'tcga:BRCA').select('c', 'st').build()
+
+
+def main():
+    statistics = Statistics.from_json(sys.argv[1]) if len(sys.argv) > 1 else STATISTICS
+    planner = Planner(statistics)
+    for name, query in queries():
+        planned = planner.plan(query)
+        number = 200
+        elapsed = min(timeit.repeat(lambda: planner.plan(query), number=number, repeat=3)) / number
+        written = planner.cost(query)
+        chosen = planner.cost(planned)
+        print('%-32s written %12.4g  planned %12.4g  (%8.1fx)  plan %7.1f us'
+              % (name, written, chosen, written / max(chosen, 1e-9), elapsed * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Per-request cost of rebuilding a query for a new sample id versus re-binding a prepared query.
+#
+#   PYTHONPATH=. python benchmarks/bench_prepared.py
+
+import timeit
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.expression import *
+
+
+def build(sample, formats):
+    qb = BlazegraphQueryBuilder()
+    qb.axiom("f", "rdfs:label", var_f("fn")). \
+        bds_search("fn", sample, match_all_terms=True). \
+        axiom("f", "tcga:hasDataFormat", "df"). \
+        axiom(var_f("df"), "rdfs:label", "dfl"). \
+        filter(in_f(var_f("dfl"), formats)). \
+        filter_exists().axiom("f", "tcga:hasCase", "c").build(). \
+        select("f").limit(10). \
+        set_prefix("https://www.sbgenomics.com/ontologies/2014/11/tcga#", "tcga")
+    return qb.build()
+
+
+def per_call(fn, number=5000):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    prepared = build(param_f('sample'), param_f('formats')).prepare()
+    formats = ['BAM', 'BAI']
+    texts = ['"C500.TCGA-ZF-AA53-10A-01D-A394-08.2"', '"BAM"', '"BAI"']
+
+    rebuild = per_call(lambda: str(build(literal_f(texts[0]), literal_f(texts[1]))))
+    render = per_call(lambda: prepared.render(sample='C500.TCGA-ZF-AA53-10A-01D-A394-08.2', formats=formats))
+    join = per_call(lambda: ''.join(texts))
+    print('rebuild + str   %7.2f us' % rebuild)
+    print('prepared render %7.2f us' % render)
+    print('plain join      %7.2f us' % join)
+
+
+if __name__ == '__main__':
+    main()
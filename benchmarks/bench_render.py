@@ -0,0 +1,49 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Regression benchmark: render a ~1 MB Blazegraph query with a WITH section.
+# Also reports the cost of the second Template pass over the rendered text that
+# BlazegraphQuery used to run, for comparison.
+#
+#   PYTHONPATH=. python benchmarks/bench_render.py
+
+import timeit
+from string import Template
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.query_builder import QueryBuilder
+from sparqb.query_builder.expression import *
+
+TARGET_SIZE = 1024 * 1024
+
+
+def build_query(target_size=TARGET_SIZE):
+    branches = 1
+    while True:
+        qb = BlazegraphQueryBuilder()
+        qb.with_query('cases', QueryBuilder().axiom('c', 'rdf:type', 'tcga:Case').select('c').build())
+        for i in range(branches):
+            qb.union().axiom('a', 'tcga:hasCase', 'c').axiom('a', 'rdfs:label', 'l%d' % i).\
+                filter(var_f('l%d' % i) > literal_f('"sample-%d"' % i)).build()
+        qb.select('a').set_prefix('https://www.sbgenomics.com/ontologies/2014/11/tcga#', 'tcga')
+        query = qb.build()
+        if len(str(query)) >= target_size:
+            return query
+        branches *= 2
+
+
+def main():
+    query = build_query()
+    text = str(query)
+    number = 10
+    render = min(timeit.repeat(lambda: str(query), number=number, repeat=3)) / number
+    second_pass = min(timeit.repeat(lambda: Template(text).safe_substitute(with_query=''),
+                                    number=number, repeat=3)) / number
+    print('query size            %10d chars' % len(text))
+    print('render                %10.2f ms' % (render * 1e3))
+    print('removed template pass %10.2f ms' % (second_pass * 1e3))
+
+
+if __name__ == '__main__':
+    main()
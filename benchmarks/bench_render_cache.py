@@ -0,0 +1,58 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# build() + str() of the same query shape, with and without a RenderCache.
+# Keying a freshly built tree (one digest per node) costs more than rendering it, so a fresh
+# query renders without consulting its cache and build+str cached should match build+str.
+# Queries keyed already, such as those a result cache has looked up, are served from the cache.
+#
+#   PYTHONPATH=. python benchmarks/bench_render_cache.py
+
+import timeit
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.expression import *
+from sparqb.query_builder.render_cache import RenderCache
+
+
+def build(cache=None, cases=1):
+    qb = BlazegraphQueryBuilder()
+    for i in range(cases):
+        qb.axiom("a", "a", "tcga:Analyte"). \
+            union().axiom(var_f("a"), "a", uri_f("tcga:Aliquot")).build(). \
+            union().axiom("a", "a", "https://www.sbgenomics.com/ontologies/2014/11/tcga#Sample").build(). \
+            optional().axiom("a", "tcga:hasAmount", var_f("am")).build(). \
+            bind(bound_f("am"), "exists")
+    qb.group_by("type", var_f("exists")). \
+        select("type").select("exists").select(as_f(count_f(distinct_f('a')), "cnt")). \
+        set_prefix("https://www.sbgenomics.com/ontologies/2014/11/tcga#", "tcga")
+    if cache is not None:
+        qb.render_cache(cache)
+    return qb.build()
+
+
+def per_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    for cases in (1, 10, 100):
+        number = max(10, 2000 // cases)
+        cache = RenderCache()
+        query = build(cases=cases)
+        cached_query = build(cache, cases=cases)
+        cached_query.key()
+        print('%4d blocks  build %9.1f us  build+str %9.1f us  build+str cached %9.1f us  '
+              'str same object %7.1f us  keyed and cached %5.1f us'
+              % (cases,
+                 per_call(lambda: build(cases=cases), number),
+                 per_call(lambda: str(build(cases=cases)), number),
+                 per_call(lambda: str(build(cache, cases=cases)), number),
+                 per_call(lambda: str(query), number),
+                 per_call(lambda: str(cached_query), number)))
+        print('             %s' % cache.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Time and peak traced memory of reading a large application/sparql-results+json document with json.loads
+# versus iterating it in batches of dict rows with iter_rows and in typed column batches.
+#
+#   PYTHONPATH=. python benchmarks/bench_results.py [rows]
+
+import io
+import json
+import sys
+import time
+import tracemalloc
+
+from sparqb.results import XSD, iter_batches, iter_column_batches, iter_rows
+
+
+def document(total):
+    bindings = [{'f': {'type': 'uri', 'value': 'https://www.sbgenomics.com/ontologies/2014/11/tcga#File-%d' % i},
+                 'fn': {'type': 'literal', 'value': 'TCGA-%08d.bam' % i},
+                 'size': {'type': 'literal', 'datatype': XSD + 'integer', 'value': str(i * 1024)}}
+                for i in range(total)]
+    return json.dumps({'head': {'vars': ['f', 'fn', 'size']}, 'results': {'bindings': bindings}}).encode()
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    data = document(total)
+    print('%d rows, %.1f MB' % (total, len(data) / 1e6))
+
+    def loads():
+        return len(json.load(io.BytesIO(data))['results']['bindings'])
+
+    def streaming():
+        count = 0
+        for batch in iter_batches(iter_rows(io.BytesIO(data), 'application/sparql-results+json'), 1000):
+            count += len(batch)
+        return count
+
+    def columns():
+        count = 0
+        for batch in iter_column_batches(io.BytesIO(data), 'application/sparql-results+json',
+                                         [('f', None), ('fn', None), ('size', 'q')], 1000):
+            count += len(batch)
+        return count
+
+    for name, fn in (('json.load', loads), ('iter_rows', streaming), ('columns', columns)):
+        count, elapsed, peak = measure(fn)
+        print('%-10s %7d rows %8.1f ms  peak %7.1f MB' % (name, count, elapsed * 1e3, peak / 1e6))
+
+    for name, fn in (('iter_rows', streaming), ('columns', columns)):
+        start = time.perf_counter()
+        fn()
+        print('%-10s untraced %8.1f ms' % (name, (time.perf_counter() - start) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Serialization time for wide UNION blocks and nested OPTIONAL groups of growing size.
+# Time per branch should stay flat as the query grows.
+#
+#   PYTHONPATH=. python benchmarks/bench_serialize.py
+
+import io
+import time
+
+from sparqb.query_builder.query_builder import QueryBuilder
+
+
+def wide_union(branches):
+    qb = QueryBuilder()
+    for i in range(branches):
+        qb.union().axiom('a', 'rdf:type', 'tcga:Type%d' % i).axiom('a', 'tcga:hasCase', 'c').build()
+    return qb.build()
+
+
+def nested_optional(depth):
+    qb = QueryBuilder()
+    builder = qb
+    for i in range(depth):
+        builder = builder.optional().axiom('a', 'tcga:p%d' % i, 'v%d' % i)
+    for i in range(depth):
+        builder = builder.build()
+    return qb.build()
+
+
+def measure(query):
+    start = time.perf_counter()
+    text = str(query)
+    elapsed = time.perf_counter() - start
+    stream = io.StringIO()
+    start = time.perf_counter()
+    query.write_to(stream)
+    streamed = time.perf_counter() - start
+    return len(text), elapsed, streamed
+
+
+def main():
+    for size in (100, 1000, 10000, 50000):
+        length, elapsed, streamed = measure(wide_union(size))
+        print('union    %6d branches %9d chars  str %8.2f ms  write_to %8.2f ms  %6.2f us/branch'
+              % (size, length, elapsed * 1e3, streamed * 1e3, elapsed / size * 1e6))
+    for size in (50, 100, 200):
+        length, elapsed, streamed = measure(nested_optional(size))
+        print('optional %6d levels   %9d chars  str %8.2f ms  write_to %8.2f ms  %6.2f us/level'
+              % (size, length, elapsed * 1e3, streamed * 1e3, elapsed / size * 1e6))
+
+
+if __name__ == '__main__':
+    main()
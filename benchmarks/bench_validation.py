@@ -0,0 +1,73 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Per-call cost of IRI validation, compared against the previous implementation
+# which recompiled both regexes on every call.
+#
+#   PYTHONPATH=. python benchmarks/bench_validation.py
+
+import re
+import timeit
+
+from sparqb.query_builder.expression import UriExpression
+from sparqb.query_builder.query_builder import QueryBuilder
+from sparqb.query_builder.util import is_valid_uri
+
+TERMS = ['tcga:Aliquot', 'https://www.sbgenomics.com/ontologies/2014/11/tcga#Sample', 'a', 'rdfs:label']
+
+
+def legacy_is_valid_short(uri):
+    regex_short = re.compile(r'^[A-Z0-9_]*:[A-Z0-9_]+$', re.IGNORECASE)
+    return uri is not None and (regex_short.fullmatch(uri) is not None)
+
+
+def legacy_is_valid_url(url):
+    regex_url = re.compile(
+            r'^https?://'
+            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
+            r'localhost|'
+            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
+            r'(?::\d+)?'
+            r'(?:/?|[/?]\S+|\S+#?\S+)$', re.IGNORECASE)
+    return url is not None and (regex_url.fullmatch(url) is not None)
+
+
+def legacy_is_valid_uri(uri):
+    return uri is not None and (legacy_is_valid_short(uri) or legacy_is_valid_url(uri))
+
+
+def per_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e9
+
+
+def main():
+    number = 20000
+
+    legacy = per_call(lambda: [legacy_is_valid_uri(t) for t in TERMS], number) / len(TERMS)
+    current = per_call(lambda: [is_valid_uri(t) for t in TERMS], number) / len(TERMS)
+    print('is_valid_uri      legacy %8.0f ns/call   current %8.0f ns/call   x%.1f' % (legacy, current, legacy / current))
+
+    uri = TERMS[1]
+
+    def legacy_uri_roundtrip():
+        # validate in uri_f, UriExpression.__init__ and UriExpression._serialize
+        legacy_is_valid_uri(uri)
+        legacy_is_valid_uri(uri)
+        legacy_is_valid_short(uri)
+
+    legacy = per_call(legacy_uri_roundtrip, number)
+    current = per_call(lambda: str(UriExpression(uri)), number)
+    print('uri build+render  legacy %8.0f ns/call   current %8.0f ns/call' % (legacy, current))
+
+    def build_query():
+        qb = QueryBuilder()
+        for _ in range(1000):
+            qb.axiom('a', 'rdf:type', 'tcga:Aliquot')
+        return str(qb.build())
+
+    print('1000 axioms       current %8.3f ms/query' % (per_call(build_query, 20) / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+# Build and render cost of a VALUES block of sample ids, row tuples versus columns, and the cost of
+# splitting it into queries of 5000 rows with split_values versus building one query per chunk.
+#
+#   PYTHONPATH=. python benchmarks/bench_values.py [rows]
+
+import array
+import sys
+import timeit
+
+from sparqb.query_builder.query_builder import QueryBuilder
+
+
+def per_call(fn, number=5):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e3
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ids = ['TCGA-%06d' % i for i in range(total)]
+    counts = array.array('q', range(total))
+
+    def rows():
+        qb = QueryBuilder().values(('id', 'n'), [('"%s"' % i, n) for i, n in zip(ids, counts)])
+        return str(qb.build())
+
+    def columns():
+        qb = QueryBuilder().bulk_values(('id', 'n'), (ids, counts))
+        return str(qb.build())
+
+    print('%d rows' % total)
+    print('row tuples   %8.1f ms' % per_call(rows))
+    print('columns      %8.1f ms' % per_call(columns))
+
+    query = QueryBuilder().axiom('s', 'tcga:hasCase', 'c').bulk_values(('id', 'n'), (ids, counts)).\
+        select('s').build()
+
+    def rebuild():
+        return [str(QueryBuilder().axiom('s', 'tcga:hasCase', 'c').
+                    bulk_values(('id', 'n'), (ids[i:i + 5000], counts[i:i + 5000])).select('s').build())
+                for i in range(0, total, 5000)]
+
+    print('split rebuild %7.1f ms' % per_call(rebuild))
+    print('split_values  %7.1f ms' % per_call(lambda: list(query.split_values(5000))))
+    try:
+        import numpy
+    except ImportError:
+        return
+    numbers = numpy.arange(total, dtype=numpy.int64)
+    print('numpy column %8.1f ms' % per_call(lambda: str(QueryBuilder().bulk_values(('id', 'n'), (ids, numbers)).build())))
+
+
+if __name__ == '__main__':
+    main()
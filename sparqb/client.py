@@ -0,0 +1,573 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import asyncio
+import concurrent.futures
+import decimal
+import http.client
+import io
+import threading
+import urllib.parse
+
+from sparqb.query_builder.statement import Query, Statement
+from sparqb.results import READ_SIZE, iter_batches, iter_column_batches, iter_rows, result_columns, result_variables
+
+SPARQL_RESULTS_JSON = 'application/sparql-results+json'
+SPARQL_RESULTS_XML = 'application/sparql-results+xml'
+SPARQL_RESULTS_TSV = 'text/tab-separated-values'
+
+# errors after which a reused keep-alive connection is assumed stale and the request is sent once more
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest, BrokenPipeError,
+                            ConnectionResetError)
+
+
+def _split_endpoint(endpoint):
+    url = urllib.parse.urlsplit(endpoint)
+    if url.scheme not in ('http', 'https') or not url.hostname:
+        raise ValueError('unsupported endpoint %r' % endpoint)
+    path = url.path or '/'
+    if url.query:
+        path += '?' + url.query
+    return url.scheme, url.hostname, url.port, path
+
+
+def _query_text(query):
+    if isinstance(query, Statement):
+        return query.serialize()
+    if isinstance(query, str):
+        return query
+    raise TypeError
+
+
+class SparqlClientError(Exception):
+    def __init__(self, message, status=None, body=None):
+        super(SparqlClientError, self).__init__(message)
+        self.status = status
+        self.body = body
+
+
+class SparqlResponse(object):
+    """Response of a query; the connection goes back to the pool once the response is closed."""
+
+    def __init__(self, client, connection, response):
+        self._client = client
+        self._connection = connection
+        self._response = response
+
+    @property
+    def status(self):
+        return self._response.status
+
+    @property
+    def content_type(self):
+        return self._response.getheader('Content-Type', '')
+
+    def read(self, size=None):
+        return self._response.read(size)
+
+    def readinto(self, buffer):
+        return self._response.readinto(buffer)
+
+    def close(self):
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        # a partially read body cannot be skipped on a keep-alive connection
+        reusable = self._response.isclosed() and not self._response.will_close
+        self._response.close()
+        self._client._release(connection, reusable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _CachedResponse(io.BytesIO):
+    def __init__(self, content_type, body):
+        super(_CachedResponse, self).__init__(body)
+        self.content_type = content_type
+
+
+class _RecordingResponse(object):
+    # passes reads through and stores the body in the result cache once the response is read to the end
+    def __init__(self, response, cache, key):
+        self._response = response
+        self._cache = cache
+        self._key = key
+        self._chunks = []
+        self._size = 0
+
+    @property
+    def content_type(self):
+        return self._response.content_type
+
+    def read(self, size=None):
+        data = self._response.read(size)
+        if self._chunks is not None:
+            if data:
+                self._size += len(data)
+                if self._size > self._cache.max_entry_size:
+                    self._chunks = None
+                else:
+                    self._chunks.append(data)
+            if self._chunks is not None and (size is None or size < 0 or not data):
+                self._cache.put(self._key, self.content_type, b''.join(self._chunks))
+                self._chunks = None
+        return data
+
+    def close(self):
+        self._chunks = None
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SparqlClient(object):
+    """SPARQL 1.1 protocol client posting url-encoded queries over a pool of keep-alive connections.
+
+    At most pool_size requests are in flight at once; further callers wait up to pool_timeout seconds for
+    a connection. timeout applies to connecting and to every socket read. With a result_cache, execute,
+    select, select_columns and paginate serve repeated queries from it, unless built with no_cache().
+    """
+
+    def __init__(self, endpoint, pool_size=4, timeout=30.0, pool_timeout=None, accept=SPARQL_RESULTS_JSON,
+                 headers=None, ssl_context=None, result_cache=None):
+        if pool_size <= 0:
+            raise ValueError
+
+        self._endpoint = endpoint
+        self._scheme, self._host, self._port, self._path = _split_endpoint(endpoint)
+        self._timeout = timeout
+        self._pool_timeout = pool_timeout
+        self._accept = accept
+        self._headers = dict(headers or {})
+        self._ssl_context = ssl_context
+        self._result_cache = result_cache
+
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def endpoint(self):
+        return self._endpoint
+
+    def _new_connection(self):
+        if self._scheme == 'https':
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self._timeout,
+                                               context=self._ssl_context)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+
+    def _acquire(self):
+        if self._closed:
+            raise SparqlClientError('client is closed')
+        if not self._slots.acquire(timeout=self._pool_timeout):
+            raise SparqlClientError('no free connection to %s' % self._endpoint)
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _release(self, connection, reusable):
+        if reusable and not self._closed:
+            with self._lock:
+                self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def open(self, query, accept=None):
+        """Sends the query and returns the SparqlResponse, to be read and closed by the caller."""
+        body = urllib.parse.urlencode({'query': _query_text(query)})
+        headers = dict(self._headers)
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        headers['Accept'] = accept or self._accept
+
+        connection, reused = self._acquire()
+        try:
+            try:
+                connection.request('POST', self._path, body, headers)
+                response = connection.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                connection.close()
+                connection = self._new_connection()
+                connection.request('POST', self._path, body, headers)
+                response = connection.getresponse()
+        except (OSError, http.client.HTTPException) as error:
+            self._release(connection, False)
+            raise SparqlClientError('request to %s failed: %s' % (self._endpoint, error)) from error
+
+        result = SparqlResponse(self, connection, response)
+        if response.status >= 400:
+            with result:
+                text = result.read().decode('utf-8', 'replace')
+            raise SparqlClientError('%s returned %d %s' % (self._endpoint, response.status, response.reason),
+                                    response.status, text)
+        return result
+
+    def _open_cached(self, query, accept, cacheable=True):
+        # the response from the result cache, or one that stores its body there once it is read to the end
+        cache = self._result_cache
+        if cache is None or not cacheable or not getattr(query, 'cacheable', True):
+            return self.open(query, accept)
+        accept = accept or self._accept
+        key = cache.key(query, self._endpoint, accept)
+        entry = cache.get(key)
+        if entry is not None:
+            return _CachedResponse(*entry)
+        return _RecordingResponse(self.open(query, accept), cache, key)
+
+    def execute(self, query, accept=None):
+        """Sends the query and returns the whole response body as bytes."""
+        with self._open_cached(query, accept) as response:
+            try:
+                return response.read()
+            except (OSError, http.client.HTTPException) as error:
+                raise SparqlClientError('reading from %s failed: %s' % (self._endpoint, error)) from error
+
+    def select(self, query, batch_size=None, accept=None):
+        """Yields result rows, or lists of batch_size rows, as they arrive; the query is sent on the first next().
+
+        Rows are dicts keyed by the names of the query's select items.
+        """
+        variables = result_variables(query) if isinstance(query, Query) else None
+        return self._select(query, variables, batch_size, accept)
+
+    def _select(self, query, variables, batch_size, accept, cacheable=True):
+        with self._open_cached(query, accept, cacheable) as response:
+            rows = iter_rows(response, response.content_type or accept or self._accept, variables)
+            if batch_size is not None:
+                rows = iter_batches(rows, batch_size)
+            try:
+                yield from rows
+                # the tail after the last row, so the connection is reused and the body can be cached
+                while response.read(READ_SIZE):
+                    pass
+            except (OSError, http.client.HTTPException) as error:
+                raise SparqlClientError('reading from %s failed: %s' % (self._endpoint, error)) from error
+
+    def paginate(self, query, page_size, prefetch=False, accept=None, keyset=False):
+        """Yields the result of an ordered query page by page, as lists of at most page_size rows.
+
+        The query is rendered once with LIMIT and OFFSET as parameters; an own LIMIT or OFFSET bounds the
+        pages. With prefetch the next page is requested on a background thread while the current one is used.
+
+        keyset pages on the single, unique ORDER BY variable instead of OFFSET: every page after the first
+        filters on the last key seen, so deep pages cost as much as the first one. The key must be selected.
+        """
+        if page_size <= 0:
+            raise ValueError
+        if not isinstance(query, Query):
+            raise TypeError
+        for bound in (query.limit, query.offset):
+            if bound is not None and not isinstance(bound, int):
+                raise ValueError('paging needs an integer LIMIT and OFFSET')
+        variables = result_variables(query)
+        cacheable = query.cacheable
+
+        if not keyset:
+            template = query.paginated().prepare()
+            start = query.offset or 0
+
+            def page_text(fetched, last_row, size):
+                return template.render(limit=size, offset=start + fetched)
+        else:
+            first, after = query.keyset_paginated()
+            key_name = query.order_key[0].name
+            if variables is not None and key_name not in variables:
+                raise ValueError('keyset paging needs ?%s selected' % key_name)
+            first = first.prepare()
+            after_templates = {}
+
+            def page_text(fetched, last_row, size):
+                if last_row is None:
+                    return first.render(limit=size)
+                value = last_row[key_name]
+                by_string = not isinstance(value, (int, float, decimal.Decimal)) or isinstance(value, bool)
+                template = after_templates.get(by_string)
+                if template is None:
+                    template = after_templates[by_string] = query.keyset_paginated(by_string)[1].prepare()
+                return template.render(limit=size, after=value)
+
+        return self._pages(page_text, variables, query.limit, page_size, prefetch, accept, cacheable)
+
+    def _pages(self, page_text, variables, remaining, page_size, prefetch, accept, cacheable):
+        def fetch(text):
+            return list(self._select(text, variables, None, accept, cacheable))
+
+        def next_size():
+            return page_size if remaining is None else min(page_size, remaining)
+
+        executor = concurrent.futures.ThreadPoolExecutor(1) if prefetch else None
+        pending = None
+        fetched = 0
+        last_row = None
+        try:
+            while remaining is None or remaining > 0:
+                size = next_size()
+                page = fetch(page_text(fetched, last_row, size)) if pending is None else pending.result()
+                pending = None
+                fetched += len(page)
+                if page:
+                    last_row = page[-1]
+                if remaining is not None:
+                    remaining -= size
+                more = len(page) == size and (remaining is None or remaining > 0)
+                if more and executor is not None:
+                    pending = executor.submit(fetch, page_text(fetched, last_row, next_size()))
+                if page:
+                    yield page
+                if not more:
+                    return
+        finally:
+            if executor is not None:
+                if pending is not None:
+                    pending.cancel()
+                executor.shutdown(wait=True)
+
+    def select_columns(self, query, batch_size=65536, dtypes=None, accept=None):
+        """Yields ColumnBatch objects as rows arrive; column names and typecodes come from the query."""
+        columns = result_columns(query, dtypes) if isinstance(query, Query) else None
+        with self._open_cached(query, accept) as response:
+            batches = iter_column_batches(response, response.content_type or accept or self._accept, columns,
+                                          batch_size)
+            try:
+                yield from batches
+                while response.read(READ_SIZE):
+                    pass
+            except (OSError, http.client.HTTPException) as error:
+                raise SparqlClientError('reading from %s failed: %s' % (self._endpoint, error)) from error
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+async def _read_response(reader):
+    # returns status, reason, lower-cased headers, body and whether the connection can be reused
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError('connection closed before response')
+    version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    reusable = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+        reusable = False
+    return int(status), reason, headers, body, reusable
+
+
+class AsyncSparqlClient(object):
+    """asyncio counterpart of SparqlClient, speaking HTTP/1.1 over asyncio streams.
+
+    A query that is cancelled or times out while its request is in flight is also cancelled on the server
+    when it carries a query id (BlazegraphSubqueryBuilder.query_id), by POSTing to cancel_url, a format
+    string with a {query_id} field which defaults to the Blazegraph cancelQuery request on the endpoint.
+    With a result_cache, execute serves repeated queries from it, unless built with no_cache().
+    """
+
+    def __init__(self, endpoint, pool_size=8, timeout=30.0, accept=SPARQL_RESULTS_JSON, headers=None,
+                 ssl_context=None, cancel_url=None, result_cache=None):
+        if pool_size <= 0:
+            raise ValueError
+
+        self._endpoint = endpoint
+        self._scheme, self._host, self._port, self._path = _split_endpoint(endpoint)
+        self._timeout = timeout
+        self._accept = accept
+        self._headers = dict(headers or {})
+        self._ssl_context = ssl_context
+        if cancel_url is None:
+            cancel_url = endpoint + ('&' if '?' in endpoint else '?') + 'cancelQuery&queryId={query_id}'
+        self._cancel_url = cancel_url
+        self._result_cache = result_cache
+
+        self._slots = asyncio.Semaphore(pool_size)
+        self._idle = []
+        self._cancellations = set()
+        self._closed = False
+
+    @property
+    def endpoint(self):
+        return self._endpoint
+
+    async def _connect(self, scheme, host, port):
+        if scheme == 'https':
+            return await asyncio.open_connection(host, port or 443, ssl=self._ssl_context or True)
+        return await asyncio.open_connection(host, port or 80)
+
+    async def _exchange(self, reader, writer, host, path, body, headers):
+        lines = ['POST %s HTTP/1.1' % path, 'Host: %s' % host, 'Content-Length: %d' % len(body)]
+        lines.extend('%s: %s' % item for item in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+        return await _read_response(reader)
+
+    def _host_header(self):
+        return self._host if self._port is None else '%s:%d' % (self._host, self._port)
+
+    async def _send(self, text, accept, query_id):
+        body = urllib.parse.urlencode({'query': text}).encode()
+        headers = dict(self._headers)
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        headers['Accept'] = accept or self._accept
+
+        async with self._slots:
+            connection = None
+            reusable = False
+            try:
+                if self._idle:
+                    connection = self._idle.pop()
+                    try:
+                        result = await self._exchange(*connection, self._host_header(), self._path, body, headers)
+                    except (ConnectionError, asyncio.IncompleteReadError):
+                        # stale keep-alive connection, send once more on a fresh one
+                        connection[1].close()
+                        connection = None
+                if connection is None:
+                    connection = await self._connect(self._scheme, self._host, self._port)
+                    result = await self._exchange(*connection, self._host_header(), self._path, body, headers)
+                status, reason, response_headers, content, reusable = result
+            except asyncio.CancelledError:
+                if query_id is not None and connection is not None:
+                    self._cancel_in_background(query_id)
+                raise
+            except (OSError, asyncio.IncompleteReadError, ValueError) as error:
+                raise SparqlClientError('request to %s failed: %s' % (self._endpoint, error)) from error
+            finally:
+                if connection is not None:
+                    if reusable and not self._closed:
+                        self._idle.append(connection)
+                    else:
+                        connection[1].close()
+
+        if status >= 400:
+            raise SparqlClientError('%s returned %d %s' % (self._endpoint, status, reason), status,
+                                    content.decode('utf-8', 'replace'))
+        return content, response_headers.get('content-type', '')
+
+    async def execute(self, query, accept=None, timeout=None):
+        """Sends the query and returns the response body; timeout covers waiting for a connection too."""
+        if self._closed:
+            raise SparqlClientError('client is closed')
+        text = _query_text(query)
+        query_id = getattr(query, 'query_id', None) if isinstance(query, Statement) else None
+        timeout = self._timeout if timeout is None else timeout
+
+        key = None
+        if self._result_cache is not None and getattr(query, 'cacheable', True):
+            key = self._result_cache.key(query, self._endpoint, accept or self._accept)
+            entry = self._result_cache.get(key)
+            if entry is not None:
+                return entry[1]
+        try:
+            content, content_type = await asyncio.wait_for(self._send(text, accept, query_id), timeout)
+        except asyncio.TimeoutError as error:
+            raise SparqlClientError('query to %s timed out after %s s' % (self._endpoint, timeout)) from error
+        if key is not None:
+            self._result_cache.put(key, content_type, content)
+        return content
+
+    async def execute_many(self, queries, concurrency=8, accept=None, timeout=None, return_exceptions=False):
+        """Runs the queries with at most concurrency in flight and returns their results in order.
+
+        Unless return_exceptions is set, the first failure cancels the queries still running and is raised.
+        """
+        if concurrency <= 0:
+            raise ValueError
+        limit = asyncio.Semaphore(concurrency)
+
+        async def bounded(query):
+            async with limit:
+                return await self.execute(query, accept, timeout)
+
+        tasks = [asyncio.ensure_future(bounded(query)) for query in queries]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def cancel(self, query_id):
+        """Asks the server to cancel the running query with the given id."""
+        url = self._cancel_url.format(query_id=urllib.parse.quote(str(query_id), safe=''))
+        scheme, host, port, path = _split_endpoint(url)
+        reader, writer = await self._connect(scheme, host, port)
+        try:
+            headers = dict(self._headers)
+            headers['Connection'] = 'close'
+            host_header = host if port is None else '%s:%d' % (host, port)
+            status, reason, _, content, _ = await asyncio.wait_for(
+                self._exchange(reader, writer, host_header, path, b'', headers), self._timeout)
+        finally:
+            writer.close()
+        if status >= 400:
+            raise SparqlClientError('cancelling %s returned %d %s' % (query_id, status, reason), status,
+                                    content.decode('utf-8', 'replace'))
+
+    def _cancel_in_background(self, query_id):
+        async def cancel_quietly():
+            try:
+                await self.cancel(query_id)
+            except (OSError, SparqlClientError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                pass
+
+        task = asyncio.ensure_future(cancel_quietly())
+        self._cancellations.add(task)
+        task.add_done_callback(self._cancellations.discard)
+
+    async def close(self):
+        """Closes idle connections and waits for pending server-side cancellations."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        if self._cancellations:
+            await asyncio.gather(*list(self._cancellations), return_exceptions=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -0,0 +1,84 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+from .blazegraph_query_hints import Optimizer
+from .blazegraph_statement import *
+from ..parser import SparqlParser
+
+BDS = 'http://www.bigdata.com/rdf/search#'
+
+_HINTS = {
+    'hint:queryId': QueryIdStatement,
+    'hint:chunkSize': QueryChunkSizeStatement,
+    'hint:maxParallel': QueryMaxParallelStatement,
+}
+
+
+class BlazegraphSparqlParser(SparqlParser):
+    """SparqlParser that also reads named subqueries (WITH ... AS %name), INCLUDE %name, query hints and
+    full text search services into the matching Blazegraph statements."""
+
+    query_cls = BlazegraphQuery
+
+    def _query_clauses(self, query):
+        with_statements = []
+        while self._accept('WITH'):
+            self._expect('{')
+            subquery = self._query(subquery=True)
+            self._expect('}')
+            self._expect('AS')
+            with_statements.append(WithStatement(self._expect_kind('name')[1:], subquery))
+        if with_statements:
+            query._with_statements = tuple(with_statements)
+
+    def _query(self, subquery=False):
+        query = super(BlazegraphSparqlParser, self)._query(subquery)
+        if not subquery:
+            query._with_statements = tuple(query._with_statements)
+        return query
+
+    def _extension_pattern(self, statements):
+        if self._accept('INCLUDE'):
+            statements.append(IncludeStatement(self._expect_kind('name')[1:]))
+            return True
+        return False
+
+    def _axiom(self, s, p, o):
+        if str(s) == 'hint:Query' and isinstance(o, LiteralExpression):
+            value = str(o)
+            if value.startswith('"') and value.endswith('"') and '"' not in value[1:-1]:
+                value = value[1:-1]
+                if p in _HINTS:
+                    return _HINTS[p](value)
+                if p == 'hint:optimizer' and value in set(optimizer.value for optimizer in Optimizer):
+                    return QueryOptimizerStatement(Optimizer(value))
+        return super(BlazegraphSparqlParser, self)._axiom(s, p, o)
+
+    def _service(self, uri, statements):
+        search = self._search(uri, statements)
+        if search is not None:
+            return search
+        return super(BlazegraphSparqlParser, self)._service(uri, statements)
+
+    def _search(self, uri, statements):
+        # the exact shape BDSSearchStatement renders: search, matchAllTerms and optionally relevance patterns
+        if uri != BDS + 'search' or not 2 <= len(statements) <= 3 or \
+                any(type(statement) is not AxiomStatement for statement in statements):
+            return None
+        variable = statements[0]._s
+        predicates = [self._iri_text(('iri' if statement._p.startswith('<') else 'pname', statement._p))
+                      for statement in statements]
+        if not isinstance(variable, VariableExpression) or any(statement._s is not variable
+                                                               for statement in statements) or \
+                predicates[:2] != [BDS + 'search', BDS + 'matchAllTerms'] or \
+                predicates[2:] not in ([], [BDS + 'relevance']) or \
+                str(statements[1]._o) not in ('"true"', '"false"'):
+            return None
+        value = statements[0]._o
+        relevance = str(statements[2]._o) if len(statements) > 2 else None
+        return BDSSearchStatement(variable, value, str(statements[1]._o) == '"true"', relevance)
+
+
+def parse_blazegraph_query(text):
+    return BlazegraphSparqlParser().parse(text)
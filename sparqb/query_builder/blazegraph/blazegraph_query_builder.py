@@ -4,10 +4,14 @@ __copyright__ = 'Copyright (c) 2016 Seven Bridges Genomics'
 
 from .blazegraph_query_hints import Optimizer
 from .blazegraph_statement import *
+from ..optimizer import optimize as optimize_query
 from ..query_builder import *
 
 
 class BlazegraphSubqueryBuilder(QueryBuilder):
+    # only the top level query has named subqueries
+    _with_statements = ()
+
     def __init__(self, parent_builder=None):
         self._query_id = None
         self._query_chunk_size = None
@@ -55,6 +59,11 @@ class BlazegraphSubqueryBuilder(QueryBuilder):
     def include(self, name=None):
         self._plug_statement(IncludeStatement(name))
 
+    def _build_query(self):
+        query = super(BlazegraphSubqueryBuilder, self)._build_query()
+        query._with_statements = self._with_statements
+        return query
+
     def build(self):
         if self._query_id is not None:
             self._plug_statement(QueryIdStatement(self._query_id))
@@ -69,17 +78,25 @@ class BlazegraphQueryBuilder(BlazegraphSubqueryBuilder):
         super(BlazegraphQueryBuilder, self).__init__()
         self._with_statements = []
 
+    def _unshare(self):
+        super(BlazegraphQueryBuilder, self)._unshare()
+        self._with_statements = list(self._with_statements)
+
+    def _plug_with_statement(self, statement: WithStatement):
+        if self._shared:
+            self._unshare()
+        self._with_statements.append(statement)
+
     def with_query(self, name, query=None):
         if query is None:
             return NamedSubqueryBuilder(name, self)
         else:
-            self._with_statements.append(WithStatement(name, query))
+            self._plug_with_statement(WithStatement(name, query))
         return self
 
-    def build(self):
+    def build(self, optimize=False):
         query = super(BlazegraphQueryBuilder, self).build()
-        query._with_statements = self._with_statements
-        return query
+        return optimize_query(query) if optimize else query
 
 
 class NamedSubqueryBuilder(BlazegraphSubqueryBuilder):
@@ -87,23 +104,8 @@ class NamedSubqueryBuilder(BlazegraphSubqueryBuilder):
         super(NamedSubqueryBuilder, self).__init__(parent_builder=parent_builder)
         self._name = name
 
-    def build(self):
-        query = self._query_cls()
-        query._select = self._select
-        query._is_distinct = self._is_distinct
-        query._order_by = self._order_by
-        query._group_by = self._group_by
-        query._having = self._having
-        query._statements = self.statements
-        query._prefixes = self._prefixes
-        query._limit = self._limit
-        query._offset = self._offset
-
-        query._deletes = self._deletes
-        query._inserts = self._inserts
-
-        self._parent_builder._with_statements.append(WithStatement(self._name, query))
-        return self._parent_builder
+    def _plug_into_parent(self, query):
+        self._parent_builder._plug_with_statement(WithStatement(self._name, query))
 
 
 class BlazegraphCompoundStatementBuilder(BlazegraphSubqueryBuilder):
@@ -114,7 +116,4 @@ class BlazegraphCompoundStatementBuilder(BlazegraphSubqueryBuilder):
         super(BlazegraphCompoundStatementBuilder, self).__init__()
 
     def build(self):
-        statement = self._statement_cls(*self._cls_args)
-        statement._statements = self.statements
-        self._parent_builder._plug_statement(statement)
-        return self._parent_builder
+        return self._build_group(self._statement_cls(*self._cls_args))
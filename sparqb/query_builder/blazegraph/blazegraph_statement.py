@@ -2,13 +2,18 @@ __author__ = 'Adam Stanojevic <adam.stanojevic@sbgenomics.com>'
 __date__ = '07 March 2016'
 __copyright__ = 'Copyright (c) 2016 Seven Bridges Genomics'
 
+from ..codec import FIRST_EXTENSION_TAG, register_node
 from ..statement import *
-from string import Template
+
 
 class BlazegraphQuery(Query):
+    __slots__ = ('_with_statements',)
+
+    _sections = ('prefixes', 'select', 'with', 'where', 'group_by', 'having', 'order_by', 'limit', 'offset')
+
     def __init__(self):
         super(BlazegraphQuery, self).__init__()
-        self._query_template = Template('$prefixes$select$$with_query$where$group_by$having$order_by$limit$offset')
+        self._with_statements = []
 
     @property
     def type(self):
@@ -24,28 +29,26 @@ class BlazegraphQuery(Query):
                 break
         return result
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        # with section
-        with_section = ''
-        if hasattr(self, '_with_statements'):
-            for statement in self._with_statements:
-                with_section += str(statement)
-
-        return Template(super(BlazegraphQuery, self)._serialize()).substitute(with_query=with_section)
-
-    def key(self):
-        ws = tuple(sorted(str(ws) for ws in self._with_statements))
+    def _write_with(self, write):
+        for statement in self._with_statements:
+            statement._write(write)
 
-        return hash(ws) ^ super(BlazegraphQuery, self).key()
+    def _key_parts(self):
+        return (self._with_statements,) + super(BlazegraphQuery, self)._key_parts()
 
 
 class BDSSearchStatement(ServiceStatement):
+    __slots__ = ()
+
     def __init__(self, variable: VariableExpression, value, match_all_terms=True, relevance=None):
         uri = "http://www.bigdata.com/rdf/search#search"
 
-        search_value = '"%s"' % value
+        if isinstance(value, Expression):
+            search_value = value
+        else:
+            search_value = literal_f('"%s"' % value)
 
-        statements = [AxiomStatement(variable, "<http://www.bigdata.com/rdf/search#search>", literal_f(search_value))]
+        statements = [AxiomStatement(variable, "<http://www.bigdata.com/rdf/search#search>", search_value)]
 
         if match_all_terms:
             statements.append(AxiomStatement(variable,
@@ -62,6 +65,8 @@ class BDSSearchStatement(ServiceStatement):
 
 
 class QueryIdStatement(AxiomStatement):
+    __slots__ = ('_id',)
+
     def __init__(self, query_id):
         self._id = query_id
         super(QueryIdStatement, self).__init__('hint:Query', 'hint:queryId', '"' + str(query_id) + '"')
@@ -72,56 +77,71 @@ class QueryIdStatement(AxiomStatement):
 
 
 class QueryChunkSizeStatement(AxiomStatement):
+    __slots__ = ()
+
     def __init__(self, query_chunk_size):
         super(QueryChunkSizeStatement, self).__init__('hint:Query', 'hint:chunkSize', '"' + str(query_chunk_size) + '"')
 
 
 class QueryMaxParallelStatement(AxiomStatement):
+    __slots__ = ()
+
     def __init__(self, query_max_parallel):
         super(QueryMaxParallelStatement, self).__init__('hint:Query', 'hint:maxParallel', '"' + str(query_max_parallel) + '"')
 
 
 class QueryOptimizerStatement(AxiomStatement):
+    __slots__ = ()
+
     def __init__(self, optimizer):
         super(QueryOptimizerStatement, self).__init__('hint:Query', 'hint:optimizer', '"' + optimizer.value + '"')
 
 
 class SolutionSetStatement(Statement):
+    __slots__ = ('_solution_set',)
+
     def __init__(self, solution_set):
         super(SolutionSetStatement, self).__init__()
         self._solution_set = solution_set
 
-    def key(self):
-        return hash(str(self._solution_set))
+    def _key_parts(self):
+        return (self._solution_set,)
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        return ' INCLUDE %' + str(self._solution_set) + ' \n'
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write(' INCLUDE %' + str(self._solution_set) + ' \n')
 
 
 class IncludeStatement(Statement):
+    __slots__ = ('_name',)
+
     def __init__(self, name):
         super(IncludeStatement, self).__init__()
         self._name = name
 
-    def key(self):
-        return hash(str(self._name))
+    def _key_parts(self):
+        return (self._name,)
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        return ' INCLUDE %' + str(self._name) + ' \n'
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write(' INCLUDE %' + str(self._name) + ' \n')
 
 
 class WithStatement(CompoundStatement):
+    __slots__ = ('_name',)
+
     def __init__(self, name, *statements):
         super(WithStatement, self).__init__(*statements)
         self._name = name
 
-    def key(self):
-        return hash('with') ^ hash(str(self._name)) ^ super(WithStatement, self).key()
-
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        result = '\nWITH\n' + super(WithStatement, self)._serialize() + 'AS %' + self._name + '\n'
-        return result
-
+    def _key_parts(self):
+        return (self._name,) + super(WithStatement, self)._key_parts()
 
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write('\nWITH\n')
+        super(WithStatement, self)._write(write)
+        write('AS %' + self._name + '\n')
 
 
+for _tag, _cls in enumerate((BlazegraphQuery, BDSSearchStatement, QueryIdStatement, QueryChunkSizeStatement,
+                             QueryMaxParallelStatement, QueryOptimizerStatement, SolutionSetStatement,
+                             IncludeStatement, WithStatement), FIRST_EXTENSION_TAG):
+    register_node(_tag, _cls)
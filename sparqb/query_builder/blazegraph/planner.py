@@ -0,0 +1,269 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import csv
+import json
+
+from .blazegraph_query_hints import Optimizer
+from .blazegraph_statement import *
+from ..expression import *
+from ..query_builder import QueryBuilder
+from ..tree import replace, term_variable, transform, variable_names, walk
+
+RDF_TYPE = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#type'
+
+# runs up to this many triple patterns get an exhaustive search, longer ones a greedy one
+EXHAUSTIVE_RUN_SIZE = 8
+
+
+class Statistics(object):
+    """Cardinalities of a store: triples per predicate and instances per class, keyed by IRI or prefixed name.
+
+    A predicate maps to its triple count, or to a dict with 'triples' and optionally 'subjects' and 'objects',
+    the numbers of distinct subjects and objects.
+    """
+
+    def __init__(self, predicates=None, classes=None, triples=None):
+        self._predicates = {}
+        for predicate, counts in (predicates or {}).items():
+            if not isinstance(counts, dict):
+                counts = {'triples': counts}
+            self._predicates[predicate] = (counts['triples'], counts.get('subjects'), counts.get('objects'))
+        self._classes = dict(classes or {})
+        if triples is None:
+            triples = sum(counts[0] for counts in self._predicates.values())
+        self._triples = max(triples, 1)
+
+    @property
+    def triples(self):
+        return self._triples
+
+    def predicate(self, iri):
+        """(triples, distinct subjects, distinct objects) of a predicate; unknown distinct counts are None."""
+        return self._predicates.get(iri)
+
+    def instances(self, iri):
+        return self._classes.get(iri)
+
+    def to_dict(self):
+        predicates = {}
+        for predicate, (triples, subjects, objects) in self._predicates.items():
+            counts = {'triples': triples}
+            if subjects is not None:
+                counts['subjects'] = subjects
+            if objects is not None:
+                counts['objects'] = objects
+            predicates[predicate] = counts
+        return {'triples': self._triples, 'predicates': predicates, 'classes': dict(self._classes)}
+
+    @classmethod
+    def from_dict(cls, snapshot):
+        return cls(snapshot.get('predicates'), snapshot.get('classes'), snapshot.get('triples'))
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path) as snapshot:
+            return cls.from_dict(json.load(snapshot))
+
+    def to_json(self, path):
+        with open(path, 'w') as snapshot:
+            json.dump(self.to_dict(), snapshot, indent=1, sort_keys=True)
+
+    @classmethod
+    def from_csv(cls, path):
+        """Reads rows of kind,iri,count[,subjects,objects] where kind is predicate or class."""
+        predicates = {}
+        classes = {}
+        with open(path, newline='') as snapshot:
+            for row in csv.reader(snapshot):
+                if not row or row[0] not in ('predicate', 'class'):
+                    continue
+                if row[0] == 'class':
+                    classes[row[1]] = int(row[2])
+                else:
+                    counts = {'triples': int(row[2])}
+                    for name, value in zip(('subjects', 'objects'), row[3:5]):
+                        if value:
+                            counts[name] = int(value)
+                    predicates[row[1]] = counts
+        return cls(predicates, classes)
+
+    @classmethod
+    def from_client(cls, client):
+        """Counts predicates and classes with two aggregate queries sent through a SparqlClient."""
+        count = as_f(count_f('*'), 'count')
+        predicates = {}
+        query = QueryBuilder().axiom('s', '?p', 'o').select('p', count, as_f(FunctionExpression(
+            'COUNT', distinct_f('s')), 'subjects'), as_f(FunctionExpression('COUNT', distinct_f('o')), 'objects')) \
+            .group_by('p').build()
+        for row in client.select(query):
+            predicates[row['p']] = {'triples': int(row['count']), 'subjects': int(row['subjects']),
+                                    'objects': int(row['objects'])}
+        query = QueryBuilder().axiom('s', 'a', 'c').select('c', count).group_by('c').build()
+        classes = dict((row['c'], int(row['count'])) for row in client.select(query))
+        return cls(predicates, classes)
+
+
+class Planner(object):
+    """Orders the triple patterns of each group by estimated cost and pins the order with hint:optimizer None.
+
+    A pattern's estimate is the number of triples of its predicate (or instances of its class), divided by
+    the distinct subjects or objects when those are bound by a constant or an earlier pattern. The cost of an
+    order is the sum of the estimated intermediate result sizes of joining the patterns left to right.
+    """
+
+    def __init__(self, statistics: Statistics):
+        self._statistics = statistics
+
+    def plan(self, query: Query):
+        """New query with planned pattern order and the optimizer hint; the given query is left unchanged."""
+        prefixes = query._prefixes
+        planned = transform(query, lambda node: self._plan_group(node, prefixes))
+        statements = tuple(statement for statement in planned._statements
+                           if not isinstance(statement, QueryOptimizerStatement))
+        return replace(planned, _statements=(QueryOptimizerStatement(Optimizer.none),) + statements)
+
+    def cost(self, query: Query):
+        """Estimated cost of evaluating the query's triple patterns in the order they are written."""
+        return sum(self._run_cost(run, bound, query._prefixes)
+                   for node in walk(query) if _is_planned_group(node)
+                   for _, run, bound in _runs(node._statements))
+
+    def estimate(self, axiom, bound=(), prefixes=None):
+        """Estimated number of matches of a triple pattern when the variables in bound are already known."""
+        prefixes = prefixes or {}
+        subject_bound = _is_bound(axiom._s, bound)
+        object_bound = _is_bound(axiom._o, bound)
+        counts = None
+        if term_variable(axiom._p) is None:
+            if _expand(axiom._p, prefixes) == RDF_TYPE and term_variable(axiom._o) is None:
+                instances = _lookup(self._statistics.instances, axiom._o, prefixes)
+                if instances is not None:
+                    # a typed subject that is already known is only checked
+                    return 1.0 if subject_bound else float(instances)
+            counts = _lookup(self._statistics.predicate, axiom._p, prefixes)
+
+        if counts is None:
+            # unknown and variable predicates may match any triple
+            triples, subjects, objects = self._statistics.triples, None, None
+        else:
+            triples, subjects, objects = counts
+        estimate = float(triples)
+        if subject_bound:
+            estimate /= subjects or triples or 1
+        if object_bound:
+            estimate /= objects or triples or 1
+        return estimate
+
+    def _plan_group(self, node, prefixes):
+        if not _is_planned_group(node):
+            return node
+        statements = list(node._statements)
+        for start, run, bound in _runs(node._statements):
+            statements[start:start + len(run)] = self._best_order(run, bound, prefixes)
+        if all(new is old for new, old in zip(statements, node._statements)):
+            return node
+        return replace(node, _statements=tuple(statements))
+
+    def _run_cost(self, run, bound, prefixes):
+        # sum of the sizes of the intermediate results of joining run left to right
+        bound = set(bound)
+        size = 1.0
+        cost = 0.0
+        for axiom in run:
+            size *= self.estimate(axiom, bound, prefixes)
+            cost += size
+            bound.update(variable_names(axiom))
+        return cost
+
+    def _best_order(self, run, bound, prefixes):
+        if len(run) < 2:
+            return run
+        variables = [frozenset(variable_names(axiom)) for axiom in run]
+        estimates = {}
+
+        def estimate(index, known):
+            # the estimate of a pattern only depends on whether its subject and object are known
+            axiom = run[index]
+            key = (index, _is_bound(axiom._s, known), _is_bound(axiom._o, known))
+            if key not in estimates:
+                estimates[key] = self.estimate(axiom, known, prefixes)
+            return estimates[key]
+
+        if len(run) > EXHAUSTIVE_RUN_SIZE:
+            known = set(bound)
+            remaining = list(range(len(run)))
+            ordered = []
+            while remaining:
+                best = min(remaining, key=lambda index: estimate(index, known))
+                remaining.remove(best)
+                ordered.append(run[best])
+                known |= variables[best]
+            return ordered
+
+        # depth first over the orders, cheapest next pattern first, cutting orders that already cost more
+        best = [float('inf'), None]
+
+        def search(order, known, size, cost):
+            if cost >= best[0]:
+                return
+            if len(order) == len(run):
+                best[:] = [cost, order]
+                return
+            candidates = [index for index in range(len(run)) if index not in order]
+            for index in sorted(candidates, key=lambda index: estimate(index, known)):
+                next_size = size * estimate(index, known)
+                search(order + [index], known | variables[index], next_size, cost + next_size)
+
+        search([], frozenset(bound), 1.0, 0.0)
+        return [run[index] for index in best[1]]
+
+
+def _is_planned_group(node):
+    # services are evaluated remotely and keep their patterns as written
+    return isinstance(node, CompoundStatement) and not isinstance(node, ServiceStatement)
+
+
+def _runs(statements):
+    """Yields (start, triple patterns, variables bound before) for the runs of plain triple patterns."""
+    bound = set()
+    run = []
+    for index, statement in enumerate(tuple(statements) + (None,)):
+        # hints are axiom subclasses, so only plain triple patterns are moved
+        if type(statement) is AxiomStatement:
+            run.append(statement)
+            continue
+        if run:
+            yield index - len(run), run, frozenset(bound)
+            for axiom in run:
+                bound.update(variable_names(axiom))
+            run = []
+        if statement is not None:
+            bound.update(variable_names(statement))
+
+
+def _is_bound(term, bound):
+    name = term_variable(term)
+    return name is None or name in bound
+
+
+def _expand(term, prefixes):
+    # full IRI of a constant term where its prefix is known
+    text = str(term)
+    if text == 'a' or text == 'rdf:type':
+        return RDF_TYPE
+    if text.startswith('<') and text.endswith('>'):
+        return text[1:-1]
+    prefix, _, local = text.partition(':')
+    if prefix in prefixes:
+        return prefixes[prefix] + local
+    return text
+
+
+def _lookup(getter, term, prefixes):
+    # snapshots may be keyed by full IRIs or by the prefixed names used in queries
+    value = getter(_expand(term, prefixes))
+    if value is None:
+        value = getter(str(term))
+    return value
@@ -0,0 +1,121 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import re
+
+from .statement import *
+from .tree import has_fixed_join_order, replace, term_variable, transform, variable_names
+
+_VARIABLE_NAME = re.compile(r'[A-Za-z0-9_]\w*\Z')
+
+
+def canonicalize(query: Query):
+    """Equivalent query in a canonical form, so that queries which differ only in naming or order share a key.
+
+    Variables that are not projected are renamed to ?v0, ?v1, ... in order of first appearance, prefixes are
+    sorted, runs of adjacent triple patterns are sorted and duplicate patterns inside a run are dropped.
+    Projected variables keep their names since they are the column names of the result. Filters, binds and
+    nested groups stay where they are and split the runs; with a fixed join order (hint:optimizer) triple
+    patterns keep their order too.
+    """
+    projected = _projected_names(query)
+    if projected is None:
+        internal = set()
+    else:
+        internal = set(name for name in variable_names(query)
+                       if name not in projected and _VARIABLE_NAME.match(name))
+    fixed_order = has_fixed_join_order(query)
+
+    if not fixed_order:
+        # a naming-independent order first, so that renaming by first appearance does not depend on the names
+        query = transform(query, lambda node: _sort_runs(node, _abstract_key(internal), dedupe=False))
+
+    renames = {}
+    counter = 0
+    for name in variable_names(query):
+        if name in internal and name not in renames:
+            while 'v%d' % counter in projected:
+                counter += 1
+            renames[name] = 'v%d' % counter
+            counter += 1
+    if renames:
+        query = transform(query, lambda node: _rename(node, renames))
+
+    query = transform(query, lambda node: _sort_runs(node, None if fixed_order else str, dedupe=True))
+    return replace(query, _prefixes=dict(sorted(query._prefixes.items())))
+
+
+def canonical_key(query: Query):
+    return canonicalize(query).key()
+
+
+def _projected_names(query):
+    # None when the query projects all of its variables
+    names = set()
+    for item in query.select_items:
+        if isinstance(item, StarExpression):
+            return None
+        if isinstance(item, VariableExpression):
+            names.add(item.name)
+        elif isinstance(item, AsExpression):
+            names.add(item.variable.name)
+    return names if names else None
+
+
+def _abstract_key(internal):
+    def term_key(term):
+        name = term_variable(term)
+        if name is None:
+            return str(term)
+        return '?' if name in internal else '?' + name
+
+    def key(axiom):
+        return (term_key(axiom._s), term_key(axiom._p), term_key(axiom._o))
+
+    return key
+
+
+def _rename(node, renames):
+    if isinstance(node, VariableExpression):
+        if node.name in renames:
+            return var_f(renames[node.name])
+    elif isinstance(node, AxiomStatement):
+        changes = {}
+        for field in ('_s', '_p', '_o'):
+            term = getattr(node, field)
+            if isinstance(term, str) and term_variable(term) in renames:
+                changes[field] = '?' + renames[term_variable(term)]
+        if changes:
+            return replace(node, **changes)
+    return node
+
+
+def _sort_runs(node, key, dedupe):
+    # services are evaluated remotely and keep their patterns as written
+    if not isinstance(node, CompoundStatement) or isinstance(node, ServiceStatement):
+        return node
+    statements = []
+    run = []
+    for statement in tuple(node._statements) + (None,):
+        # hints are axiom subclasses, so only plain axioms are moved
+        if type(statement) is AxiomStatement:
+            run.append(statement)
+            continue
+        if key is not None:
+            run.sort(key=key)
+        if dedupe:
+            seen = set()
+            for axiom in run:
+                text = str(axiom)
+                if text not in seen:
+                    seen.add(text)
+                    statements.append(axiom)
+        else:
+            statements.extend(run)
+        run = []
+        if statement is not None:
+            statements.append(statement)
+    if len(statements) == len(node._statements) and all(new is old for new, old in zip(statements, node._statements)):
+        return node
+    return replace(node, _statements=tuple(statements))
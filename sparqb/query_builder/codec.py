@@ -0,0 +1,342 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import array
+import collections.abc
+import decimal
+import struct
+
+from .statement import *
+from .tree import node_fields
+
+# Layout: MAGIC, the number of strings, the size in bytes of their joined UTF-8 text, the length in
+# characters of each string, the joined text, then the root value. Every value starts with a varint tag:
+# tags below FIRST_NODE_TAG are plain Python values, the others are expression and statement classes,
+# which are followed by their fields in node_fields order. Strings are written as indexes into the string
+# table, so every variable, IRI and keyword is stored once per query.
+MAGIC = b'SQB\x01'
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _TUPLE, _LIST, _DICT, _DECIMAL, _ARRAY = range(11)
+
+FIRST_NODE_TAG = 16
+# tags of the Blazegraph classes start here
+FIRST_EXTENSION_TAG = 64
+
+_DOUBLE = struct.Struct('<d')
+
+_TAGS = {}
+_CLASSES = {}
+
+
+class CodecError(ValueError):
+    pass
+
+
+def register_node(tag, cls):
+    """Assigns the tag that encodes instances of an expression or statement class.
+
+    Tags are part of the encoding, so a registered tag must never be given to another class.
+    """
+    if tag < FIRST_NODE_TAG:
+        raise ValueError('node tags start at %d' % FIRST_NODE_TAG)
+    if _CLASSES.get(tag, cls) is not cls or _TAGS.get(cls, tag) != tag:
+        raise ValueError('tag %d or class %s is already registered' % (tag, cls.__name__))
+    _TAGS[cls] = tag
+    _CLASSES[tag] = cls
+
+
+for _tag, _cls in enumerate((VariableExpression, UriExpression, LiteralExpression, FunctionExpression, AsExpression,
+                             UnaryOperatorExpression, BinaryOperatorExpression, DistinctExpression, StarExpression,
+                             InExpression, RegexExpression, ParameterExpression, Query, CompoundStatement,
+                             AxiomStatement, ValuesStatement, BulkValuesStatement, ServiceStatement,
+                             FilterExistsStatement, UnionStatement, OptionalStatement, MinusStatement, BindStatement,
+                             FilterStatement), FIRST_NODE_TAG):
+    register_node(_tag, _cls)
+
+_VARIABLE_TAG = _TAGS[VariableExpression]
+_URI_TAG = _TAGS[UriExpression]
+
+
+def _varint(number):
+    out = bytearray()
+    while number > 0x7f:
+        out.append(number & 0x7f | 0x80)
+        number >>= 7
+    out.append(number)
+    return bytes(out)
+
+
+# encoded varints of the small numbers that make up most of the output
+_VARINTS = [_varint(number) for number in range(1 << 14)]
+
+
+def _write_varint(out, number):
+    if number < 16384:
+        out += _VARINTS[number]
+    else:
+        out += _varint(number)
+
+
+class _Encoder(object):
+    def __init__(self):
+        self.out = bytearray()
+        self.strings = {}
+        self.string_list = []
+
+    def string(self, text):
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.string_list)
+            self.string_list.append(text)
+        return index
+
+    def value(self, value):
+        out = self.out
+        value_type = type(value)
+        tag = _TAGS.get(value_type)
+        if tag is not None:
+            if tag == _VARIABLE_TAG:
+                out.append(_VARIABLE_TAG)
+                _write_varint(out, self.string(value._name))
+            elif tag == _URI_TAG:
+                out.append(_URI_TAG)
+                _write_varint(out, self.string(value._uri))
+            else:
+                _write_varint(out, tag)
+                for name in node_fields(value):
+                    self.value(getattr(value, name))
+        elif value_type is str:
+            out.append(_STR)
+            _write_varint(out, self.string(value))
+        elif value_type is tuple or value_type is list:
+            out.append(_TUPLE if value_type is tuple else _LIST)
+            _write_varint(out, len(value))
+            for item in value:
+                self.value(item)
+        elif value is None:
+            out.append(_NONE)
+        elif value_type is bool:
+            out.append(_TRUE if value else _FALSE)
+        elif value_type is int:
+            out.append(_INT)
+            _write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+        elif value_type is float:
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(value)
+        elif value_type is dict:
+            out.append(_DICT)
+            _write_varint(out, len(value))
+            for key, item in value.items():
+                self.value(key)
+                self.value(item)
+        else:
+            self.other(value)
+
+    def other(self, value):
+        # subclasses and the column types BulkValuesStatement accepts
+        out = self.out
+        if isinstance(value, (Expression, Statement)):
+            raise TypeError('%s has no codec tag, see register_node' % type(value).__name__)
+        if isinstance(value, str):
+            self.value(str(value))
+        elif isinstance(value, bool):
+            self.value(bool(value))
+        elif isinstance(value, int):
+            self.value(int(value))
+        elif isinstance(value, float):
+            self.value(float(value))
+        elif isinstance(value, decimal.Decimal):
+            out.append(_DECIMAL)
+            _write_varint(out, self.string(str(value)))
+        elif isinstance(value, array.array):
+            out.append(_ARRAY)
+            _write_varint(out, self.string(value.typecode))
+            data = value.tobytes()
+            _write_varint(out, len(data))
+            out += data
+        elif hasattr(value, 'dtype') and hasattr(value, 'tolist'):
+            self.value(value.tolist())
+        elif isinstance(value, collections.abc.Mapping):
+            self.value(dict(value))
+        elif isinstance(value, collections.abc.Sequence):
+            self.value(list(value))
+        else:
+            raise TypeError('cannot encode %s' % type(value).__name__)
+
+    def getvalue(self):
+        text = ''.join(self.string_list).encode('utf-8', 'surrogatepass')
+        header = bytearray(MAGIC)
+        _write_varint(header, len(self.string_list))
+        _write_varint(header, len(text))
+        for string in self.string_list:
+            _write_varint(header, len(string))
+        header += text
+        header += self.out
+        return bytes(header)
+
+
+def encode(node):
+    """Compact binary encoding of an expression or statement tree, see decode.
+
+    Caches are not encoded: a decoded query has no render cache.
+    """
+    encoder = _Encoder()
+    encoder.value(node)
+    return encoder.getvalue()
+
+
+# slots that are not encoded but have to be set on decoded nodes
+_RESET_FIELDS = ('_key', '_render_cache')
+
+_DECODERS = {}
+
+
+def _node_decoder(cls):
+    decoder = _DECODERS.get(cls)
+    if decoder is None:
+        fields = node_fields(cls.__new__(cls))
+        resets = tuple(name for name in _RESET_FIELDS if any(name in getattr(klass, '__slots__', ())
+                                                              for klass in cls.__mro__))
+        decoder = _DECODERS[cls] = (fields, resets)
+    return decoder
+
+
+def _class(tag):
+    cls = _CLASSES.get(tag)
+    if cls is None and tag >= FIRST_EXTENSION_TAG:
+        # the Blazegraph classes register themselves when their module is imported
+        from .blazegraph import blazegraph_statement
+        cls = _CLASSES.get(tag)
+    if cls is None:
+        raise CodecError('unknown node tag %d' % tag)
+    return cls
+
+
+def decode(data):
+    """Rebuilds the tree encoded by encode from bytes, bytearray or a memoryview, without copying the buffer.
+
+    Variables and IRIs are interned like the ones var_f and uri_f return.
+    """
+    view = memoryview(data)
+    if view.format not in ('B', 'b', 'c'):
+        view = view.cast('B')
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise CodecError('not an encoded sparqb tree')
+    position = len(MAGIC)
+
+    def varint():
+        nonlocal position
+        byte = view[position]
+        position += 1
+        if byte < 0x80:
+            return byte
+        number = byte & 0x7f
+        shift = 7
+        while True:
+            byte = view[position]
+            position += 1
+            number |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return number
+            shift += 7
+
+    try:
+        count = varint()
+        size = varint()
+        lengths = [varint() for _ in range(count)]
+        text = str(view[position:position + size], 'utf-8', 'surrogatepass')
+        position += size
+    except (IndexError, UnicodeDecodeError):
+        raise CodecError('truncated or corrupt string table')
+    strings = []
+    offset = 0
+    for length in lengths:
+        strings.append(text[offset:offset + length])
+        offset += length
+
+    # decoded terms by string index and node layouts by tag, filled in as they are met
+    variables = {}
+    uris = {}
+    layouts = {}
+
+    def index():
+        nonlocal position
+        byte = view[position]
+        if byte < 0x80:
+            position += 1
+            return byte
+        return varint()
+
+    def value():
+        nonlocal position
+        tag = view[position]
+        if tag < 0x80:
+            position += 1
+        else:
+            tag = varint()
+        if tag == _VARIABLE_TAG:
+            string = index()
+            term = variables.get(string)
+            if term is None:
+                term = variables[string] = var_f(strings[string])
+            return term
+        if tag == _URI_TAG:
+            string = index()
+            term = uris.get(string)
+            if term is None:
+                term = uris[string] = uri_f(strings[string])
+            return term
+        if tag == _STR:
+            return strings[index()]
+        if tag >= FIRST_NODE_TAG:
+            layout = layouts.get(tag)
+            if layout is None:
+                cls = _class(tag)
+                layout = layouts[tag] = (cls,) + _node_decoder(cls)
+            cls, fields, resets = layout
+            node = cls.__new__(cls)
+            for name in fields:
+                setattr(node, name, value())
+            for name in resets:
+                setattr(node, name, None)
+            return node
+        if tag == _TUPLE:
+            return tuple([value() for _ in range(index())])
+        if tag == _LIST:
+            return [value() for _ in range(index())]
+        if tag == _NONE:
+            return None
+        if tag == _FALSE:
+            return False
+        if tag == _TRUE:
+            return True
+        if tag == _INT:
+            number = varint()
+            return number >> 1 if not number & 1 else -((number + 1) >> 1)
+        if tag == _FLOAT:
+            position += 8
+            return _DOUBLE.unpack_from(view, position - 8)[0]
+        if tag == _DICT:
+            items = {}
+            for _ in range(varint()):
+                key = value()
+                items[key] = value()
+            return items
+        if tag == _DECIMAL:
+            return decimal.Decimal(strings[varint()])
+        if tag == _ARRAY:
+            column = array.array(strings[varint()])
+            size = varint()
+            position += size
+            column.frombytes(view[position - size:position])
+            return column
+        raise CodecError('unknown value tag %d' % tag)
+
+    try:
+        root = value()
+    except (IndexError, struct.error):
+        raise CodecError('truncated data')
+    if position != len(view):
+        raise CodecError('%d bytes after the encoded tree' % (len(view) - position))
+    return root
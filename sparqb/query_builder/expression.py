@@ -3,24 +3,54 @@ __date__ = '23 February 2016'
 __copyright__ = 'Copyright (c) 2016 Seven Bridges Genomics'
 
 import abc
+import decimal
 from .util import *
+from .terms import default_term_table
+
+
+def _write_joined(write, expressions, separator):
+    first = True
+    for expression in expressions:
+        if not first:
+            write(separator)
+        first = False
+        expression._write(write)
 
 
 class Expression(object, metaclass=abc.ABCMeta):
+    __slots__ = ('_key',)
+
     VALUE_TYPE = 'value'
     AS_TYPE = 'as'
 
-    def __init__(self, expression_type=VALUE_TYPE):
-        self._type = expression_type
+    _type = VALUE_TYPE
+
+    def __init__(self):
+        self._key = None
 
     @property
     def type(self):
         return self._type
 
     @abc.abstractmethod
-    def _serialize(self):
+    def _write(self, write):
         pass
 
+    @abc.abstractmethod
+    def _key_parts(self):
+        pass
+
+    def key(self):
+        key = self._key
+        if key is None:
+            key = self._key = structural_key(self, self._key_parts())
+        return key
+
+    def _serialize(self):
+        parts = []
+        self._write(parts.append)
+        return ''.join(parts)
+
     def __str__(self):
         return self._serialize()
 
@@ -69,10 +99,15 @@ class Expression(object, metaclass=abc.ABCMeta):
         if Expression.check_binary_expression_compatibility(self, other):
             return BinaryOperatorExpression('>=', self, other)
 
+    # == builds an expression, so hashing is by identity; interned terms are shared instances
+    __hash__ = object.__hash__
+
 
 class VariableExpression(Expression):
+    __slots__ = ('_name', '__weakref__')
+
     def __init__(self, name):
-        super(VariableExpression, self).__init__(Expression.VALUE_TYPE)
+        super(VariableExpression, self).__init__()
         if isinstance(name, str) and name:
             if name.startswith('?'):
                 if len(name[1:]) > 0:
@@ -88,25 +123,38 @@ class VariableExpression(Expression):
     def name(self):
         return self._name
 
-    def _serialize(self):
-        return '?' + self._name
+    def _key_parts(self):
+        return (self._name,)
+
+    def _write(self, write):
+        write('?' + self._name)
 
 
 class LiteralExpression(Expression):
+    __slots__ = ('_value', '_value_type')
+
     def __init__(self, value, value_type=None):
-        super(LiteralExpression, self).__init__(Expression.VALUE_TYPE)
+        super(LiteralExpression, self).__init__()
         if value is None or value == '':
             raise ValueError
         self._value = value
         self._value_type = value_type
 
-    def _serialize(self):
-        return str(self._value) + ('^^' + str(self._value_type) if self._value_type else '')
+    def _key_parts(self):
+        return (self._value, self._value_type)
+
+    def _write(self, write):
+        write(str(self._value))
+        if self._value_type:
+            write('^^')
+            write(str(self._value_type))
 
 
 class FunctionExpression(Expression):
+    __slots__ = ('_name', '_arguments')
+
     def __init__(self, name, *arguments):
-        super(FunctionExpression, self).__init__(Expression.VALUE_TYPE)
+        super(FunctionExpression, self).__init__()
         if name is None or name == '':
             raise ValueError
         if isinstance(name, str):
@@ -119,13 +167,31 @@ class FunctionExpression(Expression):
         else:
             raise TypeError
 
-    def _serialize(self):
-        return self._name + '(' + ', '.join([str(arg) for arg in self._arguments]) + ')'
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def arguments(self):
+        return self._arguments
+
+    def _key_parts(self):
+        return (self._name, self._arguments)
+
+    def _write(self, write):
+        write(self._name)
+        write('(')
+        _write_joined(write, self._arguments, ', ')
+        write(')')
 
 
 class AsExpression(Expression):
+    __slots__ = ('_expression', '_variable')
+
+    _type = Expression.AS_TYPE
+
     def __init__(self, expression: Expression, variable: VariableExpression):
-        super(AsExpression, self).__init__(Expression.AS_TYPE)
+        super(AsExpression, self).__init__()
         if expression is None or variable is None:
             raise ValueError
         if isinstance(expression, Expression) and expression.type == Expression.VALUE_TYPE and isinstance(variable, VariableExpression):
@@ -134,13 +200,30 @@ class AsExpression(Expression):
         else:
             raise TypeError
 
-    def _serialize(self):
-        return '(' + str(self._expression) + ' AS ' + str(self._variable) + ')'
+    @property
+    def expression(self):
+        return self._expression
+
+    @property
+    def variable(self):
+        return self._variable
+
+    def _key_parts(self):
+        return (self._expression, self._variable)
+
+    def _write(self, write):
+        write('(')
+        self._expression._write(write)
+        write(' AS ')
+        self._variable._write(write)
+        write(')')
 
 
 class UnaryOperatorExpression(Expression):
+    __slots__ = ('_operator', '_expression')
+
     def __init__(self, operator, expression):
-        super(UnaryOperatorExpression, self).__init__(Expression.VALUE_TYPE)
+        super(UnaryOperatorExpression, self).__init__()
         if expression is None or operator is None:
             raise ValueError
         if isinstance(expression, Expression) and expression.type == Expression.VALUE_TYPE:
@@ -150,13 +233,19 @@ class UnaryOperatorExpression(Expression):
 
         self._operator = operator
 
-    def _serialize(self):
-        return str(self._operator) + str(self._expression)
+    def _key_parts(self):
+        return (self._operator, self._expression)
+
+    def _write(self, write):
+        write(str(self._operator))
+        self._expression._write(write)
 
 
 class BinaryOperatorExpression(Expression):
+    __slots__ = ('_operator', '_left_expression', '_right_expression')
+
     def __init__(self, operator, left_expression, right_expression):
-        super(BinaryOperatorExpression, self).__init__(Expression.VALUE_TYPE)
+        super(BinaryOperatorExpression, self).__init__()
         if left_expression is None or right_expression is None:
             raise ValueError
         if operator is None:
@@ -172,13 +261,22 @@ class BinaryOperatorExpression(Expression):
 
         self._operator = operator
 
-    def _serialize(self):
-        return '(' + str(self._left_expression) + ' ' + str(self._operator) + ' ' + str(self._right_expression) + ')'
+    def _key_parts(self):
+        return (self._operator, self._left_expression, self._right_expression)
+
+    def _write(self, write):
+        write('(')
+        self._left_expression._write(write)
+        write(' ' + str(self._operator) + ' ')
+        self._right_expression._write(write)
+        write(')')
 
 
 class DistinctExpression(Expression):
+    __slots__ = ('_expressions',)
+
     def __init__(self, *expressions):
-        super(DistinctExpression, self).__init__(Expression.VALUE_TYPE)
+        super(DistinctExpression, self).__init__()
         if len(expressions) > 0 and all(
                 [(isinstance(expression, VariableExpression) or isinstance(expression, AsExpression))
                  for expression in expressions]):
@@ -186,36 +284,58 @@ class DistinctExpression(Expression):
         else:
             raise TypeError
 
-    def _serialize(self):
-        return 'DISTINCT ' + ' '.join(str(expression) for expression in self._expressions)
+    def _key_parts(self):
+        return (self._expressions,)
+
+    def _write(self, write):
+        write('DISTINCT ')
+        _write_joined(write, self._expressions, ' ')
 
 
 class StarExpression(Expression):
+    __slots__ = ()
+
     def __init__(self):
-        super(StarExpression, self).__init__(Expression.VALUE_TYPE)
+        super(StarExpression, self).__init__()
 
-    def _serialize(self):
-        return '*'
+    def _key_parts(self):
+        return ()
+
+    def _write(self, write):
+        write('*')
 
 
 class UriExpression(Expression):
+    __slots__ = ('_uri', '_is_short', '__weakref__')
+
     def __init__(self, uri):
-        super(UriExpression, self).__init__(Expression.VALUE_TYPE)
-        if is_valid_uri(str(uri)):
-            self._uri = str(uri)
-        else:
+        super(UriExpression, self).__init__()
+        uri = str(uri)
+        term_type = classify_term(uri)
+        if term_type == TERM_VARIABLE:
             raise ValueError
+        self._uri = uri
+        self._is_short = term_type == TERM_SHORT
 
-    def _serialize(self):
-        if is_valid_short(self._uri):
-            return self._uri
+    @property
+    def is_short(self):
+        return self._is_short
+
+    def _key_parts(self):
+        return (self._uri,)
+
+    def _write(self, write):
+        if self._is_short:
+            write(self._uri)
         else:
-            return '<' + self._uri + '>'
+            write('<' + self._uri + '>')
 
 
 class InExpression(Expression):
+    __slots__ = ('_expression', '_values')
+
     def __init__(self, expression, *values):
-        super(InExpression, self).__init__(Expression.VALUE_TYPE)
+        super(InExpression, self).__init__()
         if isinstance(expression, Expression) and expression.type == Expression.VALUE_TYPE:
             self._expression = expression
         else:
@@ -226,13 +346,34 @@ class InExpression(Expression):
         else:
             raise TypeError
 
-    def _serialize(self):
-        return str(self._expression) + ' IN ' + '(' + ', '.join(str(item) for item in self._values) + ')'
+    def _key_parts(self):
+        return (self._expression, self._values)
+
+    @property
+    def row_count(self):
+        return len(self._values)
+
+    def _row_chunks(self, size):
+        for start in range(0, len(self._values), size):
+            parts = []
+            _write_joined(parts.append, self._values[start:start + size], ', ')
+            yield ''.join(parts)
+
+    def _write_rows(self, write):
+        _write_joined(write, self._values, ', ')
+
+    def _write(self, write):
+        self._expression._write(write)
+        write(' IN (')
+        _write_marked_rows(write, self)
+        write(')')
 
 
 class RegexExpression(Expression):
+    __slots__ = ('_expression', '_regex')
+
     def __init__(self, expression, regex):
-        super(RegexExpression, self).__init__(Expression.VALUE_TYPE)
+        super(RegexExpression, self).__init__()
         if expression is None:
             raise ValueError
         if isinstance(expression, Expression) and expression.type == Expression.VALUE_TYPE:
@@ -245,8 +386,106 @@ class RegexExpression(Expression):
         else:
             raise ValueError
 
-    def _serialize(self):
-        return 'regex(str(%s), "%s", "i")' % (str(self._expression), str(self._regex))
+    def _key_parts(self):
+        return (self._expression, self._regex)
+
+    def _write(self, write):
+        write('regex(str(')
+        self._expression._write(write)
+        write('), "%s", "i")' % str(self._regex))
+
+
+class RowsMarker(str):
+    # empty string written around the rows of a VALUES block or the items of an IN list, used to split queries
+    def __new__(cls, node):
+        marker = super(RowsMarker, cls).__new__(cls, '')
+        marker.node = node
+        return marker
+
+
+def _write_marked_rows(write, node):
+    # a writer with a skip_rows(node) method gets only the markers of the nodes it skips
+    write(RowsMarker(node))
+    skip_rows = getattr(write, 'skip_rows', None)
+    if skip_rows is None or not skip_rows(node):
+        node._write_rows(write)
+    write(RowsMarker(node))
+
+
+class ParameterSlot(str):
+    # marks the position of a parameter in rendered output, renders as a SPARQL $variable
+    def __new__(cls, parameter):
+        slot = super(ParameterSlot, cls).__new__(cls, '$' + parameter.name)
+        slot.parameter = parameter
+        return slot
+
+
+class ParameterExpression(Expression):
+    __slots__ = ('_name', '_separator')
+
+    def __init__(self, name, separator=', '):
+        super(ParameterExpression, self).__init__()
+        if isinstance(name, str) and name.lstrip('$'):
+            self._name = name.lstrip('$')
+        else:
+            raise ValueError
+        self._separator = separator
+
+    @property
+    def name(self):
+        return self._name
+
+    def format(self, value):
+        if type(value) in (list, tuple, set, frozenset):
+            if len(value) == 0:
+                raise ValueError
+            return self._separator.join([format_value(item) for item in value])
+        return format_value(value)
+
+    def _key_parts(self):
+        return (self._name, self._separator)
+
+    def _write(self, write):
+        write(ParameterSlot(self))
+
+
+def _format_float(value):
+    if value != value or value in (float('inf'), float('-inf')):
+        raise ValueError
+    return repr(value)
+
+
+def _format_decimal(value):
+    if not value.is_finite():
+        raise ValueError
+    return str(value)
+
+
+def _format_string(value):
+    return '"' + escape_literal(value) + '"'
+
+
+_VALUE_FORMATTERS = {
+    str: _format_string,
+    int: str,
+    bool: lambda value: 'true' if value else 'false',
+    float: _format_float,
+    decimal.Decimal: _format_decimal,
+}
+
+
+def format_value(value):
+    formatter = _VALUE_FORMATTERS.get(type(value))
+    if formatter is not None:
+        return formatter(value)
+    if isinstance(value, Expression):
+        return str(value)
+    if value is None:
+        raise ValueError
+    for value_type, formatter in _VALUE_FORMATTERS.items():
+        if isinstance(value, value_type):
+            return formatter(value)
+    raise TypeError
 
 
 # some short named functions to ease expression building
@@ -276,14 +515,21 @@ def desc_f(argument):
 
 
 def var_f(name):
-    return VariableExpression(name)
+    if not isinstance(name, str):
+        return VariableExpression(name)
+    if name.startswith('?'):
+        name = name[1:]
+    return default_term_table.intern(VariableExpression, name, _new_variable)
+
+
+def _new_variable(name):
+    return VariableExpression('?' + name)
 
 
 def uri_f(uri):
-    if is_valid_uri(uri):
-        return UriExpression(uri)
-    else:
+    if uri is None:
         raise ValueError
+    return default_term_table.intern(UriExpression, str(uri))
 
 
 def distinct_f(*names):
@@ -312,3 +558,7 @@ def equals_f(expression_1, expression_2):
 
 def regex_f(expression, value):
     return RegexExpression(expression, value)
+
+
+def param_f(name, separator=', '):
+    return ParameterExpression(name, separator)
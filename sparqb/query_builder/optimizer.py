@@ -0,0 +1,154 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+from .statement import *
+from .tree import has_fixed_join_order, replace, term_variable, variable_names
+
+_TYPE_PREDICATES = frozenset(('a', 'rdf:type', '<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>'))
+
+
+def optimize(query: Query):
+    """Equivalent query rewritten by static rules; the given query is left unchanged.
+
+    Axiom-only { } groups are merged into the enclosing group, filters move into the innermost plain group
+    that binds all of their variables and then right after the patterns that bind them, and runs of triple
+    patterns are ordered by selectivity: patterns with more bound terms first, bound subjects counting most.
+    Queries with a fixed join order (hint:optimizer None) keep the order of their triple patterns.
+    """
+    return _optimize(query, has_fixed_join_order(query))
+
+
+def _optimize(node, fixed_order):
+    # services are evaluated remotely and keep their patterns as written
+    if not isinstance(node, CompoundStatement) or isinstance(node, ServiceStatement):
+        return node
+    statements = [_optimize(statement, fixed_order) for statement in node._statements]
+    statements = _arrange(_push_filters(_merge_groups(statements), fixed_order), fixed_order)
+    changes = {}
+    if len(statements) != len(node._statements) or any(new is not old for new, old in
+                                                       zip(statements, node._statements)):
+        changes['_statements'] = tuple(statements)
+    # named subqueries of Blazegraph queries
+    with_statements = getattr(node, '_with_statements', None)
+    if with_statements:
+        optimized = tuple(_optimize(statement, fixed_order) for statement in with_statements)
+        if any(new is not old for new, old in zip(optimized, with_statements)):
+            changes['_with_statements'] = optimized
+    return replace(node, **changes) if changes else node
+
+
+def _is_plain_group(statement):
+    return type(statement) is CompoundStatement
+
+
+def _merge_groups(statements):
+    # joining basic graph patterns is the same as taking their union, so { A } { B } is A B
+    merged = []
+    for statement in statements:
+        if _is_plain_group(statement) and statement._statements and \
+                all(type(child) is AxiomStatement for child in statement._statements):
+            merged.extend(statement._statements)
+        else:
+            merged.append(statement)
+    return merged
+
+
+def _certain_variables(group):
+    # variables bound in every solution of a plain group
+    names = set()
+    for statement in group._statements:
+        if type(statement) is AxiomStatement:
+            names.update(variable_names(statement))
+        elif _is_plain_group(statement):
+            names.update(_certain_variables(statement))
+    return names
+
+
+def _push_filters(statements, fixed_order):
+    # a filter on variables that a nested group always binds gives the same solutions inside that group
+    result = list(statements)
+    for index, statement in enumerate(statements):
+        if type(statement) is not FilterStatement:
+            continue
+        needed = set(variable_names(statement))
+        if not needed:
+            continue
+        for position, target in enumerate(result):
+            if _is_plain_group(target) and needed <= _certain_variables(target):
+                group = _push_filters(tuple(target._statements) + (statement,), fixed_order)
+                result[position] = replace(target, _statements=tuple(_arrange(group, fixed_order)))
+                result[index] = None
+                break
+    return [statement for statement in result if statement is not None]
+
+
+def _arrange(statements, fixed_order):
+    filters = [statement for statement in statements if type(statement) is FilterStatement]
+    others = [statement for statement in statements if type(statement) is not FilterStatement]
+    if not fixed_order:
+        others = _order_runs(others)
+    if not filters:
+        return others
+
+    # a filter applies to its whole group wherever it is written, so it goes right after its variables are bound
+    mentioned = [set(variable_names(statement)) for statement in others]
+    group_variables = set().union(*mentioned)
+    positions = []
+    for statement in filters:
+        needed = set(variable_names(statement)) & group_variables
+        position = 0
+        bound = set()
+        while not needed <= bound:
+            bound |= mentioned[position]
+            position += 1
+        # a filter between the branches would break up a union
+        while position < len(others) and isinstance(others[position], UnionStatement) and \
+                others[position]._add_keyword:
+            position += 1
+        positions.append(position)
+
+    arranged = []
+    for position, statement in enumerate(others + [None]):
+        arranged.extend(filter_statement for filter_position, filter_statement in zip(positions, filters)
+                        if filter_position == position)
+        if statement is not None:
+            arranged.append(statement)
+    return arranged
+
+
+def _order_runs(statements):
+    ordered = []
+    run = []
+    for statement in statements + [None]:
+        # hints are axiom subclasses, so only plain triple patterns are moved
+        if type(statement) is AxiomStatement:
+            run.append(statement)
+            continue
+        bound = set()
+        for statement_before in ordered:
+            bound.update(variable_names(statement_before))
+        while run:
+            best = max(range(len(run)), key=lambda index: (_selectivity(run[index], bound), -index))
+            axiom = run.pop(best)
+            bound.update(variable_names(axiom))
+            ordered.append(axiom)
+        if statement is not None:
+            ordered.append(statement)
+    return ordered
+
+
+def _selectivity(axiom, bound):
+    def is_bound(term):
+        name = term_variable(term)
+        return name is None or name in bound
+
+    score = 0
+    if is_bound(axiom._s):
+        score += 4
+    if is_bound(axiom._o):
+        # most subjects have a type, so a known class narrows the matches less than other objects do
+        score += 1 if str(axiom._p) in _TYPE_PREDICATES and term_variable(axiom._o) is None else 2
+    if is_bound(axiom._p):
+        score += 1
+    return score
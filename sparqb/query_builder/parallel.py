@@ -0,0 +1,83 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import concurrent.futures
+import os
+import sys
+import threading
+
+from .expression import _write_joined
+from .statement import *
+from .tree import replace
+
+# chunks per worker, so that workers finishing early pick up more of the work
+CHUNKS_PER_WORKER = 4
+
+# thread pools of render_parallel by number of workers, kept for the life of the process
+_thread_pools = {}
+_thread_pools_lock = threading.Lock()
+
+
+class _StatementsSlot(str):
+    # written in place of the statements of the rendered group
+    pass
+
+
+class _SlotStatement(Statement):
+    __slots__ = ()
+
+    def _key_parts(self):
+        return ()
+
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write(_StatementsSlot())
+
+
+def free_threaded():
+    """Whether threads run Python code in parallel, as on free-threaded builds with the GIL disabled."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def render_parallel(statement: CompoundStatement, serialization_mode=Statement.SERIALIZATION_PRETTY, workers=None,
+                    executor=None, chunk_size=None):
+    """Text of a query or group with its top-level statements rendered in chunks by a pool of workers.
+
+    The output is the same as statement.serialize(serialization_mode), and each task is sent only its own
+    chunk. The chunks are rendered by executor when one is given. Otherwise, on free-threaded builds, they
+    are rendered by a pool of threads kept for the life of the process; with the GIL enabled the statement
+    is serialized in the calling thread, since threads do not render in parallel there and sending a chunk
+    to another process (see util.process_pool) costs several times more than rendering it.
+    """
+    statements = statement._statements
+    if executor is None and not free_threaded():
+        return statement.serialize(serialization_mode)
+    if workers is None:
+        workers = getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(statements) // (workers * CHUNKS_PER_WORKER)))
+    if len(statements) <= chunk_size:
+        return statement.serialize(serialization_mode)
+
+    parts = []
+    replace(statement, _statements=(_SlotStatement(),))._write(parts.append, serialization_mode)
+    slot = next(index for index, part in enumerate(parts) if type(part) is _StatementsSlot)
+    chunks = [statements[start:start + chunk_size] for start in range(0, len(statements), chunk_size)]
+    separator = statement._statement_separator
+    texts = (executor or _thread_pool(workers)).map(_render_statements, chunks, [separator] * len(chunks))
+    return ''.join(parts[:slot]) + separator.join(texts) + ''.join(parts[slot + 1:])
+
+
+def _thread_pool(workers):
+    with _thread_pools_lock:
+        pool = _thread_pools.get(workers)
+        if pool is None:
+            pool = _thread_pools[workers] = concurrent.futures.ThreadPoolExecutor(workers)
+        return pool
+
+
+def _render_statements(statements, separator):
+    parts = []
+    _write_joined(parts.append, statements, separator)
+    return ''.join(parts)
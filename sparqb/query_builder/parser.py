@@ -0,0 +1,593 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import re
+
+from .statement import *
+
+# whitespace and comments are skipped in front of each token; a character that starts no token is a token
+# of its own, so that findall never skips text silently
+_TOKENS = re.compile(r'''(?:\s+|\#[^\n]*)*(
+    [?$][A-Za-z0-9_]\w*
+  | <[^<>"{}|^`\\\x00-\x20]*>
+  | """(?:[^"\\]|\\.|"(?!""))*""" | \'\'\'(?:[^'\\]|\\.|'(?!''))*\'\'\'
+  | "(?:[^"\\\n\r]|\\.)*" | '(?:[^'\\\n\r]|\\.)*'
+  | \d+\.\d*[eE][+-]?\d+ | (?:\d*\.\d+|\d+)(?:[eE][+-]?\d+)?
+  | _:[\w-]+(?:\.[\w-]+)*
+  | (?:[A-Za-z][\w-]*(?:\.[\w-]+)*)?:(?:[\w:%-]+(?:\.[\w:%-]+)*)?
+  | [A-Za-z_]\w*
+  | &&|\|\||!=|<=|>=|\^\^
+  | @[A-Za-z]+(?:-[A-Za-z0-9]+)*
+  | %[\w-]+
+  | \S
+)''', re.VERBOSE)
+
+_PUNCTUATION = frozenset(('&&', '||', '!=', '<=', '>=', '^^') + tuple('{}()[].,;=<>!+-*/'))
+
+# kinds of tokens by their first character, for the characters that decide it
+_KINDS = {'?': 'var', '$': 'var', '"': 'string', "'": 'string', '@': 'langtag', '%': 'name'}
+_KINDS.update((digit, 'number') for digit in '0123456789')
+
+_RELATIONAL = frozenset(('=', '!=', '<', '>', '<=', '>='))
+
+# keywords of the clauses after GROUP BY and ORDER BY, which end their conditions
+_CLAUSE_KEYWORDS = frozenset(('HAVING', 'ORDER', 'LIMIT', 'OFFSET', 'VALUES'))
+
+_END = ('end', '', None)
+
+
+class SparqlSyntaxError(ValueError):
+    def __init__(self, message, text=None, position=None):
+        if text is not None and position is not None:
+            line = text.count('\n', 0, position) + 1
+            column = position - text.rfind('\n', 0, position)
+            message = '%s at line %d, column %d' % (message, line, column)
+        super(SparqlSyntaxError, self).__init__(message)
+        self.position = position
+
+
+def tokenize(text):
+    """List of (kind, text, key) tokens of a query, without whitespace and comments.
+
+    The key is the upper case text of words and the text of punctuation.
+    """
+    tokens = []
+    append = tokens.append
+    kinds = _KINDS
+    punctuation = _PUNCTUATION
+    for index, value in enumerate(_TOKENS.findall(text)):
+        kind = kinds.get(value[0])
+        if kind is not None:
+            if len(value) == 1 and kind != 'number':
+                _raise_unexpected(text, index)
+            append((kind, value, None))
+        elif value in punctuation:
+            append(('punct', value, value))
+        elif value[0] == '<' and value[-1] == '>':
+            append(('iri', value, None))
+        elif value[0] == '.':
+            append(('number', value, None))
+        elif value[0] == '_' and value[1:2] == ':':
+            append(('bnode', value, None))
+        elif ':' in value:
+            append(('pname', value, None))
+        elif value[0].isalpha() or value[0] == '_':
+            append(('word', value, value.upper()))
+        else:
+            _raise_unexpected(text, index)
+    return tokens
+
+
+def _position(text, index):
+    # offset of the index-th token, or of the end of the text
+    for count, token in enumerate(_TOKENS.finditer(text)):
+        if count == index:
+            return token.start(1)
+    return len(text)
+
+
+def _raise_unexpected(text, index):
+    position = _position(text, index)
+    raise SparqlSyntaxError('unexpected character %r' % text[position], text, position)
+
+
+class SparqlParser(object):
+    """Parses SPARQL 1.1 SELECT queries into Query trees like the ones QueryBuilder builds.
+
+    Terms are kept the way the builder keeps them: predicates as text, subjects and objects as variables or
+    URIs, and VALUES rows as text, so the tree of a query rendered by sparqb renders back to the same text.
+    Query forms other than SELECT, BASE, property paths, blank node property lists and collections,
+    GROUP_CONCAT separators, NOT IN and EXISTS inside expressions are not supported.
+    """
+
+    query_cls = Query
+
+    def parse(self, text):
+        self._text = text
+        # two end tokens, so that looking one token ahead never runs past the list
+        self._tokens = tokenize(text) + [_END, _END]
+        self._index = 0
+        self._prefixes = {}
+        try:
+            query = self._query()
+            if self._peek() is not _END:
+                self._error('unexpected %r' % self._peek()[1])
+            return query
+        finally:
+            self._text = self._tokens = None
+
+    # tokens
+
+    def _peek(self, offset=0):
+        return self._tokens[self._index + offset]
+
+    def _next(self):
+        token = self._tokens[self._index]
+        if token is _END:
+            self._error('unexpected end of query')
+        self._index += 1
+        return token
+
+    def _error(self, message):
+        raise SparqlSyntaxError(message, self._text, _position(self._text, self._index))
+
+    def _is(self, key, offset=0):
+        return self._tokens[self._index + offset][2] == key
+
+    def _accept(self, key):
+        if self._tokens[self._index][2] == key:
+            self._index += 1
+            return True
+        return False
+
+    def _expect(self, key):
+        if self._tokens[self._index][2] != key:
+            self._error('expected %s' % key)
+        self._index += 1
+
+    def _expect_kind(self, kind):
+        token_kind, token, _ = self._next()
+        if token_kind != kind:
+            self._index -= 1
+            self._error('expected %s' % kind)
+        return token
+
+    # query
+
+    def _query(self, subquery=False):
+        query = self.query_cls()
+        if not subquery:
+            while True:
+                if self._accept('PREFIX'):
+                    prefix = self._expect_kind('pname')
+                    if not prefix.endswith(':'):
+                        self._error('expected a prefix name')
+                    self._prefixes[prefix[:-1]] = self._expect_kind('iri')[1:-1]
+                elif self._is('BASE'):
+                    self._error('BASE is not supported')
+                else:
+                    break
+            query._prefixes = dict(self._prefixes)
+
+        self._expect('SELECT')
+        query._is_distinct = self._accept('DISTINCT')
+        if self._is('REDUCED'):
+            self._error('REDUCED is not supported')
+        select = []
+        if not self._accept('*'):
+            while True:
+                if self._peek()[0] == 'var':
+                    select.append(self._variable())
+                elif self._accept('('):
+                    expression = self._expression()
+                    self._expect('AS')
+                    select.append(AsExpression(expression, self._variable()))
+                    self._expect(')')
+                else:
+                    break
+            if not select:
+                self._error('expected select items')
+        query._select = tuple(select)
+
+        self._query_clauses(query)
+        self._accept('WHERE')
+        query._statements = tuple(self._group())
+
+        if self._accept('GROUP'):
+            self._expect('BY')
+            query._group_by = tuple(self._conditions(allow_as=True))
+        if self._accept('HAVING'):
+            having = self._constraint()
+            while self._is('(') or self._is_call():
+                having = BinaryOperatorExpression('&&', having, self._constraint())
+            query._having = having
+        if self._accept('ORDER'):
+            self._expect('BY')
+            query._order_by = tuple(self._conditions())
+        while True:
+            if self._accept('LIMIT'):
+                query._limit = int(self._expect_kind('number'))
+            elif self._accept('OFFSET'):
+                query._offset = int(self._expect_kind('number'))
+            else:
+                break
+        if self._is('VALUES'):
+            self._error('VALUES after the query is not supported')
+
+        query._order_by = tuple(query._order_by)
+        query._group_by = tuple(query._group_by)
+        query._deletes = ()
+        query._inserts = ()
+        return query
+
+    def _query_clauses(self, query):
+        # clauses between SELECT and WHERE, such as Blazegraph's named subqueries
+        pass
+
+    def _conditions(self, allow_as=False):
+        conditions = []
+        while True:
+            kind, token, key = self._peek()
+            if key in _CLAUSE_KEYWORDS:
+                break
+            if kind == 'var':
+                conditions.append(self._variable())
+            elif allow_as and self._is('('):
+                self._next()
+                expression = self._expression()
+                if self._accept('AS'):
+                    expression = AsExpression(expression, self._variable())
+                self._expect(')')
+                conditions.append(expression)
+            elif self._is('(') or self._is_call() or self._is('ASC') or self._is('DESC'):
+                conditions.append(self._constraint())
+            else:
+                break
+        if not conditions:
+            self._error('expected a condition')
+        return conditions
+
+    # graph patterns
+
+    def _group(self):
+        self._expect('{')
+        if self._is('SELECT'):
+            query = self._query(subquery=True)
+            self._expect('}')
+            return [query]
+        statements = []
+        while not self._accept('}'):
+            self._pattern(statements)
+        return statements
+
+    def _pattern(self, statements):
+        kind, token, _ = self._peek()
+        if kind == 'punct':
+            if token == '.':
+                self._next()
+                return
+            if token == '{':
+                group = self._group()
+                if self._is('UNION'):
+                    statements.append(UnionStatement(*group, add_keyword=False))
+                    while self._accept('UNION'):
+                        statements.append(UnionStatement(*self._group(), add_keyword=True))
+                else:
+                    statements.append(CompoundStatement(*group))
+                return
+        elif kind == 'word':
+            keyword = token.upper()
+            if keyword == 'OPTIONAL':
+                self._next()
+                statements.append(OptionalStatement(*self._group()))
+                return
+            if keyword == 'MINUS':
+                self._next()
+                statements.append(MinusStatement(*self._group()))
+                return
+            if keyword == 'SERVICE':
+                self._next()
+                if self._is('SILENT'):
+                    self._error('SERVICE SILENT is not supported')
+                uri = self._iri_text(self._next())
+                statements.append(self._service(uri, self._group()))
+                return
+            if keyword == 'FILTER':
+                self._next()
+                if self._is('EXISTS') or (self._is('NOT') and self._is('EXISTS', 1)):
+                    not_exists = self._accept('NOT')
+                    self._expect('EXISTS')
+                    statements.append(FilterExistsStatement(*self._group(), not_exists_type=not_exists))
+                else:
+                    statements.append(FilterStatement(self._constraint()))
+                return
+            if keyword == 'BIND':
+                self._next()
+                self._expect('(')
+                expression = self._expression()
+                self._expect('AS')
+                variable = self._variable()
+                self._expect(')')
+                statements.append(BindStatement(expression, variable))
+                return
+            if keyword == 'VALUES':
+                self._next()
+                statements.append(self._values())
+                return
+            if keyword == 'GRAPH':
+                self._error('GRAPH is not supported')
+        if not self._extension_pattern(statements):
+            self._triples(statements)
+
+    def _extension_pattern(self, statements):
+        # hook for patterns of SPARQL dialects; returns whether a pattern was read
+        return False
+
+    def _service(self, uri, statements):
+        return ServiceStatement(uri, *statements)
+
+    def _values(self):
+        if self._accept('('):
+            variables = []
+            while not self._accept(')'):
+                variables.append(self._variable())
+            single = False
+        else:
+            variables = [self._variable()]
+            single = True
+        self._expect('{')
+        rows = []
+        while not self._accept('}'):
+            if single:
+                rows.append((self._value_term(),))
+            else:
+                self._expect('(')
+                row = []
+                while not self._accept(')'):
+                    row.append(self._value_term())
+                if len(row) != len(variables):
+                    self._error('expected %d values' % len(variables))
+                rows.append(tuple(row))
+        return ValuesStatement(tuple(variables), rows)
+
+    def _value_term(self):
+        if self._accept('UNDEF'):
+            return 'UNDEF'
+        return str(self._term(allow_literal=True))
+
+    def _triples(self, statements):
+        subject = self._term()
+        while True:
+            predicate = self._predicate()
+            while True:
+                statements.append(self._axiom(subject, predicate, self._term(allow_literal=True)))
+                if not self._accept(','):
+                    break
+            if not self._accept(';'):
+                break
+            # a trailing ; before the end of the block is allowed
+            if self._is('.') or self._is('}'):
+                break
+        self._accept('.')
+
+    def _axiom(self, s, p, o):
+        return AxiomStatement(s, p, o)
+
+    def _predicate(self):
+        kind, token, _ = self._next()
+        if kind in ('var', 'iri', 'pname') or (kind == 'word' and token == 'a'):
+            return token
+        self._index -= 1
+        self._error('expected a predicate')
+
+    def _term(self, allow_literal=False):
+        kind, token, _ = self._peek()
+        if kind == 'var':
+            return self._variable()
+        if kind == 'iri':
+            self._next()
+            return _uri(token[1:-1], token)
+        if kind == 'pname':
+            self._next()
+            return _uri(token, token)
+        if kind == 'bnode':
+            self._next()
+            return token
+        if kind == 'punct' and token in ('[', '('):
+            self._error('blank node property lists and collections are not supported')
+        if allow_literal:
+            literal = self._literal()
+            if literal is not None:
+                return literal
+        self._error('expected a term')
+
+    def _literal(self):
+        kind, token, _ = self._peek()
+        negative = kind == 'punct' and token in ('-', '+') and self._peek(1)[0] == 'number'
+        if negative:
+            self._next()
+            number = self._next()[1]
+            return LiteralExpression(token + number if token == '-' else number)
+        if kind == 'number':
+            self._next()
+            return LiteralExpression(_number(token))
+        if kind == 'string':
+            self._next()
+            if self._peek()[0] == 'langtag':
+                return LiteralExpression(token + self._next()[1])
+            if self._accept('^^'):
+                kind, datatype, _ = self._next()
+                if kind not in ('iri', 'pname'):
+                    self._index -= 1
+                    self._error('expected a datatype')
+                return LiteralExpression(token, _uri(datatype[1:-1] if kind == 'iri' else datatype, datatype))
+            return LiteralExpression(token)
+        if kind == 'word' and token in ('true', 'false'):
+            self._next()
+            return LiteralExpression(token)
+        return None
+
+    def _variable(self):
+        return var_f(self._expect_kind('var')[1:])
+
+    def _iri_text(self, token):
+        kind, text = token[:2]
+        if kind == 'iri':
+            return text[1:-1]
+        if kind == 'pname':
+            prefix, _, local = text.partition(':')
+            return self._prefixes[prefix] + local if prefix in self._prefixes else text
+        self._index -= 1
+        self._error('expected an IRI')
+
+    # expressions
+
+    def _is_call(self):
+        kind, token, _ = self._peek()
+        return kind in ('word', 'iri', 'pname') and self._is('(', 1)
+
+    def _constraint(self):
+        if self._accept('('):
+            expression = self._expression()
+            self._expect(')')
+            return expression
+        if self._is_call() or self._is('ASC') or self._is('DESC'):
+            return self._primary()
+        self._error('expected a constraint')
+
+    def _expression(self):
+        expression = self._and_expression()
+        while self._accept('||'):
+            expression = BinaryOperatorExpression('||', expression, self._and_expression())
+        return expression
+
+    def _and_expression(self):
+        expression = self._relational_expression()
+        while self._accept('&&'):
+            expression = BinaryOperatorExpression('&&', expression, self._relational_expression())
+        return expression
+
+    def _relational_expression(self):
+        expression = self._additive_expression()
+        kind, token, _ = self._peek()
+        if kind == 'punct' and token in _RELATIONAL:
+            self._next()
+            return BinaryOperatorExpression(token, expression, self._additive_expression())
+        if self._is('IN'):
+            self._next()
+            return InExpression(expression, *self._expression_list())
+        if self._is('NOT') and self._is('IN', 1):
+            self._error('NOT IN is not supported')
+        return expression
+
+    def _expression_list(self):
+        self._expect('(')
+        items = []
+        if not self._accept(')'):
+            items.append(self._expression())
+            while self._accept(','):
+                items.append(self._expression())
+            self._expect(')')
+        return items
+
+    def _additive_expression(self):
+        expression = self._multiplicative_expression()
+        while self._is('+') or self._is('-'):
+            operator = self._next()[1]
+            expression = BinaryOperatorExpression(operator, expression, self._multiplicative_expression())
+        return expression
+
+    def _multiplicative_expression(self):
+        expression = self._unary_expression()
+        while self._is('*') or self._is('/'):
+            operator = self._next()[1]
+            expression = BinaryOperatorExpression(operator, expression, self._unary_expression())
+        return expression
+
+    def _unary_expression(self):
+        kind, token, _ = self._peek()
+        if kind == 'punct' and token in ('!', '-', '+'):
+            if token != '!' and self._peek(1)[0] == 'number':
+                return self._literal()
+            self._next()
+            return UnaryOperatorExpression(token, self._unary_expression())
+        return self._primary()
+
+    def _primary(self):
+        kind, token, _ = self._peek()
+        if kind == 'punct' and token == '(':
+            self._next()
+            expression = self._expression()
+            self._expect(')')
+            return expression
+        if kind == 'var':
+            return self._variable()
+        if self._is_call():
+            self._next()
+            return self._call(token)
+        if kind == 'iri':
+            self._next()
+            return uri_f(token[1:-1]) if is_valid_uri(token[1:-1]) else LiteralExpression(token)
+        if kind == 'pname':
+            self._next()
+            return uri_f(token) if is_valid_uri(token) else LiteralExpression(token)
+        if kind == 'word' and token.upper() == 'EXISTS' or self._is('NOT') and self._is('EXISTS', 1):
+            self._error('EXISTS inside expressions is not supported')
+        literal = self._literal()
+        if literal is None:
+            self._error('expected an expression')
+        return literal
+
+    def _call(self, name):
+        self._expect('(')
+        if name.upper() == 'COUNT' and self._accept('*'):
+            self._expect(')')
+            return FunctionExpression(name, StarExpression())
+        if self._accept('DISTINCT'):
+            start = self._index
+            arguments = self._expression_arguments()
+            if not all(isinstance(argument, (VariableExpression, AsExpression)) for argument in arguments):
+                self._index = start
+                self._error('DISTINCT is only supported over variables')
+            self._expect(')')
+            return FunctionExpression(name, DistinctExpression(*arguments))
+        self._index -= 1
+        arguments = self._expression_list()
+        if name == 'regex' and len(arguments) == 3 and isinstance(arguments[0], FunctionExpression) and \
+                arguments[0].name == 'str' and len(arguments[0].arguments) == 1 and \
+                str(arguments[2]) == '"i"' and _is_plain_string(arguments[1]):
+            return RegexExpression(arguments[0].arguments[0], str(arguments[1])[1:-1])
+        return FunctionExpression(name, *arguments)
+
+    def _expression_arguments(self):
+        arguments = [self._expression()]
+        while self._accept(','):
+            arguments.append(self._expression())
+        return arguments
+
+
+def _number(text):
+    # numbers the builder would have been given as int or float keep that type, others their text
+    if text.isdigit() and str(int(text)) == text:
+        return int(text)
+    try:
+        value = float(text)
+    except ValueError:
+        return text
+    return value if repr(value) == text else text
+
+
+def _uri(text, token):
+    # terms the builder cannot represent as URIs stay text, which renders the same
+    return uri_f(text) if is_valid_uri(text) else token
+
+
+def _is_plain_string(expression):
+    text = str(expression)
+    return isinstance(expression, LiteralExpression) and text.startswith('"') and text.endswith('"') and \
+        '"' not in text[1:-1]
+
+
+def parse_query(text):
+    return SparqlParser().parse(text)
@@ -0,0 +1,97 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import collections
+import itertools
+
+from .expression import ParameterSlot
+from .util import process_pool
+
+# template of the batch rendered by a pool worker process, set once by its initializer
+_worker_template = None
+
+
+class PreparedQuery(object):
+    """Query rendered once into text segments with parameter slots in between.
+
+    render(**values) only formats the bound values and joins them with the segments.
+    """
+
+    def __init__(self, statement, serialization_mode):
+        parts = []
+        statement._write(parts.append, serialization_mode)
+
+        texts = []
+        parameters = []
+        current = []
+        for part in parts:
+            if type(part) is ParameterSlot:
+                texts.append(''.join(current))
+                parameters.append(part.parameter)
+                current = []
+            else:
+                current.append(part)
+        texts.append(''.join(current))
+
+        self._texts = tuple(texts)
+        self._parameters = tuple(parameters)
+        self._names = frozenset(parameter.name for parameter in parameters)
+
+    @property
+    def parameter_names(self):
+        names = []
+        for parameter in self._parameters:
+            if parameter.name not in names:
+                names.append(parameter.name)
+        return tuple(names)
+
+    def render(self, **values):
+        if len(values) != len(self._names) or not self._names.issuperset(values):
+            raise ValueError('expected values for parameters %s' % ', '.join(sorted(self._names)))
+
+        texts = self._texts
+        pieces = [texts[0]]
+        for index, parameter in enumerate(self._parameters, 1):
+            pieces.append(parameter.format(values[parameter.name]))
+            pieces.append(texts[index])
+        return ''.join(pieces)
+
+    def render_many(self, rows, workers=None, chunk_size=1000):
+        """Yields the rendering of each row, a mapping of parameter values, in order.
+
+        With workers the rows are rendered in chunks of chunk_size across that many spawned processes (see
+        util.process_pool); only a few chunks per worker are in flight, so rows may come from a generator of
+        any length.
+        """
+        if workers is None:
+            for row in rows:
+                yield self.render(**row)
+            return
+
+        rows = iter(rows)
+        with process_pool(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            pending = collections.deque()
+            try:
+                while True:
+                    while len(pending) < 2 * workers:
+                        chunk = list(itertools.islice(rows, chunk_size))
+                        if not chunk:
+                            break
+                        pending.append(pool.submit(_render_chunk, chunk))
+                    if not pending:
+                        return
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def _init_worker(template):
+    global _worker_template
+    _worker_template = template
+
+
+def _render_chunk(rows):
+    render = _worker_template.render
+    return [render(**row) for row in rows]
@@ -6,32 +6,42 @@ import abc
 import operator
 from .statement import *
 from .expression import *
+from .optimizer import optimize as optimize_query
 
 
 class StatementBuilder(metaclass=abc.ABCMeta):
     def __init__(self, parent_builder=None):
         self._statements = []
+        # set when built statements hold the containers of this builder, which are copied before changing them
+        self._shared = False
         if parent_builder:
             self._parent_builder = parent_builder
 
     def _plug_statement(self, statement: Statement):
+        if self._shared:
+            self._unshare()
         self._statements.append(statement)
 
+    def _unshare(self):
+        # copy on write: statements built before keep the containers they were given, which never change
+        self._shared = False
+        self._statements = list(self._statements)
+
+    def _build_group(self, statement: CompoundStatement):
+        statement._statements = self._statements
+        self._shared = True
+        self._parent_builder._plug_statement(statement)
+        return self._parent_builder
+
     @abc.abstractmethod
     def build(self):
         pass
 
     def axiom(self, s, p, o):
         if isinstance(s, str):
-            if is_valid_uri(s):
-                s = uri_f(s)
-            else:
-                s = var_f(s)
+            s = var_f(s) if classify_term(s) == TERM_VARIABLE else uri_f(s)
         if isinstance(o, str):
-            if is_valid_uri(o):
-                o = uri_f(o)
-            else:
-                o = var_f(o)
+            o = var_f(o) if classify_term(o) == TERM_VARIABLE else uri_f(o)
         self._plug_statement(AxiomStatement(s, p, o))
         return self
 
@@ -55,7 +65,7 @@ class StatementBuilder(metaclass=abc.ABCMeta):
         return CompoundStatementBuilder(OptionalStatement, self)
 
     def union(self):
-        add_keyword = self._statements and type(self._statements[len(self._statements)-1]) == UnionStatement
+        add_keyword = len(self._statements) > 0 and type(self._statements[-1]) == UnionStatement
         return CompoundStatementBuilder(UnionStatement, self, add_keyword=add_keyword)
 
     def minus(self):
@@ -65,6 +75,10 @@ class StatementBuilder(metaclass=abc.ABCMeta):
         self._plug_statement(ValuesStatement(variables, variable_value_tuples))
         return self
 
+    def bulk_values(self, variables, columns):
+        self._plug_statement(BulkValuesStatement(variables, columns))
+        return self
+
     def bind(self, expression: Expression, variable):
         if isinstance(variable, str):
             variable = var_f(variable)
@@ -85,10 +99,7 @@ class CompoundStatementBuilder(StatementBuilder):
         super(CompoundStatementBuilder, self).__init__()
 
     def build(self):
-        statement = self._statement_cls(*self._cls_args, **self._cls_kwargs)
-        statement._statements = self._statements
-        self._parent_builder._plug_statement(statement)
-        return self._parent_builder
+        return self._build_group(self._statement_cls(*self._cls_args, **self._cls_kwargs))
 
 
 class QueryBuilder(StatementBuilder):
@@ -101,6 +112,8 @@ class QueryBuilder(StatementBuilder):
         self._limit = None
         self._offset = None
         self._is_distinct = False
+        self._render_cache = None
+        self._cacheable = True
 
         # not yet supported
         self._deletes = []
@@ -115,10 +128,14 @@ class QueryBuilder(StatementBuilder):
         return self._select
 
     def set_prefix(self, namespace, prefix):
+        if self._shared:
+            self._unshare()
         self._prefixes[prefix] = namespace
         return self
 
     def select(self, *expressions):
+        if self._shared:
+            self._unshare()
         for expression in expressions:
             if isinstance(expression, str):
                 if expression.strip() == '*':
@@ -141,6 +158,8 @@ class QueryBuilder(StatementBuilder):
                         prepared_expressions.append(item)
                     elif isinstance(item, str):
                         prepared_expressions.append(var_f(item))
+                if self._shared:
+                    self._unshare()
                 self._group_by.extend(prepared_expressions)
             else:
                 raise ValueError
@@ -164,6 +183,8 @@ class QueryBuilder(StatementBuilder):
                         prepared_expressions.append(item)
                     elif isinstance(item, str):
                         prepared_expressions.append(var_f(item))
+                if self._shared:
+                    self._unshare()
                 self._order_by.extend(prepared_expressions)
             else:
                 raise TypeError
@@ -179,8 +200,43 @@ class QueryBuilder(StatementBuilder):
         self._offset = offset_value
         return self
 
-    def build(self):
-        query = self._query_cls()
+    def render_cache(self, cache):
+        self._render_cache = cache
+        return self
+
+    def no_cache(self):
+        # results of the query are never served from or stored in a client result cache
+        self._cacheable = False
+        return self
+
+    @classmethod
+    def batch(cls, rows, template_fn, workers=None, serialization_mode=Statement.SERIALIZATION_PRETTY,
+              chunk_size=1000):
+        """Returns an iterator of query strings, one for each row of parameter values.
+
+        template_fn gets a new builder, fills it in with param_f(name) wherever the queries differ and returns
+        the builder or the built query. The query is built and rendered once; each row, a mapping of parameter
+        names to values, only formats its values into the rendered text. See PreparedQuery.render_many for
+        workers and chunk_size.
+        """
+        template = template_fn(cls())
+        if isinstance(template, StatementBuilder):
+            template = template.build()
+        return template.prepare(serialization_mode).render_many(rows, workers, chunk_size)
+
+    def _unshare(self):
+        super(QueryBuilder, self)._unshare()
+        self._select = list(self._select)
+        self._order_by = list(self._order_by)
+        self._group_by = list(self._group_by)
+        self._prefixes = dict(self._prefixes)
+
+    def _build_query(self):
+        # built queries are treated as immutable and take the builder containers as they are, which the builder
+        # copies before changing them again (see _unshare); __init__ is skipped as it only allocates containers
+        # that would be replaced right away
+        query = self._query_cls.__new__(self._query_cls)
+        query._key = None
         query._select = self._select
         query._is_distinct = self._is_distinct
         query._order_by = self._order_by
@@ -190,12 +246,23 @@ class QueryBuilder(StatementBuilder):
         query._prefixes = self._prefixes
         query._limit = self._limit
         query._offset = self._offset
+        query._render_cache = self._render_cache
+        query._cacheable = self._cacheable
 
+        # never changed by the builder
         query._deletes = self._deletes
         query._inserts = self._inserts
+        self._shared = True
+        return query
+
+    def _plug_into_parent(self, query):
+        self._parent_builder._plug_statement(CompoundStatement(query))
+
+    def build(self, optimize=False):
+        query = self._build_query()
 
         if hasattr(self, '_parent_builder'):
-            self._parent_builder._plug_statement(CompoundStatement(query))
+            self._plug_into_parent(query)
             return self._parent_builder
 
-        return query
+        return optimize_query(query) if optimize else query
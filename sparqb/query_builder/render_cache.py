@@ -0,0 +1,90 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import threading
+from collections import OrderedDict
+
+
+class RenderCache(object):
+    """Bounded LRU of rendered query text keyed by the structural key of the query.
+
+    A query consults its cache only once its structural key has been computed, for example by a result cache
+    or by hashing the query: keying a freshly built tree costs more than rendering it.
+    """
+
+    def __init__(self, max_entries=1024, max_size=None):
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError
+        if max_size is not None and max_size <= 0:
+            raise ValueError
+        self._max_entries = max_entries
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def size(self):
+        # total number of cached characters
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def render(self, statement, serialization_mode):
+        entry_key = (statement.key(), serialization_mode)
+        with self._lock:
+            text = self._entries.get(entry_key)
+            if text is not None:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return text
+            self.misses += 1
+
+        parts = []
+        statement._write(parts.append, serialization_mode)
+        text = ''.join(parts)
+
+        with self._lock:
+            if self._max_size is not None and len(text) > self._max_size:
+                return text
+            previous = self._entries.pop(entry_key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[entry_key] = text
+            self._size += len(text)
+            self._evict()
+        return text
+
+    def _evict(self):
+        while (self._max_entries is not None and len(self._entries) > self._max_entries) or \
+                (self._max_size is not None and self._size > self._max_size):
+            _, text = self._entries.popitem(last=False)
+            self._size -= len(text)
+            self.evictions += 1
+
+    def invalidate(self, statement=None):
+        with self._lock:
+            if statement is None:
+                self._entries.clear()
+                self._size = 0
+                return
+            key = statement.key()
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == key]:
+                self._size -= len(self._entries.pop(entry_key))
+
+    def clear(self):
+        self.invalidate()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self._entries), 'size': self._size}
@@ -3,65 +3,104 @@ __date__ = '19 February 2016'
 __copyright__ = 'Copyright (c) 2016 Seven Bridges Genomics'
 
 import abc
-from string import Template
+import copy
+import itertools
 from .expression import *
+from .expression import _write_joined, _write_marked_rows, _format_float, _VALUE_FORMATTERS
+from .prepared import PreparedQuery
+
+
+def _write_term(write, term):
+    if isinstance(term, Expression):
+        term._write(write)
+    else:
+        write(str(term))
 
 
 class Statement(metaclass=abc.ABCMeta):
+    __slots__ = ('_key',)
 
     SERIALIZATION_RAW = 'raw'
     SERIALIZATION_PRETTY = 'pretty'
 
+    def __init__(self):
+        self._key = None
+
     @abc.abstractmethod
-    def _serialize(self, serialization_mode=SERIALIZATION_RAW):
+    def _write(self, write, serialization_mode=SERIALIZATION_RAW):
         pass
 
+    def _serialize(self, serialization_mode=SERIALIZATION_RAW):
+        parts = []
+        self._write(parts.append, serialization_mode)
+        return ''.join(parts)
+
     @abc.abstractmethod
-    def key(self):
+    def _key_parts(self):
         pass
 
+    def key(self):
+        key = self._key
+        if key is None:
+            key = self._key = structural_key(self, self._key_parts())
+        return key
+
     def __hash__(self):
         return hash(self.key())
 
     def serialize(self, serialization_mode=SERIALIZATION_PRETTY):
         return self._serialize(serialization_mode)
 
+    def write_to(self, stream, serialization_mode=SERIALIZATION_PRETTY):
+        self._write(stream.write, serialization_mode)
+
     def __str__(self):
         return self.serialize(Statement.SERIALIZATION_RAW)
 
 
 class CompoundStatement(Statement):
+    __slots__ = ('_statements',)
+
+    # written between the statements of the group
+    _statement_separator = ' \n'
+
     def __init__(self, *statements):
         self._statements = statements
         super(CompoundStatement, self).__init__()
 
-    def key(self):
-        sts = tuple(sorted([s.key() for s in self._statements]))
-        return hash(sts)
+    def _key_parts(self):
+        return (self._statements,)
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        result = '{\n'
-        result += ' \n'.join([str(statement) for statement in self._statements])
-        result += '}\n'
-        return result
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write('{\n')
+        _write_joined(write, self._statements, self._statement_separator)
+        write('}\n')
 
 
 class AxiomStatement(Statement):
+    __slots__ = ('_s', '_p', '_o')
+
     def __init__(self, s, p, o):
         super(AxiomStatement, self).__init__()
         self._s = s
         self._p = p
         self._o = o
 
-    def key(self):
-        sts = tuple([str(s) for s in [self._s, self._p, self._o]])
-        return hash(sts)
+    def _key_parts(self):
+        return (self._s, self._p, self._o)
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        return ' ' + str(self._s) + ' ' + str(self._p) + ' ' + str(self._o) + ' . \n'
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write(' ')
+        _write_term(write, self._s)
+        write(' ')
+        _write_term(write, self._p)
+        write(' ')
+        _write_term(write, self._o)
+        write(' . \n')
 
 
 class ValuesStatement(Statement):
+    __slots__ = ('_variables_tuple', '_value_tuples')
 
     def __init__(self, variables_tuple, value_tuples):
         super(ValuesStatement, self).__init__()
@@ -73,26 +112,173 @@ class ValuesStatement(Statement):
 
         self._variables_tuple = tuple(item if isinstance(item, Expression) else var_f(item) for item in
                                       variables_tuple)
-        self._value_tuples = []
+        value_rows = []
 
         for item in value_tuples:
             if type(item) != tuple:
                 raise TypeError
             elif len(item) != total:
                 raise ValueError
-            self._value_tuples.append(item)
+            value_rows.append(item)
 
-    def key(self):
-        return hash(tuple(str(s) for s in self._variables_tuple)) ^ \
-               hash(tuple(sorted(hash(v) for v in self._value_tuples)))
+        self._value_tuples = tuple(value_rows)
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        result = ' VALUES ( %s ) { ' % ' '.join(str(item) for item in self._variables_tuple)
-        result += '\n '.join(['(%s)' % s for s in self._value_tuples]) + ' } \n'
-        return result
+    def _key_parts(self):
+        return (self._variables_tuple, self._value_tuples)
+
+    @property
+    def row_count(self):
+        return len(self._value_tuples)
+
+    def _row_chunks(self, size):
+        for start in range(0, len(self._value_tuples), size):
+            parts = []
+            self._write_value_rows(parts.append, self._value_tuples[start:start + size])
+            yield ''.join(parts)
+
+    def _write_rows(self, write):
+        self._write_value_rows(write, self._value_tuples)
+
+    @staticmethod
+    def _write_value_rows(write, rows):
+        first = True
+        for row in rows:
+            write('(' if first else '\n (')
+            first = False
+            for index, term in enumerate(row):
+                if index:
+                    write(' ')
+                _write_term(write, term)
+            write(')')
+
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write(' VALUES ( ')
+        _write_joined(write, self._variables_tuple, ' ')
+        write(' ) { ')
+        _write_marked_rows(write, self)
+        write(' } \n')
+
+
+# number of rows of a BulkValuesStatement joined into a single write
+VALUES_CHUNK_ROWS = 4096
+
+# names of the SPARQL aggregate functions
+_AGGREGATES = frozenset(('COUNT', 'SUM', 'MIN', 'MAX', 'AVG', 'SAMPLE', 'GROUP_CONCAT'))
+
+_INTEGER_TYPECODES = frozenset('bBhHiIlLqQ')
+
+
+def _format_cell(value):
+    formatter = _VALUE_FORMATTERS.get(type(value))
+    if formatter is not None:
+        return formatter(value)
+    if value is None:
+        return 'UNDEF'
+    return format_value(value)
+
+
+def _format_cells(column):
+    # picks the formatter once per column: array.array and NumPy arrays carry their element type
+    typecode = getattr(column, 'typecode', None)
+    if typecode is not None:
+        if typecode in _INTEGER_TYPECODES:
+            return map(str, column)
+        if typecode in ('f', 'd'):
+            return map(_format_float, column)
+        return map(_format_cell, column)
+
+    dtype = getattr(column, 'dtype', None)
+    if dtype is not None and hasattr(column, 'tolist'):
+        values = column.tolist()
+        if dtype.kind in ('i', 'u'):
+            return map(str, values)
+        if dtype.kind == 'f':
+            return map(_format_float, values)
+        return map(_format_cell, values)
+
+    return map(_format_cell, column)
+
+
+class BulkValuesStatement(Statement):
+    """VALUES block built from one column of values per variable.
+
+    Python values are formatted as RDF literals (strings are escaped), expressions are rendered as they are
+    and None becomes UNDEF. Columns are referenced, not copied, and must not change after building.
+    """
+    __slots__ = ('_variables_tuple', '_columns', '_row_count')
+
+    def __init__(self, variables, columns):
+        super(BulkValuesStatement, self).__init__()
+
+        if type(variables) not in (tuple, list) or type(columns) not in (tuple, list):
+            raise TypeError
+        if len(variables) == 0 or len(variables) != len(columns):
+            raise ValueError
+
+        self._variables_tuple = tuple(item if isinstance(item, Expression) else var_f(item) for item in variables)
+
+        materialized = []
+        row_count = None
+        for column in columns:
+            if isinstance(column, (str, bytes)):
+                raise TypeError
+            if not hasattr(column, '__len__'):
+                column = list(column)
+            if row_count is None:
+                row_count = len(column)
+            elif len(column) != row_count:
+                raise ValueError('VALUES columns must have the same length')
+            materialized.append(column)
+
+        self._columns = tuple(materialized)
+        self._row_count = row_count
+
+    @property
+    def row_count(self):
+        return self._row_count
+
+    def _rows(self):
+        cells = [_format_cells(column) for column in self._columns]
+        if len(cells) == 1:
+            return cells[0]
+        return map(' '.join, zip(*cells))
+
+    def _row_chunks(self, size):
+        rows = self._rows()
+        while True:
+            chunk = list(itertools.islice(rows, size))
+            if not chunk:
+                break
+            yield '(' + ')\n ('.join(chunk) + ')'
+
+    def _write_rows(self, write):
+        first = True
+        for rows in self._row_chunks(VALUES_CHUNK_ROWS):
+            if not first:
+                write('\n ')
+            first = False
+            write(rows)
+
+    def _key_parts(self):
+        return (self._variables_tuple, digest_columns(self._columns))
+
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write(' VALUES ( ')
+        _write_joined(write, self._variables_tuple, ' ')
+        write(' ) { ')
+        _write_marked_rows(write, self)
+        write(' } \n')
 
 
 class Query(CompoundStatement):
+    __slots__ = ('_select', '_order_by', '_group_by', '_having', '_prefixes', '_limit', '_offset', '_is_distinct',
+                 '_render_cache', '_cacheable', '_deletes', '_inserts')
+
+    # sections in the order they are rendered, each written by the matching _write_<section> method
+    _sections = ('prefixes', 'select', 'where', 'group_by', 'having', 'order_by', 'limit', 'offset')
+
+    _statement_separator = ''
+
     def __init__(self):
         super(Query, self).__init__()
         self._select = []
@@ -103,93 +289,255 @@ class Query(CompoundStatement):
         self._limit = None
         self._offset = None
         self._is_distinct = False
-        self._query_template = Template('''$prefixes$select$where$group_by$having$order_by$limit$offset''')
+
+        # optional RenderCache consulted when the whole query is serialized
+        self._render_cache = None
+        # whether client result caches may serve this query
+        self._cacheable = True
 
         # not yet supported - TODO
         self._deletes = []
         self._inserts = []
 
     def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
+        # keying a fresh tree costs more than rendering it, so only queries keyed already consult the cache
+        if self._render_cache is not None and self._key is not None:
+            return self._render_cache.render(self, serialization_mode)
+        return super(Query, self)._serialize(serialization_mode)
+
+    def write_to(self, stream, serialization_mode=Statement.SERIALIZATION_PRETTY):
+        if self._render_cache is not None and self._key is not None:
+            stream.write(self._render_cache.render(self, serialization_mode))
+        else:
+            super(Query, self).write_to(stream, serialization_mode)
+
+    def prepare(self, serialization_mode=Statement.SERIALIZATION_PRETTY):
+        return PreparedQuery(self, serialization_mode)
+
+    def to_bytes(self):
+        """Compact binary form of the query for sending it to other processes, see codec.encode."""
+        from .codec import encode
+        return encode(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Query decoded from the output of to_bytes; data may be a memoryview into a larger buffer."""
+        from .codec import decode
+        query = decode(data)
+        if not isinstance(query, cls):
+            raise TypeError('encoded %s is not a %s' % (type(query).__name__, cls.__name__))
+        return query
+
+    def split_values(self, max_rows, serialization_mode=Statement.SERIALIZATION_PRETTY):
+        """Returns a generator of query strings, cutting the VALUES block or IN list longer than max_rows into chunks.
+
+        The query is rendered once; only the rows of the split node are rendered per chunk. The results of the
+        chunks together are the results of the query, so the node must be one that every solution has to match:
+        a VALUES block of the top-level group, or an IN list that is a top-level FILTER or one of its &&
+        operands. ValueError is raised for other nodes, such as those under negation, MINUS, FILTER NOT
+        EXISTS or OPTIONAL, and for queries with aggregates, GROUP BY, HAVING, DISTINCT, ORDER BY, LIMIT or
+        OFFSET, which would apply to each chunk separately.
+        """
+        if max_rows <= 0:
+            raise ValueError
 
-        # prefix section
-
-        prefix_records = ''
-        if len(self._prefixes) > 0:
-            prefix_records += ''.join(['PREFIX ' + prefix + ': ' + '<' + self._prefixes[prefix] + '>' + '\n'
-                                       for prefix in self._prefixes])
-
-        # select section
-
-        select_section = 'select '
+        writer = _SplitWriter(max_rows)
+        self._write(writer, serialization_mode)
+        parts = writer.parts
+
+        open_nodes = []
+        oversized = []
+        for index, part in enumerate(parts):
+            if type(part) is not RowsMarker:
+                continue
+            if open_nodes and open_nodes[-1][0] is part.node:
+                node, begin = open_nodes.pop()
+                if node.row_count > max_rows:
+                    oversized.append((node, begin, index))
+            else:
+                open_nodes.append((part.node, index))
+
+        if not oversized:
+            return iter((''.join(parts),))
+        if len(oversized) > 1:
+            raise ValueError('only one VALUES block or IN list can be split')
+
+        node, begin, end = oversized[0]
+        if not any(node is splittable for splittable in self._splittable_nodes()):
+            raise ValueError('only VALUES blocks of the top-level group and IN lists of its filters can be split')
+        if self._is_distinct or self._group_by or self._having is not None or self._order_by or \
+                self._limit is not None or self._offset is not None or self._has_aggregates():
+            raise ValueError('cannot split a query with aggregates, GROUP BY, HAVING, DISTINCT, ORDER BY, LIMIT '
+                             'or OFFSET')
+        if isinstance(node, InExpression) and len(set(value.key() for value in node._values)) < node.row_count:
+            raise ValueError('cannot split an IN list with repeated values')
+        prefix = ''.join(parts[:begin])
+        suffix = ''.join(parts[end + 1:])
+        return (prefix + rows + suffix for rows in node._row_chunks(max_rows))
+
+    def _splittable_nodes(self):
+        nodes = []
+        for statement in self._statements:
+            if isinstance(statement, (ValuesStatement, BulkValuesStatement)):
+                nodes.append(statement)
+            elif type(statement) is FilterStatement:
+                conjuncts = [statement._filter_expression]
+                while conjuncts:
+                    expression = conjuncts.pop()
+                    if type(expression) is BinaryOperatorExpression and expression._operator == '&&':
+                        conjuncts += (expression._left_expression, expression._right_expression)
+                    elif type(expression) is InExpression:
+                        nodes.append(expression)
+        return nodes
+
+    def _has_aggregates(self):
+        from .tree import walk
+        return any(type(node) is FunctionExpression and node._name.upper() in _AGGREGATES
+                   for item in self._select if isinstance(item, Expression) for node in walk(item))
+
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        for section in self._sections:
+            getattr(self, '_write_' + section)(write)
+
+    def _write_prefixes(self, write):
+        for prefix in self._prefixes:
+            write('PREFIX ' + prefix + ': <' + self._prefixes[prefix] + '>\n')
+
+    def _write_select(self, write):
+        write('select ')
         if len(self._select) > 0:
-            # select query
-            selects = self._select
             if self._is_distinct:
-                selects = [DistinctExpression(*selects)]
-            select_section += ' '.join(str(item) for item in selects)
+                DistinctExpression(*self._select)._write(write)
+            else:
+                _write_joined(write, self._select, ' ')
         else:
-            select_section += '*'
+            write('*')
 
-        # where section
+    def _write_where(self, write):
+        write('\nWHERE{\n')
+        _write_joined(write, self._statements, self._statement_separator)
+        write('}\n')
 
-        where_section = ''
-        if len(self._statements) > 0:
-            for statement in self._statements:
-                where_section += str(statement)
-        where_section = '\nWHERE{\n' + where_section + '}\n'
-
-        # group by section
-
-        group_by_section = ''
+    def _write_group_by(self, write):
         if len(self._group_by) > 0:
-            group_by_section += '\nGROUP BY ' + ' '.join([str(item) for item in self._group_by])
-
-        # having section
+            write('\nGROUP BY ')
+            _write_joined(write, self._group_by, ' ')
 
-        having_section = ''
+    def _write_having(self, write):
         if self._having:
-            having_section += '\nHAVING ' + str(self._having)
+            write('\nHAVING ')
+            self._having._write(write)
 
-        # order by section
-
-        order_by_section = ''
+    def _write_order_by(self, write):
         if len(self._order_by) > 0:
-            order_by_section = 'ORDER BY ' + ' '.join([str(item) for item in self._order_by])
-
-        # limit section
+            write('\nORDER BY ')
+            _write_joined(write, self._order_by, ' ')
 
-        limit_section = ''
+    def _write_limit(self, write):
         if self._limit is not None:
-            limit_section += ' LIMIT ' + str(self._limit) + '\n'
+            write(' LIMIT ')
+            _write_term(write, self._limit)
+            write('\n')
 
-        # offset section
-
-        offset_section = ''
+    def _write_offset(self, write):
         if self._offset is not None:
-            offset_section += ' OFFSET ' + str(self._offset) + '\n'
-
-        return self._query_template.substitute(prefixes=prefix_records, select=select_section, where=where_section,
-                                       group_by=group_by_section, having=having_section,
-                                       order_by=order_by_section, limit=limit_section,
-                                       offset=offset_section)
+            write(' OFFSET ')
+            _write_term(write, self._offset)
+            write('\n')
 
     @property
     def select_items(self):
         return self._select
 
-    def key(self):
-        s = tuple(sorted(str(s) for s in self._select))
-        ob = tuple(sorted(str(o) for o in self._order_by))
-        gb = tuple(sorted(str(g) for g in self._group_by))
-        hv = str(self._having)
+    @property
+    def cacheable(self):
+        return self._cacheable
 
-        return hash(s) ^ hash(ob) ^ hash(gb) ^ hash(hv) ^ super(Query, self).key()
+    @property
+    def order_by_items(self):
+        return self._order_by
+
+    @property
+    def limit(self):
+        return self._limit
+
+    @property
+    def offset(self):
+        return self._offset
+
+    def paginated(self):
+        """Copy of the query whose LIMIT and OFFSET are the $limit and $offset parameters."""
+        if len(self._order_by) == 0:
+            raise ValueError('paging without ORDER BY gives inconsistent results')
+        page = copy.copy(self)
+        page._key = None
+        page._render_cache = None
+        page._limit = param_f('limit')
+        page._offset = param_f('offset')
+        return page
+
+    @property
+    def order_key(self):
+        """Variable of a single ORDER BY key and whether it is descending, or None if there is no such key."""
+        if len(self._order_by) != 1:
+            return None
+        item = self._order_by[0]
+        if isinstance(item, VariableExpression):
+            return item, False
+        if isinstance(item, FunctionExpression) and item.name.upper() in ('ASC', 'DESC') and \
+                len(item.arguments) == 1 and isinstance(item.arguments[0], VariableExpression):
+            return item.arguments[0], item.name.upper() == 'DESC'
+        return None
+
+    def keyset_paginated(self, by_string=False):
+        """Copies of the query for keyset paging on its single ORDER BY variable, both with LIMIT $limit.
+
+        The first copy is the first page; the second also filters ?key > $after (< for DESC). by_string compares
+        STR(?key) instead, which orders IRIs and string literals like ORDER BY does. The key has to be unique,
+        otherwise rows sharing the last key of a page are skipped.
+        """
+        order_key = self.order_key
+        if order_key is None:
+            raise ValueError('keyset paging needs ORDER BY on a single variable')
+        if self._offset is not None:
+            raise ValueError('keyset paging does not combine with OFFSET')
+        variable, descending = order_key
+        for item in self._select:
+            if isinstance(item, AsExpression) and item.variable.name == variable.name:
+                raise ValueError('keyset paging needs a key bound in WHERE, not a select alias')
+
+        first = copy.copy(self)
+        first._key = None
+        first._render_cache = None
+        first._limit = param_f('limit')
+
+        key = FunctionExpression('STR', variable) if by_string else variable
+        after = copy.copy(first)
+        after._statements = tuple(self._statements) + (
+            FilterStatement(key < param_f('after') if descending else key > param_f('after')),)
+        return first, after
+
+    def _key_parts(self):
+        return (self._prefixes, self._select, self._is_distinct, self._statements, self._group_by, self._having,
+                self._order_by, self._limit, self._offset)
 
-    def __hash__(self):
-        return hash(self.key())
+
+class _SplitWriter(object):
+    # collects rendered parts, leaving out the rows of nodes that split_values renders per chunk
+    def __init__(self, max_rows):
+        self.parts = []
+        self._max_rows = max_rows
+
+    def __call__(self, part):
+        self.parts.append(part)
+
+    def skip_rows(self, node):
+        return node.row_count > self._max_rows
 
 
 class ServiceStatement(CompoundStatement):
+    __slots__ = ('_uri_for_service',)
+
     def __init__(self, uri, *statements):
         super(ServiceStatement, self).__init__()
         if is_valid_uri(uri):
@@ -198,70 +546,74 @@ class ServiceStatement(CompoundStatement):
             raise ValueError
         self._statements = statements
 
-    def key(self):
-        return hash('service') ^ hash(str(self._uri_for_service)) ^ super(ServiceStatement, self).key()
+    def _key_parts(self):
+        return (self._uri_for_service,) + super(ServiceStatement, self)._key_parts()
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        result = ' SERVICE <' + self._uri_for_service + '> '
-        result += super(ServiceStatement, self)._serialize()
-        return result
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write(' SERVICE <' + self._uri_for_service + '> ')
+        super(ServiceStatement, self)._write(write)
 
 
 class FilterExistsStatement(CompoundStatement):
+    __slots__ = ('_not_exists_type',)
+
     def __init__(self, *statements, not_exists_type=False):
         super(FilterExistsStatement, self).__init__()
         self._statements = statements
         self._not_exists_type = not_exists_type
 
-    def key(self):
-        return hash('filter_exists') ^ hash(str(self._not_exists_type)) ^ super(FilterExistsStatement, self).key()
+    def _key_parts(self):
+        return (self._not_exists_type,) + super(FilterExistsStatement, self)._key_parts()
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
         if not self._not_exists_type:
-            result = ' FILTER EXISTS ' + super(FilterExistsStatement, self)._serialize()
+            write(' FILTER EXISTS ')
         else:
-            result = ' FILTER NOT EXISTS ' + super(FilterExistsStatement, self)._serialize()
-        return result
+            write(' FILTER NOT EXISTS ')
+        super(FilterExistsStatement, self)._write(write)
 
 
 class UnionStatement(CompoundStatement):
+    __slots__ = ('_add_keyword',)
+
     def __init__(self, *statements, add_keyword=True):
         super(UnionStatement, self).__init__(*statements)
         self._add_keyword = add_keyword
 
-    def key(self):
-        return hash('union') ^ super(UnionStatement, self).key()
+    def _key_parts(self):
+        return (self._add_keyword,) + super(UnionStatement, self)._key_parts()
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        result = super(UnionStatement, self)._serialize()
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
         if self._add_keyword:
-            result = 'UNION ' + result
-        return result
+            write('UNION ')
+        super(UnionStatement, self)._write(write)
 
 
 class OptionalStatement(CompoundStatement):
+    __slots__ = ()
+
     def __init__(self, *statements):
         super(OptionalStatement, self).__init__(*statements)
 
-    def key(self):
-        return hash('optional') ^ super(OptionalStatement, self).key()
-
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        return 'OPTIONAL ' + super(OptionalStatement, self)._serialize()
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write('OPTIONAL ')
+        super(OptionalStatement, self)._write(write)
 
 
 class MinusStatement(CompoundStatement):
+    __slots__ = ()
+
     def __init__(self, *statements):
         super(MinusStatement, self).__init__(*statements)
 
-    def key(self):
-        return hash('minus') ^ super(MinusStatement, self).key()
-
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        return 'MINUS ' + super(MinusStatement, self)._serialize()
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write('MINUS ')
+        super(MinusStatement, self)._write(write)
 
 
 class BindStatement(Statement):
+    __slots__ = ('_expression', '_variable')
+
     def __init__(self, expression: Expression, variable: VariableExpression):
         super(BindStatement, self).__init__()
         if expression.type != Expression.VALUE_TYPE:
@@ -271,22 +623,30 @@ class BindStatement(Statement):
         self._expression = expression
         self._variable = variable
 
-    def key(self):
-        return hash(str(self._variable)) ^ hash(str(self._expression))
+    def _key_parts(self):
+        return (self._expression, self._variable)
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        return 'BIND' + str(AsExpression(self._expression, self._variable)) + '\n'
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write('BIND(')
+        self._expression._write(write)
+        write(' AS ')
+        self._variable._write(write)
+        write(')\n')
 
 
 class FilterStatement(Statement):
+    __slots__ = ('_filter_expression',)
+
     def __init__(self, expression: Expression):
         super(FilterStatement, self).__init__()
         if expression.type != Expression.VALUE_TYPE:
             raise ValueError
         self._filter_expression = expression
 
-    def key(self):
-        return hash(str(self._filter_expression))
+    def _key_parts(self):
+        return (self._filter_expression,)
 
-    def _serialize(self, serialization_mode=Statement.SERIALIZATION_RAW):
-        return ' FILTER (' + str(self._filter_expression) + ')\n'
+    def _write(self, write, serialization_mode=Statement.SERIALIZATION_RAW):
+        write(' FILTER (')
+        self._filter_expression._write(write)
+        write(')\n')
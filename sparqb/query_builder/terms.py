@@ -0,0 +1,32 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import weakref
+
+
+class TermTable(object):
+    """Weak-value table handing out one shared instance per (term class, value).
+
+    Terms stay in the table only while something else references them.
+    """
+
+    def __init__(self):
+        self._terms = weakref.WeakValueDictionary()
+
+    def intern(self, term_cls, value, factory=None):
+        key = (term_cls, value)
+        term = self._terms.get(key)
+        if term is None:
+            term = factory(value) if factory is not None else term_cls(value)
+            term = self._terms.setdefault(key, term)
+        return term
+
+    def __len__(self):
+        return len(self._terms)
+
+    def clear(self):
+        self._terms.clear()
+
+
+default_term_table = TermTable()
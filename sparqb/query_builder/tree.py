@@ -0,0 +1,118 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import copy
+
+from .statement import *
+
+# slots that hold caches or bookkeeping rather than content of the node
+_SKIPPED_FIELDS = frozenset(('_key', '_render_cache', '__weakref__'))
+
+_FIELDS = {}
+
+
+def node_fields(node):
+    """Names of the content slots of an expression or statement, base class slots first."""
+    cls = type(node)
+    fields = _FIELDS.get(cls)
+    if fields is None:
+        names = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get('__slots__', ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name not in _SKIPPED_FIELDS and name not in names:
+                    names.append(name)
+        fields = _FIELDS[cls] = tuple(names)
+    return fields
+
+
+def is_node(value):
+    return isinstance(value, (Expression, Statement))
+
+
+def replace(node, **changes):
+    """Shallow copy of a node with some fields changed; the copy computes its own structural key."""
+    copied = copy.copy(node)
+    copied._key = None
+    for name, value in changes.items():
+        setattr(copied, name, value)
+    return copied
+
+
+def walk(node):
+    """Yields the node and all nodes below it, depth first in field order."""
+    yield node
+    for name in node_fields(node):
+        yield from _walk_value(getattr(node, name, None))
+
+
+def _walk_value(value):
+    if is_node(value):
+        yield from walk(value)
+    elif type(value) in (tuple, list):
+        for item in value:
+            if is_node(item) or type(item) in (tuple, list, dict):
+                yield from _walk_value(item)
+    elif type(value) is dict:
+        for item in value.values():
+            yield from _walk_value(item)
+
+
+def term_variable(term):
+    """Name of the variable a triple pattern term stands for, or None for constants."""
+    if isinstance(term, VariableExpression):
+        return term.name
+    if isinstance(term, str) and term.startswith('?') and len(term) > 1:
+        return term[1:]
+    return None
+
+
+def variable_names(node):
+    """Yields the names of the variables used below node in order of appearance, with repetitions."""
+    for child in walk(node):
+        if isinstance(child, VariableExpression):
+            yield child.name
+        elif isinstance(child, AxiomStatement):
+            # triple patterns may hold variables as plain '?name' strings
+            for term in (child._s, child._p, child._o):
+                if isinstance(term, str):
+                    name = term_variable(term)
+                    if name is not None:
+                        yield name
+
+
+def has_fixed_join_order(query):
+    """Whether the query turns the Blazegraph optimizer off, so its triple patterns run in the written order."""
+    return any(isinstance(node, AxiomStatement) and node._p == 'hint:optimizer' and node._o == '"None"'
+               for node in walk(query))
+
+
+def transform(node, fn):
+    """Rebuilds the tree bottom up, replacing every node by fn(node); unchanged subtrees are shared."""
+    changes = {}
+    for name in node_fields(node):
+        value = getattr(node, name, None)
+        new_value = _transform_value(value, fn)
+        if new_value is not value:
+            changes[name] = new_value
+    if changes:
+        node = replace(node, **changes)
+    return fn(node)
+
+
+def _transform_value(value, fn):
+    if is_node(value):
+        return transform(value, fn)
+    if type(value) in (tuple, list):
+        items = [_transform_value(item, fn) if is_node(item) or type(item) in (tuple, list, dict) else item
+                 for item in value]
+        if any(new is not old for new, old in zip(items, value)):
+            return type(value)(items)
+        return value
+    if type(value) is dict:
+        items = {key: _transform_value(item, fn) for key, item in value.items()}
+        if any(items[key] is not item for key, item in value.items()):
+            return items
+        return value
+    return value
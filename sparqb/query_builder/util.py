@@ -2,26 +2,141 @@ __author__ = 'Adam Stanojevic <adam.stanojevic@sbgenomics.com>'
 __date__ = '10 March 2016'
 __copyright__ = 'Copyright (c) 2016 Seven Bridges Genomics'
 
+import concurrent.futures
+import functools
+import hashlib
+import itertools
+import multiprocessing
+import re
+
+TERM_SHORT = 'short'
+TERM_URL = 'url'
+TERM_VARIABLE = 'variable'
+
+# number of distinct strings whose classification is remembered
+TERM_CACHE_SIZE = 8192
+
+# size in bytes of structural keys of expressions and statements
+KEY_SIZE = 16
+
+# number of values of a column joined into a single update of its digest
+DIGEST_CHUNK_VALUES = 4096
+
+_REGEX_SHORT = re.compile(r'^[A-Z0-9_]*:[A-Z0-9_]+$', re.IGNORECASE)
+
+_REGEX_URL = re.compile(
+        r'^https?://'
+        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
+        r'localhost|'
+        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
+        r'(?::\d+)?'
+        r'(?:/?|[/?]\S+|\S+#?\S+)$', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=TERM_CACHE_SIZE)
+def classify_term(term):
+    """Returns TERM_SHORT for prefixed names, TERM_URL for full IRIs and TERM_VARIABLE for anything else."""
+    if _REGEX_SHORT.fullmatch(term) is not None:
+        return TERM_SHORT
+    if _REGEX_URL.fullmatch(term) is not None:
+        return TERM_URL
+    return TERM_VARIABLE
+
 
 def is_valid_short(uri):
-    import re
-    regex_short = re.compile(
-            r'^[A-Z0-9_]*:[A-Z0-9_]+$', re.IGNORECASE)
-    return uri is not None and (regex_short.fullmatch(uri) is not None)
+    return uri is not None and classify_term(uri) == TERM_SHORT
 
 
 def is_valid_url(url):
-    import re
-    regex_url = re.compile(
-            r'^https?://'
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
-            r'localhost|'
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
-            r'(?::\d+)?'
-            r'(?:/?|[/?]\S+|\S+#?\S+)$', re.IGNORECASE)
-
-    return url is not None and (regex_url.fullmatch(url) is not None)
+    return url is not None and classify_term(url) == TERM_URL
 
 
 def is_valid_uri(uri):
-    return uri is not None and (is_valid_short(uri) or is_valid_url(uri))
+    return uri is not None and classify_term(uri) != TERM_VARIABLE
+
+
+_LITERAL_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'})
+
+_REGEX_LITERAL_ESCAPES = re.compile(r'[\\"\n\r\t]')
+
+
+def escape_literal(text):
+    # most literals need no escaping and the regex scan is much cheaper than translate
+    if _REGEX_LITERAL_ESCAPES.search(text) is None:
+        return text
+    return text.translate(_LITERAL_ESCAPES)
+
+
+def process_pool(workers, initializer=None, initargs=()):
+    """Pool of worker processes that are spawned, never forked: forking is unsafe in a process running threads."""
+    return concurrent.futures.ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                                  initializer=initializer, initargs=initargs)
+
+
+_CLASS_TAGS = {}
+
+
+def structural_key(node, parts):
+    """Digest of the node's class and parts; nested nodes contribute their own (cached) keys."""
+    cls = type(node)
+    tag = _CLASS_TAGS.get(cls)
+    if tag is None:
+        tag = _CLASS_TAGS[cls] = (cls.__module__ + '.' + cls.__qualname__).encode()
+    chunks = [tag]
+    _collect_key(chunks.append, parts)
+    return hashlib.blake2b(b''.join(chunks), digest_size=KEY_SIZE).digest()
+
+
+def digest_columns(columns):
+    """Digest of columns of values, fed to the hash in chunks without rendering or joining them.
+
+    Columns with a numeric buffer (array.array, NumPy) are hashed as raw memory together with their type.
+    """
+    digest = hashlib.blake2b(digest_size=KEY_SIZE)
+    for column in columns:
+        typecode = getattr(column, 'typecode', None)
+        dtype = getattr(column, 'dtype', None)
+        if typecode is not None:
+            digest.update(b'A' + typecode.encode())
+            digest.update(memoryview(column))
+        elif dtype is not None and dtype.kind in 'biuf' and hasattr(column, 'tobytes'):
+            digest.update(b'D' + dtype.str.encode())
+            digest.update(column.tobytes())
+        else:
+            if dtype is not None and hasattr(column, 'tolist'):
+                column = column.tolist()
+            values = iter(column)
+            while True:
+                parts = []
+                _collect_key(parts.append, itertools.islice(values, DIGEST_CHUNK_VALUES))
+                if len(parts) == 2:
+                    break
+                digest.update(b''.join(parts))
+        digest.update(b'|')
+    return digest.digest()
+
+
+def _collect_key(append, values):
+    append(b'(')
+    for value in values:
+        value_type = type(value)
+        if value_type is str:
+            data = value.encode()
+            append(b'S%d:' % len(data))
+            append(data)
+        elif value_type is tuple or value_type is list:
+            _collect_key(append, value)
+        elif value is None:
+            append(b'N')
+        elif hasattr(value, 'key'):
+            append(b'K')
+            append(value.key())
+        elif isinstance(value, dict):
+            append(b'{')
+            _collect_key(append, value.items())
+            append(b'}')
+        else:
+            data = repr(value).encode()
+            append(b'V' + value_type.__name__.encode() + b'%d:' % len(data))
+            append(data)
+    append(b')')
@@ -0,0 +1,182 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from sparqb.query_builder.canonical import canonical_key
+from sparqb.query_builder.statement import Query, Statement
+
+
+def result_key(query, endpoint, accept, canonical=False):
+    """Cache key of a query sent to an endpoint: the structural key of built queries, a digest of text ones.
+
+    With canonical, built queries are keyed by their canonical form, so queries that differ only in variable
+    names, prefix order or the order of triple patterns share an entry.
+    """
+    if isinstance(query, Query) and canonical:
+        query_key = b'C' + canonical_key(query)
+    elif isinstance(query, Statement):
+        query_key = b'K' + query.key()
+    else:
+        query_key = b'T' + hashlib.blake2b(query.encode(), digest_size=16).digest()
+    location = hashlib.blake2b(('%s\n%s' % (endpoint, accept)).encode(), digest_size=16).digest()
+    return query_key + location
+
+
+class ResultCache(object):
+    """In-memory LRU of response bodies bounded by total bytes; entries expire ttl seconds after being stored."""
+
+    def __init__(self, max_size=64 * 1024 * 1024, ttl=300.0, max_entry_size=None, canonical=False):
+        if max_size <= 0 or (ttl is not None and ttl <= 0):
+            raise ValueError
+        self._max_size = max_size
+        self._ttl = ttl
+        self._max_entry_size = max_entry_size if max_entry_size is not None else max_size
+        self._canonical = canonical
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_entry_size(self):
+        # larger responses are not stored, so callers can stop buffering them early
+        return self._max_entry_size
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, query, endpoint, accept):
+        return result_key(query, endpoint, accept, self._canonical)
+
+    def get(self, key):
+        """(content_type, body) stored under key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, content_type, body = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return content_type, body
+                del self._entries[key]
+                self._size -= len(body)
+            self.misses += 1
+            return None
+
+    def put(self, key, content_type, body):
+        if len(body) > self._max_entry_size:
+            return
+        expires = time.monotonic() + self._ttl if self._ttl is not None else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[2])
+            self._entries[key] = (expires, content_type, body)
+            self._size += len(body)
+            while self._size > self._max_size:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._size = 0
+            else:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._size -= len(entry[2])
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self._entries), 'size': self._size}
+
+
+class SqliteResultCache(ResultCache):
+    """ResultCache kept in a sqlite database file, so entries survive process restarts.
+
+    Expiry uses wall-clock time; least recently read entries are evicted first.
+    """
+
+    def __init__(self, path, max_size=512 * 1024 * 1024, ttl=3600.0, max_entry_size=None, canonical=False):
+        super(SqliteResultCache, self).__init__(max_size, ttl, max_entry_size, canonical)
+        self._entries = None
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, expires REAL, '
+                                 'accessed REAL, size INTEGER, content_type TEXT, body BLOB)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+        self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute('SELECT expires, content_type, body FROM results WHERE key = ?',
+                                           (key,)).fetchone()
+            if row is not None:
+                expires, content_type, body = row
+                if expires is None or expires > now:
+                    self._connection.execute('UPDATE results SET accessed = ? WHERE key = ?', (now, key))
+                    self.hits += 1
+                    return content_type, bytes(body)
+                self._delete(key)
+            self.misses += 1
+            return None
+
+    def put(self, key, content_type, body):
+        if len(body) > self._max_entry_size:
+            return
+        now = time.time()
+        expires = now + self._ttl if self._ttl is not None else None
+        with self._lock:
+            self._delete(key)
+            self._connection.execute('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                                     (key, expires, now, len(body), content_type, body))
+            self._size += len(body)
+            while self._size > self._max_size:
+                row = self._connection.execute('SELECT key FROM results ORDER BY accessed LIMIT 1').fetchone()
+                if row is None:
+                    break
+                self._delete(row[0])
+                self.evictions += 1
+
+    def _delete(self, key):
+        row = self._connection.execute('SELECT size FROM results WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            self._connection.execute('DELETE FROM results WHERE key = ?', (key,))
+            self._size -= row[0]
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._connection.execute('DELETE FROM results')
+                self._size = 0
+            else:
+                self._delete(key)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self), 'size': self._size}
+
+    def close(self):
+        self._connection.close()
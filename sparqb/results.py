@@ -0,0 +1,426 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import array
+import codecs
+import decimal
+import itertools
+import json
+import re
+import sys
+import xml.etree.ElementTree
+
+from sparqb.query_builder.expression import AsExpression, FunctionExpression, VariableExpression
+
+# number of bytes read from the response at a time
+READ_SIZE = 65536
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+_SPARQL_RESULTS_NS = '{http://www.w3.org/2005/sparql-results#}'
+
+_LITERAL_CONVERTERS = {
+    XSD + 'integer': int,
+    XSD + 'int': int,
+    XSD + 'long': int,
+    XSD + 'short': int,
+    XSD + 'byte': int,
+    XSD + 'nonNegativeInteger': int,
+    XSD + 'positiveInteger': int,
+    XSD + 'unsignedInt': int,
+    XSD + 'unsignedLong': int,
+    XSD + 'decimal': decimal.Decimal,
+    XSD + 'double': float,
+    XSD + 'float': float,
+    XSD + 'boolean': lambda value: value in ('true', '1'),
+}
+
+
+def convert_literal(value, datatype=None):
+    """Python value of a literal: numbers and booleans of XSD types are converted, anything else stays str."""
+    converter = _LITERAL_CONVERTERS.get(datatype)
+    if converter is None:
+        return value
+    try:
+        return converter(value)
+    except (ValueError, decimal.InvalidOperation):
+        return value
+
+
+def result_variables(query):
+    """Names of the result columns of a query, in select order, or None for select *."""
+    names = []
+    for item in query.select_items:
+        if isinstance(item, VariableExpression):
+            names.append(item.name)
+        elif isinstance(item, AsExpression):
+            names.append(item.variable.name)
+        else:
+            return None
+    return names or None
+
+
+# typecodes of the columns filled from the aggregate behind an AS alias; other columns hold Python objects
+_AGGREGATE_TYPECODES = {
+    'COUNT': 'q',
+    'AVG': 'd',
+}
+
+_TYPECODES = ('q', 'd', None)
+
+
+def result_columns(query, dtypes=None):
+    """(name, typecode) of every result column of a query, or None for select *.
+
+    COUNT aliases get 'q' and AVG aliases 'd' columns; dtypes maps names to 'q', 'd' or None to override.
+    """
+    dtypes = dtypes or {}
+    if any(typecode not in _TYPECODES for typecode in dtypes.values()):
+        raise ValueError('column typecodes must be one of %r' % (_TYPECODES,))
+    columns = []
+    for item in query.select_items:
+        if isinstance(item, VariableExpression):
+            name, typecode = item.name, None
+        elif isinstance(item, AsExpression):
+            name = item.variable.name
+            expression = item.expression
+            typecode = _AGGREGATE_TYPECODES.get(expression.name.upper()) \
+                if isinstance(expression, FunctionExpression) else None
+        else:
+            return None
+        columns.append((name, dtypes.get(name, typecode)))
+    return columns or None
+
+
+def _chunks(stream, read_size):
+    # decoded text chunks of a binary or text stream
+    decoder = None
+    while True:
+        data = stream.read(read_size)
+        if not data:
+            break
+        if isinstance(data, str):
+            yield data
+            continue
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder('utf-8')()
+        text = decoder.decode(data)
+        if text:
+            yield text
+    if decoder is not None:
+        text = decoder.decode(b'', True)
+        if text:
+            yield text
+
+
+def _json_term(term):
+    term_type = term.get('type')
+    if term_type == 'uri':
+        return sys.intern(term['value'])
+    if term_type == 'bnode':
+        return '_:' + term['value']
+    return convert_literal(term['value'], term.get('datatype'))
+
+
+_WHITESPACE = re.compile(r'[\s,]*')
+_BINDINGS = re.compile(r'"bindings"\s*:\s*\[')
+_HEAD = re.compile(r'"head"\s*:\s*')
+
+
+# The _<format>_values parsers first yield the tuple of variable names, then one tuple of values per row
+# in the order of those names. Rows as dicts and column batches are both built from them.
+
+def _json_values(stream, variables, read_size):
+    decoder = json.JSONDecoder()
+    chunks = _chunks(stream, read_size)
+    buffer = ''
+    position = None
+
+    for chunk in chunks:
+        buffer += chunk
+        match = _BINDINGS.search(buffer)
+        if match is not None:
+            position = match.end()
+            break
+
+    if variables is None:
+        head = _HEAD.search(buffer, 0, position)
+        if head is not None:
+            try:
+                variables = decoder.raw_decode(buffer, head.end())[0].get('vars')
+            except ValueError:
+                pass
+        if variables is None:
+            raise ValueError('result head has no variables')
+    names = tuple(variables)
+    yield names
+    if position is None:
+        return
+
+    exhausted = False
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            binding, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            if exhausted:
+                raise
+            # the binding is not complete yet
+            buffer = buffer[position:]
+            position = 0
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+            else:
+                buffer += chunk
+            continue
+        position = end
+        values = []
+        for name in names:
+            term = binding.get(name)
+            values.append(None if term is None else _json_term(term))
+        yield tuple(values)
+
+
+def _xml_term(element):
+    tag = element.tag[len(_SPARQL_RESULTS_NS):]
+    text = element.text or ''
+    if tag == 'uri':
+        return sys.intern(text)
+    if tag == 'bnode':
+        return '_:' + text
+    return convert_literal(text, element.get('datatype'))
+
+
+def _xml_values(stream, variables, read_size):
+    parser = xml.etree.ElementTree.XMLPullParser(events=('start', 'end'))
+    results_tag = _SPARQL_RESULTS_NS + 'results'
+    result_tag = _SPARQL_RESULTS_NS + 'result'
+    variable_tag = _SPARQL_RESULTS_NS + 'variable'
+    names = None if variables is None else tuple(variables)
+    head_variables = []
+    results = None
+
+    data = stream.read(read_size)
+    while data:
+        parser.feed(data)
+        for event, element in parser.read_events():
+            if event == 'start':
+                if element.tag == results_tag:
+                    results = element
+                    if names is None:
+                        names = tuple(head_variables)
+                    yield names
+                continue
+            if element.tag == variable_tag:
+                head_variables.append(element.get('name'))
+            elif element.tag == result_tag:
+                row = {}
+                for binding in element:
+                    if len(binding):
+                        row[binding.get('name')] = _xml_term(binding[0])
+                results.remove(element)
+                yield tuple([row.get(name) for name in names])
+        data = stream.read(read_size)
+    parser.close()
+    if results is None:
+        yield tuple(head_variables) if names is None else names
+
+
+def _unescape_tsv(text):
+    return re.sub(r'\\(.)', lambda match: {'t': '\t', 'n': '\n', 'r': '\r'}.get(match.group(1), match.group(1)), text)
+
+
+_TSV_LITERAL = re.compile(r'^"(.*)"(?:\^\^<([^>]*)>|@[A-Za-z0-9-]+)?$', re.DOTALL)
+
+
+def _tsv_term(text):
+    if not text:
+        return None
+    if text[0] == '<' and text[-1] == '>':
+        return sys.intern(text[1:-1])
+    if text.startswith('_:'):
+        return text
+    if text[0] == '"':
+        match = _TSV_LITERAL.match(text)
+        if match is not None:
+            return convert_literal(_unescape_tsv(match.group(1)), match.group(2))
+        return text
+    if text in ('true', 'false'):
+        return text == 'true'
+    try:
+        if '.' not in text and 'e' not in text and 'E' not in text:
+            return int(text)
+        if 'e' in text or 'E' in text:
+            return float(text)
+        return decimal.Decimal(text)
+    except (ValueError, decimal.InvalidOperation):
+        return text
+
+
+def _tsv_lines(stream, read_size):
+    pending = ''
+    for chunk in _chunks(stream, read_size):
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip('\r')
+    if pending.strip():
+        yield pending.rstrip('\r')
+
+
+def _tsv_values(stream, variables, read_size):
+    lines = _tsv_lines(stream, read_size)
+    header = [name.lstrip('?$') for name in next(lines, '').split('\t') if name]
+    names = tuple(header) if variables is None else tuple(variables)
+    yield names
+    positions = [header.index(name) if name in header else None for name in names]
+    identity = positions == list(range(len(header)))
+    for line in lines:
+        if not line and len(header) > 1:
+            continue
+        terms = list(map(_tsv_term, line.split('\t')))
+        if identity:
+            yield tuple(terms)
+        else:
+            yield tuple([None if position is None or position >= len(terms) else terms[position]
+                         for position in positions])
+
+
+def _dict_rows(values):
+    names = next(values)
+    for row in values:
+        yield dict(zip(names, row))
+
+
+def iter_json_rows(stream, variables=None, read_size=READ_SIZE):
+    """Yields the rows of application/sparql-results+json as dicts, decoding one binding at a time."""
+    return _dict_rows(_json_values(stream, variables, read_size))
+
+
+def iter_xml_rows(stream, variables=None, read_size=READ_SIZE):
+    """Yields the rows of application/sparql-results+xml as dicts, dropping each result element once read."""
+    return _dict_rows(_xml_values(stream, variables, read_size))
+
+
+def iter_tsv_rows(stream, variables=None, read_size=READ_SIZE):
+    """Yields the rows of text/tab-separated-values results as dicts."""
+    return _dict_rows(_tsv_values(stream, variables, read_size))
+
+
+_PARSERS = {
+    'application/sparql-results+json': _json_values,
+    'application/json': _json_values,
+    'application/sparql-results+xml': _xml_values,
+    'application/xml': _xml_values,
+    'text/tab-separated-values': _tsv_values,
+}
+
+
+def _values(stream, content_type, variables, read_size):
+    parser = _PARSERS.get(content_type.split(';', 1)[0].strip().lower())
+    if parser is None:
+        raise ValueError('unsupported result format %r' % content_type)
+    return parser(stream, variables, read_size)
+
+
+def iter_rows(stream, content_type, variables=None, read_size=READ_SIZE):
+    """Yields result rows as dicts keyed by variable name, parsing the stream as it is read.
+
+    variables fixes the keys of every row (unbound values are None); without it the keys come from the
+    result header.
+    """
+    return _dict_rows(_values(stream, content_type, variables, read_size))
+
+
+def iter_batches(rows, batch_size):
+    """Groups rows into lists of at most batch_size rows."""
+    if batch_size <= 0:
+        raise ValueError
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _to_integer(value):
+    if value is None:
+        raise ValueError('unbound value in an integer column')
+    integer = int(value)
+    if not isinstance(value, str) and integer != value:
+        raise ValueError('%r in an integer column' % (value,))
+    return integer
+
+
+def _to_double(value):
+    return float('nan') if value is None else float(value)
+
+
+class ColumnBatch(object):
+    """Rows of a result set stored by column: array('q'), array('d') or a list of Python objects per column."""
+
+    def __init__(self, names, columns):
+        self.names = names
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, name):
+        return self.columns[self.names.index(name)]
+
+    def to_numpy(self):
+        """Dict of NumPy arrays by column name; typed columns are wrapped without copying."""
+        import numpy
+        arrays = {}
+        for name, column in zip(self.names, self.columns):
+            if isinstance(column, array.array):
+                arrays[name] = numpy.frombuffer(column, dtype=column.typecode)
+            else:
+                arrays[name] = numpy.array(column, dtype=object)
+        return arrays
+
+
+def iter_column_batches(stream, content_type, columns=None, batch_size=65536, read_size=READ_SIZE):
+    """Yields ColumnBatch objects of at most batch_size rows, without building a dict per row.
+
+    columns is a list of (name, typecode) as returned by result_columns; without it every column of the
+    result header holds Python objects. Unbound values are None, NaN in 'd' columns and an error in 'q' ones.
+    """
+    if batch_size <= 0:
+        raise ValueError
+    if columns is not None and any(typecode not in _TYPECODES for _, typecode in columns):
+        raise ValueError('column typecodes must be one of %r' % (_TYPECODES,))
+    values = _values(stream, content_type, None if columns is None else [name for name, _ in columns], read_size)
+    return _column_batches(values, columns, batch_size)
+
+
+def _column_batches(values, columns, batch_size):
+    names = list(next(values))
+    typecodes = [None] * len(names) if columns is None else [typecode for _, typecode in columns]
+    converters = {'q': _to_integer, 'd': _to_double}
+
+    while True:
+        rows = list(itertools.islice(values, batch_size))
+        if not rows:
+            return
+        buffers = []
+        for typecode, column in zip(typecodes, zip(*rows)):
+            if typecode is None:
+                buffers.append(list(column))
+                continue
+            try:
+                buffers.append(array.array(typecode, column))
+            except TypeError:
+                # unbound or non-numeric values, converted one by one
+                buffers.append(array.array(typecode, map(converters[typecode], column)))
+        yield ColumnBatch(names, buffers)
+        if len(rows) < batch_size:
+            return
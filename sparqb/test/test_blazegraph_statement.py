@@ -0,0 +1,21 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+from sparqb.query_builder.blazegraph.blazegraph_statement import *
+
+
+def test_blazegraph_query_with_section():
+    sub = Query()
+    sub._statements = (AxiomStatement(var_f('a'), 'tcga:hasCase', var_f('c')),)
+    q = BlazegraphQuery()
+    q._with_statements = [WithStatement('cases', sub)]
+    q._statements = (IncludeStatement('cases'),)
+    assert str(q) == 'select *\nWITH\n{\nselect *\nWHERE{\n ?a tcga:hasCase ?c . \n}\n}\nAS %cases\n' \
+                     '\nWHERE{\n INCLUDE %cases \n}\n'
+
+
+def test_blazegraph_query_literal_with_dollar():
+    q = BlazegraphQuery()
+    q._statements = (FilterStatement(var_f('price') > literal_f('"$amount $$"')),)
+    assert str(q) == 'select *\nWHERE{\n FILTER ((?price > "$amount $$"))\n}\n'
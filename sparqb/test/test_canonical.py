@@ -0,0 +1,52 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.blazegraph.blazegraph_query_hints import Optimizer
+from sparqb.query_builder.canonical import canonical_key, canonicalize
+from sparqb.query_builder.expression import *
+from sparqb.query_builder.query_builder import QueryBuilder
+
+
+def _cases(file_name, first_type=True, prefixes=(('rdf', 'http://r#'), ('tcga', 'http://t#'))):
+    builder = QueryBuilder()
+    for prefix, namespace in prefixes:
+        builder.set_prefix(namespace, prefix)
+    if first_type:
+        builder.axiom('case', 'rdf:type', 'tcga:Case').axiom(file_name, 'tcga:hasCase', 'case')
+    else:
+        builder.axiom(file_name, 'tcga:hasCase', 'case').axiom('case', 'rdf:type', 'tcga:Case')
+    return builder.filter(var_f(file_name) > literal_f(3)).select('case').build()
+
+
+def test_canonical_key_ignores_naming_and_order():
+    query = _cases('file')
+    assert query.key() != _cases('f2', first_type=False).key()
+    assert canonical_key(query) == canonical_key(_cases('f2', first_type=False))
+    assert canonical_key(query) == canonical_key(_cases('file', prefixes=(('tcga', 'http://t#'),
+                                                                          ('rdf', 'http://r#'))))
+    assert canonical_key(query) != canonical_key(_cases('file', prefixes=(('rdf', 'http://r#'),)))
+
+
+def test_canonicalize_keeps_projection_and_filters():
+    query = canonicalize(_cases('file'))
+    assert str(query) == ('PREFIX rdf: <http://r#>\nPREFIX tcga: <http://t#>\nselect ?case\nWHERE{\n'
+                          ' ?case rdf:type tcga:Case . \n ?v0 tcga:hasCase ?case . \n FILTER ((?v0 > 3))\n}\n')
+    assert canonicalize(query).key() == query.key()
+
+
+def test_canonicalize_removes_duplicate_patterns():
+    query = QueryBuilder().axiom('a', 'a', 'tcga:Case').axiom('a', 'a', 'tcga:Case').select('a').build()
+    assert str(canonicalize(query)).count('tcga:Case') == 1
+
+    # select * projects every variable, so none is renamed
+    query = QueryBuilder().axiom('a', 'a', 'tcga:Case').select('*').build()
+    assert str(canonicalize(query)) == str(query)
+
+
+def test_canonicalize_keeps_fixed_join_order():
+    builder = BlazegraphQueryBuilder().optimizer(Optimizer.none)
+    query = builder.axiom('f', 'tcga:hasCase', 'a').axiom('a', 'a', 'tcga:Case').select('a').build()
+    text = str(canonicalize(query))
+    assert text.index('tcga:hasCase') < text.index('tcga:Case .')
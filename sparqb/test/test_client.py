@@ -0,0 +1,198 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import asyncio
+import http.server
+import json
+import re
+import threading
+import time
+import urllib.parse
+
+import pytest
+
+from sparqb.client import AsyncSparqlClient, SparqlClient, SparqlClientError
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.query_builder import QueryBuilder
+
+
+def _page(query):
+    # ordered queries get the rows ?n = 0 .. 24 sliced by their LIMIT and OFFSET
+    bindings = []
+    if 'ORDER BY' in query:
+        limit = re.search(r'LIMIT (\d+)', query)
+        offset = re.search(r'OFFSET (\d+)', query)
+        after = re.search(r'FILTER \(\(\?n > (\d+)\)\)', query)
+        start = int(offset.group(1)) if offset else int(after.group(1)) + 1 if after else 0
+        stop = min(25, start + int(limit.group(1))) if limit else 25
+        bindings = [{'n': {'type': 'literal', 'datatype': 'http://www.w3.org/2001/XMLSchema#integer',
+                           'value': str(n)}} for n in range(start, stop)]
+    return json.dumps({'head': {'vars': ['n']}, 'results': {'bindings': bindings}})
+
+
+class _SparqlHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        if 'cancelQuery' in self.path:
+            self.server.cancelled.append(urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)['queryId'][0])
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        query = urllib.parse.parse_qs(body)['query'][0]
+        if 'slow' in query:
+            time.sleep(1)
+        self.server.requests.append((self.client_address, self.headers['Content-Type'], self.headers['Accept'], query))
+        status = 400 if 'broken' in query else 200
+        payload = (_page(query) if status == 200 else 'parse error').encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/sparql-results+json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _SparqlHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.cancelled = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_posts_query_and_reuses_connection(server):
+    query = QueryBuilder().axiom('a', 'rdf:type', 'tcga:Case').select('a').limit(5).build()
+    with SparqlClient('http://127.0.0.1:%d/sparql' % server.server_port, pool_size=2, timeout=5) as client:
+        for _ in range(5):
+            assert client.execute(query).startswith(b'{"head"')
+
+    assert len(server.requests) == 5
+    assert len(set(address for address, _, _, _ in server.requests)) == 1
+    _, content_type, accept, text = server.requests[0]
+    assert content_type == 'application/x-www-form-urlencoded'
+    assert accept == 'application/sparql-results+json'
+    assert text == query.serialize()
+
+
+def test_client_error_status(server):
+    with SparqlClient('http://127.0.0.1:%d/sparql' % server.server_port, timeout=5) as client:
+        with pytest.raises(SparqlClientError) as error:
+            client.execute('select * where { broken }')
+        assert error.value.status == 400
+        assert error.value.body == 'parse error'
+        assert client.execute('select * where { ?s ?p ?o }')
+
+
+def test_client_pool_timeout(server):
+    with SparqlClient('http://127.0.0.1:%d/sparql' % server.server_port, pool_size=1, pool_timeout=0.01) as client:
+        response = client.open('select * where { ?s ?p ?o }')
+        with pytest.raises(SparqlClientError):
+            client.execute('select * where { ?s ?p ?o }')
+        response.read()
+        response.close()
+        assert client.execute('select * where { ?s ?p ?o }')
+
+
+def test_client_connection_error():
+    with SparqlClient('http://127.0.0.1:1/sparql', timeout=1) as client:
+        with pytest.raises(SparqlClientError):
+            client.execute('select * where { ?s ?p ?o }')
+
+
+def test_async_client_execute_many(server):
+    async def run():
+        async with AsyncSparqlClient('http://127.0.0.1:%d/sparql' % server.server_port, pool_size=4) as client:
+            queries = ['select * where { ?s ?p %d }' % i for i in range(20)]
+            return await client.execute_many(queries, concurrency=4)
+
+    results = asyncio.run(run())
+    assert len(results) == 20 and all(result.startswith(b'{"head"') for result in results)
+    assert sorted(query for _, _, _, query in server.requests) == sorted('select * where { ?s ?p %d }' % i
+                                                                         for i in range(20))
+    assert len(set(address for address, _, _, _ in server.requests)) <= 4
+
+
+def test_async_client_errors(server):
+    async def run():
+        async with AsyncSparqlClient('http://127.0.0.1:%d/sparql' % server.server_port) as client:
+            results = await client.execute_many(['select * where { broken }', 'select * where { ?s ?p ?o }'],
+                                                return_exceptions=True)
+            assert isinstance(results[0], SparqlClientError) and results[0].status == 400
+            assert results[1].startswith(b'{"head"')
+            with pytest.raises(SparqlClientError):
+                await client.execute('select * where { broken }')
+
+    asyncio.run(run())
+
+
+def test_async_client_timeout_cancels_on_server(server):
+    query = BlazegraphQueryBuilder().query_id('a1b2').axiom('s', 'p', '"slow"').select('s').build()
+
+    async def run():
+        async with AsyncSparqlClient('http://127.0.0.1:%d/sparql' % server.server_port) as client:
+            with pytest.raises(SparqlClientError):
+                await client.execute(query, timeout=0.2)
+
+    asyncio.run(run())
+    assert server.cancelled == ['a1b2']
+
+
+def test_client_select_streams_rows(server):
+    query = QueryBuilder().axiom('a', 'rdf:type', 'tcga:Case').select('a').build()
+    with SparqlClient('http://127.0.0.1:%d/sparql' % server.server_port) as client:
+        assert list(client.select(query)) == []
+        assert list(client.select(query, batch_size=10)) == []
+    assert len(set(address for address, _, _, _ in server.requests)) == 1
+
+
+def test_client_paginate(server):
+    builder = QueryBuilder().axiom('a', 'tcga:hasNumber', 'n').select('n').order_by('n')
+    with SparqlClient('http://127.0.0.1:%d/sparql' % server.server_port) as client:
+        for keyset in (False, True):
+            for prefetch in (False, True):
+                pages = list(client.paginate(builder.build(), 10, prefetch=prefetch, keyset=keyset))
+                assert [len(page) for page in pages] == [10, 10, 5]
+                assert [row['n'] for page in pages for row in page] == list(range(25))
+        assert any('FILTER ((?n > 19))' in query for _, _, _, query in server.requests)
+        assert [len(page) for page in client.paginate(builder.limit(15).offset(2).build(), 10)] == [10, 5]
+
+        with pytest.raises(ValueError):
+            client.paginate(QueryBuilder().axiom('a', 'tcga:hasNumber', 'n').select('n').build(), 10)
+        with pytest.raises(ValueError):
+            client.paginate(builder.build(), 10, keyset=True)
+
+
+def test_client_result_cache(server):
+    from sparqb.result_cache import ResultCache
+    builder = QueryBuilder().axiom('a', 'tcga:hasNumber', 'n').select('n').order_by('n')
+    cache = ResultCache()
+    with SparqlClient('http://127.0.0.1:%d/sparql' % server.server_port, result_cache=cache) as client:
+        rows = list(client.select(builder.build()))
+        assert list(client.select(builder.build())) == rows
+        assert client.execute(builder.build()) == client.execute(builder.build())
+        assert len(server.requests) == 1
+
+        client.execute(builder.no_cache().build())
+        client.execute(builder.build())
+        assert len(server.requests) == 3
+
+    async def run():
+        async with AsyncSparqlClient('http://127.0.0.1:%d/sparql' % server.server_port,
+                                     result_cache=cache) as async_client:
+            await async_client.execute('select * where { ?s ?p ?o }')
+            await async_client.execute('select * where { ?s ?p ?o }')
+
+    asyncio.run(run())
+    assert len(server.requests) == 4
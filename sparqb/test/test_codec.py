@@ -0,0 +1,101 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import array
+import decimal
+import pickle
+
+import pytest
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.blazegraph.blazegraph_query_hints import Optimizer
+from sparqb.query_builder.blazegraph.blazegraph_statement import BlazegraphQuery
+from sparqb.query_builder.codec import CodecError, decode, encode
+from sparqb.query_builder.expression import *
+from sparqb.query_builder.query_builder import QueryBuilder
+from sparqb.query_builder.render_cache import RenderCache
+from sparqb.query_builder.statement import *
+
+TCGA = 'https://www.sbgenomics.com/ontologies/2014/11/tcga#'
+
+
+def _query():
+    qb = QueryBuilder().set_prefix(TCGA, 'tcga')
+    qb.axiom('f', 'rdf:type', 'tcga:File'). \
+        axiom('f', 'tcga:hasSize', 'size'). \
+        union().axiom('f', 'tcga:hasCase', 'c').build(). \
+        union().axiom('f', 'tcga:hasSample', 's').build(). \
+        optional().axiom('f', 'rdfs:label', 'label').build(). \
+        values(('c',), [('tcga:Case_1',), ('"ünïcode"',)]). \
+        bulk_values(['n', 'x', 'd'], [array.array('q', [1, -2, 3]), [1.5, None, 'x'],
+                                      [decimal.Decimal('0.10'), True, literal_f(7)]]). \
+        bind(bound_f('label'), 'labelled'). \
+        filter(in_f(var_f('f'), uri_f('tcga:File_1'), uri_f('http://x.org/f')) &
+               (var_f('size') > param_f('min_size')) & regex_f(var_f('label'), 'bam')). \
+        select('f', as_f(count_f('*'), 'cnt')).distinct(). \
+        group_by('f').having(count_f('*') > literal_f(1)).order_by(desc_f('f')).limit(10).offset(-1)
+    return qb.build()
+
+
+def _blazegraph_query():
+    qb = BlazegraphQueryBuilder().query_id('a1b2').optimizer(Optimizer.none).chunk_size(100)
+    qb.with_query('cases').axiom('c', 'rdf:type', 'tcga:Case').select('c').build()
+    qb.include('cases')
+    qb.bds_search('label', 'BAM', relevance='?score').axiom('f', 'rdfs:label', 'label').select('f')
+    return qb.build()
+
+
+def test_round_trip():
+    for query in (_query(), _blazegraph_query()):
+        data = query.to_bytes()
+        decoded = type(query).from_bytes(data)
+        assert type(decoded) is type(query)
+        assert decoded.serialize() == query.serialize()
+        assert str(decoded) == str(query)
+        assert decoded.key() == query.key()
+        assert decoded.query_id == 'a1b2' if isinstance(query, BlazegraphQuery) else True
+        assert len(data) < len(pickle.dumps(query, pickle.HIGHEST_PROTOCOL))
+
+
+def test_decode_interns_terms_and_reads_memoryviews():
+    query = _query()
+    data = encode(query)
+    buffer = bytearray(b'head' + data + b'tail')
+    decoded = decode(memoryview(buffer)[4:-4])
+    assert str(decoded) == str(query)
+
+    axioms = [statement for statement in decoded._statements if type(statement) is AxiomStatement]
+    assert axioms[0]._s is var_f('f') and axioms[0]._o is uri_f('tcga:File')
+    assert decoded._render_cache is None and decoded._key is None
+    assert type(decoded._statements[-3]._columns[0]) is array.array
+
+
+def test_encoding_skips_caches():
+    query = _query()
+    cached = QueryBuilder().axiom('a', 'b', 'c').render_cache(RenderCache()).no_cache().build()
+    decoded = Query.from_bytes(cached.to_bytes())
+    assert decoded._render_cache is None and not decoded.cacheable
+    assert encode(query) == encode(decode(encode(query)))
+
+
+def test_errors():
+    data = _blazegraph_query().to_bytes()
+    with pytest.raises(TypeError):
+        BlazegraphQuery.from_bytes(_query().to_bytes())
+    with pytest.raises(CodecError):
+        decode(b'XYZ' + data[3:])
+    with pytest.raises(CodecError):
+        decode(data[:-3])
+    with pytest.raises(CodecError):
+        decode(data + b'\x00')
+    with pytest.raises(CodecError):
+        decode(encode(FilterStatement(literal_f(1.5)))[:-3])
+
+    class CustomStatement(FilterStatement):
+        __slots__ = ()
+
+    with pytest.raises(TypeError):
+        encode(CustomStatement(bound_f('a')))
+    with pytest.raises(TypeError):
+        encode(FilterStatement(literal_f(object())))
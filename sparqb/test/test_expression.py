@@ -257,3 +257,36 @@ def test_regex_expression_none():
     regex = r'File(_1)?$'
     with pytest.raises(ValueError):
         r = RegexExpression(None, regex)
+
+
+def test_var_f_interned():
+    assert var_f('abc') is var_f('?abc')
+    assert var_f('abc') is not var_f('abd')
+
+
+def test_uri_f_interned():
+    assert uri_f('tcga:Case') is uri_f('tcga:Case')
+    assert str(uri_f('https://www.sbgenomics.com/ontologies/2014/11/tcga#Case')) == \
+        '<https://www.sbgenomics.com/ontologies/2014/11/tcga#Case>'
+
+
+def test_uri_f_invalid():
+    with pytest.raises(ValueError):
+        uri_f('abc')
+
+
+def test_expression_hash_is_identity():
+    v = var_f('abc')
+    assert {v: 1}[var_f('abc')] == 1
+    assert hash(VariableExpression('abc')) != hash(VariableExpression('abc'))
+
+
+def test_term_table_is_weak():
+    import gc
+    from sparqb.query_builder.terms import TermTable
+    table = TermTable()
+    v = table.intern(VariableExpression, 'abc')
+    assert table.intern(VariableExpression, 'abc') is v and len(table) == 1
+    del v
+    gc.collect()
+    assert len(table) == 0
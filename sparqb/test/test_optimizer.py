@@ -0,0 +1,43 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.blazegraph.blazegraph_query_hints import Optimizer
+from sparqb.query_builder.expression import *
+from sparqb.query_builder.query_builder import QueryBuilder
+
+
+def _lines(query):
+    return [line.strip() for line in str(query).splitlines() if line.strip()]
+
+
+def test_optimize_orders_patterns_and_places_filters():
+    builder = QueryBuilder().axiom('a', 'b', 'c').axiom('f', 'tcga:hasCase', 'case') \
+        .axiom('case', 'rdf:type', 'tcga:Case') \
+        .compound().axiom('case', 'tcga:hasSample', 's').axiom('s', 'tcga:hasNumber', 'n').build() \
+        .filter(var_f('n') > literal_f(3)).select('case')
+    query = builder.build()
+    optimized = builder.build(optimize=True)
+
+    assert optimized.key() != query.key() and _lines(query)[2] == '?a b ?c .'
+    assert _lines(optimized) == ['select ?case', 'WHERE{', '?case rdf:type tcga:Case .',
+                                 '?case tcga:hasSample ?s .', '?s tcga:hasNumber ?n .', 'FILTER ((?n > 3))',
+                                 '?f tcga:hasCase ?case .', '?a b ?c .', '}']
+
+
+def test_optimize_pushes_filters_into_groups():
+    query = QueryBuilder().axiom('a', 'b', 'c') \
+        .compound().axiom('case', 'tcga:hasSample', 's').optional().axiom('s', 'tcga:x', 'y').build().build() \
+        .union().axiom('x', 'p', 'y').build().union().axiom('x', 'p', 'z').build() \
+        .filter(var_f('s') > literal_f(3)).filter(var_f('x') > literal_f(3)).select('case').build(optimize=True)
+    lines = _lines(query)
+    assert lines.index('FILTER ((?s > 3))') < lines.index('OPTIONAL {')
+    # filters never split the branches of a union
+    assert lines[-2:] == ['FILTER ((?x > 3))', '}']
+
+
+def test_optimize_keeps_fixed_join_order():
+    builder = BlazegraphQueryBuilder().optimizer(Optimizer.none).axiom('a', 'b', 'c') \
+        .axiom('a', 'rdf:type', 'tcga:Case').select('a')
+    assert str(builder.build(optimize=True)) == str(builder.build())
@@ -0,0 +1,46 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import concurrent.futures
+
+from sparqb.query_builder import parallel
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.parallel import render_parallel
+from sparqb.query_builder.statement import Statement
+from sparqb.query_builder.util import process_pool
+
+
+def _query(branches):
+    qb = BlazegraphQueryBuilder().query_id('a1b2')
+    qb.with_query('cases').axiom('c', 'a', 'tcga:Case').select('c').build()
+    for i in range(branches):
+        qb.union().axiom('f', 'tcga:hasCase', 'tcga:Case-%d' % i).values(('f',), [('tcga:File-%d' % i,)]).build()
+    return qb.select('f').limit(3).build()
+
+
+def test_render_parallel_matches_serialize():
+    query = _query(50)
+    assert render_parallel(query, workers=2) == query.serialize()
+    with concurrent.futures.ThreadPoolExecutor(3) as executor:
+        assert render_parallel(query, Statement.SERIALIZATION_RAW, executor=executor) == str(query)
+        group = query._statements[1]
+        assert render_parallel(group, executor=executor, chunk_size=1) == group.serialize()
+        assert render_parallel(_query(1), executor=executor) == _query(1).serialize()
+
+
+def test_render_parallel_process_pool_gets_chunks():
+    query = _query(30)
+    with process_pool(1) as executor:
+        assert render_parallel(query, executor=executor) == query.serialize()
+
+
+def test_render_parallel_concurrent_callers(monkeypatch):
+    # the shared thread pool is only used on free-threaded builds
+    monkeypatch.setattr(parallel, 'free_threaded', lambda: True)
+    queries = [_query(40), _query(60)] * 4
+    with concurrent.futures.ThreadPoolExecutor(4) as callers:
+        texts = list(callers.map(lambda query: render_parallel(query, workers=2), queries))
+    assert texts == [query.serialize() for query in queries]
+    assert render_parallel(queries[0], workers=2) == queries[0].serialize()
+    assert 2 in parallel._thread_pools
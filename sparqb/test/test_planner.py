@@ -0,0 +1,53 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.blazegraph.planner import Planner, Statistics
+
+STATISTICS = Statistics({'tcga:hasCase': {'triples': 100000, 'subjects': 100000, 'objects': 1000},
+                         'tcga:hasDiseaseType': {'triples': 1000, 'subjects': 1000, 'objects': 30},
+                         'http://purl.org/dc/terms/title': 5000},
+                        {'tcga:File': 100000, 'tcga:Case': 1000}, 2000000)
+
+
+def _query():
+    return BlazegraphQueryBuilder().set_prefix('http://purl.org/dc/terms/', 'dc') \
+        .axiom('f', 'a', 'tcga:File').axiom('f', 'tcga:hasCase', 'c') \
+        .axiom('c', 'tcga:hasDiseaseType', 'tcga:LUAD').select('f').build()
+
+
+def test_planner_orders_by_estimated_cost():
+    planner = Planner(STATISTICS)
+    query = _query()
+    planned = planner.plan(query)
+    lines = [line.strip() for line in str(planned).splitlines()]
+    assert lines[3:7] == ['hint:Query hint:optimizer "None" .', '?c tcga:hasDiseaseType tcga:LUAD .',
+                          '?f tcga:hasCase ?c .', '?f a tcga:File .']
+    assert planner.cost(planned) < planner.cost(query)
+    assert str(planner.plan(planned)) == str(planned)
+
+
+def test_planner_estimates():
+    planner = Planner(STATISTICS)
+    axiom = _query()._statements[1]
+    assert planner.estimate(axiom) == 100000
+    assert planner.estimate(axiom, {'c'}) == 100
+    assert planner.estimate(axiom, {'f'}) == 1
+
+    title = BlazegraphQueryBuilder().set_prefix('http://purl.org/dc/terms/', 'dc') \
+        .axiom('f', 'dc:title', 't').build()._statements[0]
+    assert planner.estimate(title, prefixes={'dc': 'http://purl.org/dc/terms/'}) == 5000
+    assert planner.estimate(title) == 2000000
+
+
+def test_statistics_snapshots(tmp_path):
+    STATISTICS.to_json(str(tmp_path / 'statistics.json'))
+    assert Statistics.from_json(str(tmp_path / 'statistics.json')).to_dict() == STATISTICS.to_dict()
+
+    (tmp_path / 'statistics.csv').write_text('kind,iri,count,subjects,objects\npredicate,tcga:hasCase,10,10,2\n'
+                                             'predicate,tcga:hasFile,4,,\nclass,tcga:Case,2\n')
+    statistics = Statistics.from_csv(str(tmp_path / 'statistics.csv'))
+    assert statistics.predicate('tcga:hasCase') == (10, 10, 2)
+    assert statistics.predicate('tcga:hasFile') == (4, None, None)
+    assert statistics.instances('tcga:Case') == 2 and statistics.triples == 14
@@ -0,0 +1,70 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import pytest
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.query_builder import QueryBuilder
+from sparqb.query_builder.expression import *
+
+
+def test_prepared_query_render():
+    qb = QueryBuilder()
+    qb.axiom('f', 'rdfs:label', 'fn').axiom('f', 'tcga:hasDataFormat', 'df').\
+        filter(in_f(var_f('df'), param_f('formats'))).filter(var_f('fn') > param_f('name')).\
+        select('f').limit(param_f('limit'))
+    prepared = qb.build().prepare()
+    assert prepared.parameter_names == ('formats', 'name', 'limit')
+    text = prepared.render(formats=[uri_f('tcga:BAM'), uri_f('tcga:BAI')], name='C500 "x"', limit=10)
+    assert 'FILTER (?df IN (tcga:BAM, tcga:BAI))' in text
+    assert 'FILTER ((?fn > "C500 \\"x\\""))' in text
+    assert text.endswith(' LIMIT 10\n')
+
+
+def test_prepared_query_matches_built_query():
+    def build(sample):
+        qb = BlazegraphQueryBuilder()
+        qb.axiom('f', 'rdfs:label', var_f('fn')).bds_search('fn', sample).select('f')
+        return qb.build()
+
+    prepared = build(param_f('sample')).prepare()
+    assert prepared.render(sample='C500.TCGA-ZF-AA53') == str(build(literal_f('"C500.TCGA-ZF-AA53"')))
+
+
+def test_prepared_query_missing_value():
+    qb = QueryBuilder()
+    qb.axiom('a', 'tcga:hasCase', 'c').filter(var_f('c') > param_f('min'))
+    prepared = qb.build().prepare()
+    with pytest.raises(ValueError):
+        prepared.render()
+    with pytest.raises(ValueError):
+        prepared.render(min=1, max=2)
+
+
+def test_unbound_parameter_renders_as_variable():
+    assert str(var_f('a') > param_f('value')) == '(?a > $value)'
+
+
+def test_format_value():
+    assert format_value(True) == 'true'
+    assert format_value(5) == '5'
+    assert format_value(2.5) == '2.5'
+    assert format_value('a\nb') == '"a\\nb"'
+    assert format_value(uri_f('tcga:Case')) == 'tcga:Case'
+    with pytest.raises(ValueError):
+        format_value(None)
+    with pytest.raises(TypeError):
+        format_value(object())
+
+
+def test_batch_renders_each_row():
+    def template(qb):
+        return qb.axiom('f', 'rdfs:label', 'fn').filter(var_f('fn') == param_f('name')).select('f')
+
+    names = ['C500.TCGA-%02d' % i for i in range(7)]
+    expected = [str(template(QueryBuilder()).build()).replace('$name', '"%s"' % name) for name in names]
+    assert list(QueryBuilder.batch(({'name': name} for name in names), template)) == expected
+    assert list(QueryBuilder.batch([{'name': name} for name in names], template, workers=2,
+                                   chunk_size=3)) == expected
+    with pytest.raises(ValueError):
+        list(QueryBuilder.batch([{}], template))
@@ -0,0 +1,76 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import concurrent.futures
+import tracemalloc
+
+from sparqb.query_builder.blazegraph.blazegraph_query_builder import BlazegraphQueryBuilder
+from sparqb.query_builder.blazegraph.blazegraph_statement import BlazegraphQuery
+from sparqb.query_builder.query_builder import QueryBuilder
+from sparqb.query_builder.statement import *
+
+
+def test_built_query_fields():
+    qb = QueryBuilder().axiom('a', 'rdf:type', 'tcga:Case').optional().axiom('a', 'tcga:hasSample', 's').build()
+    query = qb.select('a').limit(5).build()
+    # built queries take the builder containers without copying them
+    assert query._statements is qb._statements and query._select is qb._select and query._key is None
+    assert str(query) == 'select ?a\nWHERE{\n ?a rdf:type tcga:Case . \nOPTIONAL {\n ?a tcga:hasSample ?s . \n}\n}\n' \
+                         ' LIMIT 5\n'
+
+
+def test_builder_changes_after_build_are_not_seen():
+    qb = QueryBuilder().set_prefix('https://x.org/', 'x').axiom('a', 'x:p', 'b').select('a').order_by('a')
+    first = qb.build()
+    qb.axiom('b', 'x:q', 'c').select('b').order_by('b').group_by('a').set_prefix('https://y.org/', 'y').limit(3)
+    second = qb.build()
+    assert str(first) == 'PREFIX x: <https://x.org/>\nselect ?a\nWHERE{\n ?a x:p ?b . \n}\n\nORDER BY ?a'
+    assert len(second._statements) == 2 and len(second._select) == 2 and second._limit == 3
+    assert len(second._prefixes) == 2 and len(first._prefixes) == 1
+
+    group = qb.optional().axiom('a', 'x:r', 'd')
+    group.build()
+    group.axiom('a', 'x:s', 'e')
+    assert len(qb.build()._statements[-1]._statements) == 1
+
+
+def test_build_allocates_only_the_query():
+    builders = [QueryBuilder().axiom('f', 'rdf:type', 'tcga:File').axiom('f', 'tcga:hasCase', 'c').
+                optional().axiom('f', 'tcga:hasSize', 'size').build().select('f', 'c').order_by('f').
+                set_prefix('https://x.org/', 'x').limit(100) for _ in range(1000)]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        queries = [builder.build() for builder in builders]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    # one block per query and one for the list, where copying the builder state took five per query
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    assert blocks <= 1.2 * len(queries)
+
+
+def test_built_query_shared_across_threads():
+    def first_use(query):
+        return query.key(), str(query)
+
+    for _ in range(50):
+        query = QueryBuilder().axiom('a', 'rdf:type', 'tcga:Case').union().axiom('a', 'b', 'c').build(). \
+            select('a').build()
+        with concurrent.futures.ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(first_use, [query] * 4))
+        assert len(set(results)) == 1
+
+
+def test_blazegraph_named_subqueries():
+    qb = BlazegraphQueryBuilder()
+    qb.with_query('cases').axiom('c', 'rdf:type', 'tcga:Case').select('c').build()
+    qb.include('cases')
+    first = qb.select('c').build()
+    qb.with_query('samples').axiom('s', 'rdf:type', 'tcga:Sample').select('s').build()
+    assert [statement._name for statement in first._with_statements] == ['cases']
+    assert [statement._name for statement in qb.build()._with_statements] == ['cases', 'samples']
+    assert type(first._with_statements[0]._statements[0]) is BlazegraphQuery
+    sub = qb.subquery().axiom('a', 'b', 'c').build()._statements[-1]._statements[0]
+    assert sub._with_statements == ()
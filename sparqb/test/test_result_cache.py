@@ -0,0 +1,66 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+from sparqb.query_builder.query_builder import QueryBuilder
+from sparqb.result_cache import ResultCache, SqliteResultCache, result_key
+
+
+def _query(type_name):
+    return QueryBuilder().axiom('a', 'a', type_name).select('a').build()
+
+
+def test_result_key():
+    key = result_key(_query('tcga:Case'), 'http://a/sparql', 'application/sparql-results+json')
+    assert key == result_key(_query('tcga:Case'), 'http://a/sparql', 'application/sparql-results+json')
+    assert key != result_key(_query('tcga:Case'), 'http://b/sparql', 'application/sparql-results+json')
+    assert key != result_key(_query('tcga:Sample'), 'http://a/sparql', 'application/sparql-results+json')
+    assert key != result_key(str(_query('tcga:Case')), 'http://a/sparql', 'application/sparql-results+json')
+
+
+def test_result_cache_evicts_by_bytes():
+    cache = ResultCache(max_size=10)
+    cache.put(b'a', 'text/plain', b'12345')
+    cache.put(b'b', 'text/plain', b'12345')
+    assert cache.get(b'a') == ('text/plain', b'12345')
+    cache.put(b'c', 'text/plain', b'123')
+    assert cache.get(b'b') is None and cache.get(b'a') is not None
+    assert cache.size == 8 and cache.evictions == 1
+    cache.put(b'd', 'text/plain', b'x' * 11)
+    assert cache.get(b'd') is None
+
+
+def test_result_cache_ttl(monkeypatch):
+    import time
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    cache = ResultCache(ttl=5)
+    cache.put(b'a', 'text/plain', b'1')
+    now[0] += 4
+    assert cache.get(b'a') is not None
+    now[0] += 2
+    assert cache.get(b'a') is None and len(cache) == 0
+
+
+def test_sqlite_result_cache_survives_reopen(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    cache = SqliteResultCache(path, max_size=10)
+    cache.put(b'a', 'text/plain', b'12345')
+    cache.put(b'b', 'text/plain', b'12345')
+    cache.close()
+
+    cache = SqliteResultCache(path, max_size=10)
+    assert cache.size == 10
+    assert cache.get(b'a') == ('text/plain', b'12345')
+    cache.put(b'c', 'text/plain', b'1')
+    assert cache.get(b'b') is None and len(cache) == 2
+    cache.close()
+
+
+def test_result_key_canonical():
+    first = QueryBuilder().axiom('f', 'tcga:hasCase', 'a').axiom('a', 'a', 'tcga:Case').select('a').build()
+    second = QueryBuilder().axiom('a', 'a', 'tcga:Case').axiom('g', 'tcga:hasCase', 'a').select('a').build()
+    accept = 'application/sparql-results+json'
+    assert result_key(first, 'http://a/sparql', accept) != result_key(second, 'http://a/sparql', accept)
+    assert ResultCache(canonical=True).key(first, 'http://a/sparql', accept) == \
+        ResultCache(canonical=True).key(second, 'http://a/sparql', accept)
@@ -0,0 +1,90 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+import decimal
+import io
+import json
+
+from sparqb.query_builder.expression import *
+from sparqb.query_builder.query_builder import QueryBuilder
+from sparqb.results import XSD, iter_batches, iter_rows, result_variables
+
+ROWS = [{'f': 'https://example.org/f1', 'label': 'a "quoted"\tname', 'cnt': 3},
+        {'f': 'https://example.org/f2', 'label': None, 'cnt': 4}]
+
+
+def _json_results():
+    bindings = []
+    for row in ROWS:
+        binding = {'f': {'type': 'uri', 'value': row['f']},
+                   'cnt': {'type': 'literal', 'datatype': XSD + 'integer', 'value': str(row['cnt'])}}
+        if row['label'] is not None:
+            binding['label'] = {'type': 'literal', 'value': row['label']}
+        bindings.append(binding)
+    return json.dumps({'head': {'vars': ['f', 'label', 'cnt']}, 'results': {'bindings': bindings}}).encode()
+
+
+XML_RESULTS = '''<?xml version="1.0"?>
+<sparql xmlns="http://www.w3.org/2005/sparql-results#">
+ <head><variable name="f"/><variable name="label"/><variable name="cnt"/></head>
+ <results>
+  <result><binding name="f"><uri>https://example.org/f1</uri></binding>
+   <binding name="label"><literal>a "quoted"&#9;name</literal></binding>
+   <binding name="cnt"><literal datatype="http://www.w3.org/2001/XMLSchema#integer">3</literal></binding></result>
+  <result><binding name="f"><uri>https://example.org/f2</uri></binding>
+   <binding name="cnt"><literal datatype="http://www.w3.org/2001/XMLSchema#integer">4</literal></binding></result>
+ </results>
+</sparql>'''.encode()
+
+TSV_RESULTS = '?f\t?label\t?cnt\n<https://example.org/f1>\t"a \\"quoted\\"\\tname"\t3\n' \
+              '<https://example.org/f2>\t\t4\n'.encode()
+
+
+def test_parsers_agree_across_chunk_boundaries():
+    for content_type, data in (('application/sparql-results+json', _json_results()),
+                               ('application/sparql-results+xml; charset=utf-8', XML_RESULTS),
+                               ('text/tab-separated-values', TSV_RESULTS)):
+        for read_size in (1, 7, 65536):
+            assert list(iter_rows(io.BytesIO(data), content_type, read_size=read_size)) == ROWS
+
+
+def test_rows_keyed_by_select_items():
+    query = QueryBuilder().axiom('f', 'rdfs:label', 'label').group_by('f', 'label'). \
+        select('f', as_f(count_f('*'), 'cnt')).build()
+    variables = result_variables(query)
+    assert variables == ['f', 'cnt']
+    rows = list(iter_rows(io.BytesIO(_json_results()), 'application/sparql-results+json', variables))
+    assert rows == [{'f': row['f'], 'cnt': row['cnt']} for row in ROWS]
+    assert result_variables(QueryBuilder().axiom('a', 'b', 'c').build()) is None
+
+
+def test_literal_conversion_and_batches():
+    data = '?n\t?d\t?b\n1.5\t"2.50"^^<%sdecimal>\ttrue\n' % XSD
+    rows = list(iter_rows(io.StringIO(data), 'text/tab-separated-values'))
+    assert rows == [{'n': decimal.Decimal('1.5'), 'd': decimal.Decimal('2.50'), 'b': True}]
+    assert [len(batch) for batch in iter_batches(iter(range(5)), 2)] == [2, 2, 1]
+
+
+def test_column_batches_from_aliases():
+    import array
+    import pytest
+    from sparqb.results import iter_column_batches, result_columns
+    query = QueryBuilder().axiom('f', 'rdfs:label', 'label').group_by('f', 'label'). \
+        select('f', as_f(count_f('*'), 'cnt')).build()
+    columns = result_columns(query)
+    assert columns == [('f', None), ('cnt', 'q')]
+    assert result_columns(query, {'cnt': 'd'}) == [('f', None), ('cnt', 'd')]
+
+    for content_type, data in (('application/sparql-results+json', _json_results()),
+                               ('application/sparql-results+xml', XML_RESULTS),
+                               ('text/tab-separated-values', TSV_RESULTS)):
+        batches = list(iter_column_batches(io.BytesIO(data), content_type, columns, batch_size=1))
+        assert [len(batch) for batch in batches] == [1, 1]
+        assert batches[0]['cnt'] == array.array('q', [3])
+        assert batches[1]['f'] == ['https://example.org/f2']
+
+    batch, = iter_column_batches(io.BytesIO(_json_results()), 'application/sparql-results+json')
+    assert batch.names == ['f', 'label', 'cnt'] and batch['label'] == [ROWS[0]['label'], None]
+    with pytest.raises(ValueError):
+        list(iter_column_batches(io.BytesIO(_json_results()), 'application/sparql-results+json', [('label', 'q')]))
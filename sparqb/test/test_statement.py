@@ -10,6 +10,199 @@ def test_axiom_statement():
     assert str(a).strip() == 'a b c .'
 
 
-# def test_values_statement():
-#     v = ValuesStatement()
+def test_values_statement():
+    v = ValuesStatement(('a', 'b'), [('"x"', 1), (uri_f('tcga:BAM'), '"y"')])
+    assert str(v) == ' VALUES ( ?a ?b ) { ("x" 1)\n (tcga:BAM "y") } \n'
 
+
+def test_bulk_values_statement():
+    import array
+    v = BulkValuesStatement(['id', 'n'], [iter(['a"b', None, uri_f('tcga:BAM')]), array.array('q', [1, 2, 3])])
+    assert v.row_count == 3
+    assert str(v) == ' VALUES ( ?id ?n ) { ("a\\"b" 1)\n (UNDEF 2)\n (tcga:BAM 3) } \n'
+
+
+def test_bulk_values_matches_rows():
+    ids = ['s%d' % i for i in range(10000)]
+    bulk = BulkValuesStatement(('id',), (ids,))
+    rows = ValuesStatement(('id',), [('"%s"' % i,) for i in ids])
+    assert str(bulk) == str(rows)
+    assert bulk.key() == BulkValuesStatement(('id',), (list(ids),)).key()
+    assert bulk.key() != BulkValuesStatement(('id',), (ids[:-1] + ['x'],)).key()
+    assert BulkValuesStatement(('n',), ([1, 2],)).key() != BulkValuesStatement(('n',), ([True, 2],)).key()
+
+
+def test_bulk_values_validation():
+    import pytest
+    with pytest.raises(ValueError):
+        BulkValuesStatement(('a', 'b'), ([1, 2], [1]))
+    with pytest.raises(ValueError):
+        BulkValuesStatement(('a', 'b'), ([1, 2],))
+    with pytest.raises(TypeError):
+        BulkValuesStatement(('a',), ('abc',))
+
+
+def test_compound_statement():
+    c = CompoundStatement(AxiomStatement('a', 'b', 'c'), AxiomStatement('d', 'e', 'f'))
+    assert str(c) == '{\n a b c . \n \n d e f . \n}\n'
+
+
+def test_write_to_stream():
+    import io
+    u = UnionStatement(AxiomStatement('a', 'b', 'c'), OptionalStatement(AxiomStatement('a', 'd', 'e')))
+    stream = io.StringIO()
+    u.write_to(stream)
+    assert stream.getvalue() == str(u)
+
+
+def test_query_sections_order():
+    q = Query()
+    q._statements = (AxiomStatement(var_f('a'), 'tcga:hasType', var_f('t')),)
+    q._prefixes = {'tcga': 'https://www.sbgenomics.com/ontologies/2014/11/tcga#'}
+    q._select = [var_f('t')]
+    q._group_by = [var_f('t')]
+    q._order_by = [var_f('t')]
+    q._limit = 10
+    assert str(q) == 'PREFIX tcga: <https://www.sbgenomics.com/ontologies/2014/11/tcga#>\n' \
+                     'select ?t\nWHERE{\n ?a tcga:hasType ?t . \n}\n' \
+                     '\nGROUP BY ?t\nORDER BY ?t LIMIT 10\n'
+
+
+def test_key_is_structural():
+    a = UnionStatement(AxiomStatement(var_f('a'), 'tcga:hasCase', var_f('c')), FilterStatement(var_f('c') > literal_f(1)))
+    b = UnionStatement(AxiomStatement(var_f('a'), 'tcga:hasCase', var_f('c')), FilterStatement(var_f('c') > literal_f(1)))
+    assert a.key() == b.key()
+    assert hash(a) == hash(b)
+    assert a.key() is a.key()
+
+
+def test_key_depends_on_order_and_type():
+    x = AxiomStatement(var_f('a'), 'tcga:hasCase', var_f('c'))
+    y = AxiomStatement(var_f('c'), 'tcga:hasSample', var_f('s'))
+    assert CompoundStatement(x, y).key() != CompoundStatement(y, x).key()
+    assert CompoundStatement(x).key() != OptionalStatement(x).key()
+
+
+def test_query_render_cache():
+    from sparqb.query_builder.render_cache import RenderCache
+    cache = RenderCache(max_entries=1)
+
+    def build(name):
+        q = Query()
+        q._statements = (AxiomStatement(var_f(name), 'tcga:hasCase', var_f('c')),)
+        q._render_cache = cache
+        return q
+
+    fresh = build('a')
+    assert str(fresh) == str(build('a')) and fresh._key is None
+    assert (cache.hits, cache.misses) == (0, 0)
+
+    keyed = build('a')
+    keyed.key()
+    assert str(keyed) == str(keyed) == str(fresh)
+    assert (cache.hits, cache.misses) == (1, 1)
+    b = build('b')
+    hash(b)
+    str(b)
+    assert cache.evictions == 1 and len(cache) == 1
+    cache.invalidate(build('b'))
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_split_values():
+    q = Query()
+    q._statements = (BulkValuesStatement(('s',), (['a', 'b', 'c', 'd', 'e'],)),
+                     FilterStatement(in_f(var_f('n'), literal_f(1), literal_f(2))))
+    chunks = list(q.split_values(2))
+    assert len(chunks) == 3
+    assert chunks[0] == _query_with(('a', 'b'))
+    assert chunks[2] == _query_with(('e',))
+    assert list(q.split_values(5)) == [q.serialize()]
+
+
+def _query_with(ids):
+    q = Query()
+    q._statements = (BulkValuesStatement(('s',), (list(ids),)),
+                     FilterStatement(in_f(var_f('n'), literal_f(1), literal_f(2))))
+    return q.serialize()
+
+
+def test_split_values_in_list():
+    import pytest
+    q = Query()
+    q._statements = (FilterStatement(in_f(var_f('n'), *[literal_f(i) for i in range(5)])),)
+    assert [chunk.split('IN (')[1].split(')')[0] for chunk in q.split_values(3)] == ['0, 1, 2', '3, 4']
+    q._statements += (ValuesStatement(('s',), [('1',), ('2',), ('3',), ('4',)]),)
+    with pytest.raises(ValueError):
+        q.split_values(3)
+
+    q._statements = (FilterStatement(bound_f('s') & (in_f(var_f('n'), *[literal_f(i) for i in range(4)]) &
+                                                     bound_f('n'))),)
+    assert len(list(q.split_values(2))) == 2
+
+
+def test_split_values_refuses_unsafe_positions():
+    import pytest
+
+    def rows():
+        return ValuesStatement(('s',), [('1',), ('2',), ('3',)])
+
+    def in_list():
+        return in_f(var_f('n'), *[literal_f(i) for i in range(3)])
+
+    axiom = AxiomStatement(var_f('s'), 'tcga:hasCase', var_f('c'))
+    for statements in ((FilterStatement(UnaryOperatorExpression('!', in_list())),),
+                       (FilterStatement(in_list() | bound_f('s')),),
+                       (axiom, MinusStatement(rows())),
+                       (axiom, FilterExistsStatement(rows(), not_exists_type=True)),
+                       (axiom, OptionalStatement(rows())),
+                       (axiom, OptionalStatement(axiom, FilterStatement(in_list()))),
+                       (BindStatement(in_list(), var_f('b')),)):
+        q = Query()
+        q._statements = statements
+        with pytest.raises(ValueError):
+            q.split_values(2)
+
+    total = as_f(FunctionExpression('sum', var_f('c')), 'm')
+    for field, value in (('_select', [as_f(count_f('*'), 'n')]), ('_select', [total]), ('_group_by', [var_f('s')]),
+                         ('_having', bound_f('s')), ('_is_distinct', True), ('_order_by', [var_f('s')]),
+                         ('_limit', 10), ('_offset', 5)):
+        q = Query()
+        q._statements = (axiom, rows())
+        setattr(q, field, value)
+        with pytest.raises(ValueError):
+            q.split_values(2)
+        assert list(q.split_values(3)) == [q.serialize()]
+
+    q = Query()
+    q._statements = (FilterStatement(in_f(var_f('n'), literal_f(1), literal_f(2), literal_f(1))),)
+    with pytest.raises(ValueError):
+        q.split_values(2)
+
+
+def test_paginated_query():
+    import pytest
+    q = Query()
+    q._statements = (AxiomStatement(var_f('a'), 'tcga:hasCase', var_f('c')),)
+    q._order_by = [var_f('c')]
+    expected = Query()
+    expected._statements, expected._order_by, expected._limit, expected._offset = q._statements, q._order_by, 5, 10
+    assert q.paginated().prepare().render(limit=5, offset=10) == expected.serialize()
+    assert q.limit is None and q.offset is None
+    with pytest.raises(ValueError):
+        Query().paginated()
+
+
+def test_keyset_paginated_query():
+    import pytest
+    q = Query()
+    q._statements = (AxiomStatement(var_f('a'), 'tcga:hasCase', var_f('c')),)
+    q._order_by = [desc_f('c')]
+    first, after = q.keyset_paginated(by_string=True)
+    assert 'FILTER' not in first.prepare().render(limit=5)
+    assert ' FILTER ((STR(?c) < "x"))\n' in after.prepare().render(limit=5, after='x')
+    assert q._statements == first._statements and len(after._statements) == 2
+
+    q._select = [as_f(count_f('*'), 'c')]
+    with pytest.raises(ValueError):
+        q.keyset_paginated()
@@ -0,0 +1,30 @@
+__author__ = 'Seven Bridges Genomics <developer@sbgenomics.com>'
+__date__ = '17 October 2026'
+__copyright__ = 'Copyright (c) 2026 Seven Bridges Genomics'
+
+from sparqb.query_builder.util import *
+
+
+def test_classify_term_short():
+    assert classify_term('tcga:Case') == TERM_SHORT
+
+
+def test_classify_term_url():
+    assert classify_term('https://www.sbgenomics.com/ontologies/2014/11/tcga#Case') == TERM_URL
+
+
+def test_classify_term_variable():
+    assert classify_term('case') == TERM_VARIABLE
+    assert classify_term('?case') == TERM_VARIABLE
+
+
+def test_is_valid_uri():
+    assert is_valid_uri('tcga:Case')
+    assert is_valid_uri('http://localhost:9999/bigdata')
+    assert not is_valid_uri('abc')
+    assert not is_valid_uri(None)
+
+
+def test_is_valid_short_and_url():
+    assert is_valid_short('tcga:Case') and not is_valid_url('tcga:Case')
+    assert is_valid_url('http://example.com/a') and not is_valid_short('http://example.com/a')